@@ -1,14 +1,17 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import FastAPI, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
 import uvicorn
 import models
 import schemas
 import crud
-from database import SessionLocal, engine
+from database import AsyncSessionLocal, DATABASE_ASYNC, DbSession, SessionLocal, engine, pool_metrics, run_db, serving_engine
 
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
+models.upgrade_schema(engine)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -18,29 +21,73 @@ app = FastAPI(
 )
 
 # Dependency to get DB session
-def get_db():
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Handlers take either session type and hand it to crud through run_db
+get_db = get_async_db if DATABASE_ASYNC else get_sync_db
+
+@app.exception_handler(exc.TimeoutError)
+async def pool_timeout_handler(request: Request, error: exc.TimeoutError):
+    # Raised when no pooled connection frees up within DB_POOL_TIMEOUT
+    pool_metrics.increment("timeouts")
+    return JSONResponse(status_code=503, content={"detail": "Database connection pool exhausted"})
+
 # Routes
-@app.get("/assets/", response_model=List[schemas.Asset])
-def read_assets(
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Database connection pool metrics in Prometheus text format
+    """
+    return pool_metrics.render(serving_engine.pool)
+
+@app.get("/assets/", response_model=Union[schemas.AssetPage, List[schemas.Asset]])
+async def read_assets(
     skip: int = 0, 
     limit: int = 100, 
     status: Optional[str] = None,
     category: Optional[str] = None,
     search: Optional[str] = None,
     project_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    pagination: str = Query("offset", regex="^(offset|cursor)$"),
+    cursor: Optional[str] = None,
+    sort_by: str = "id",
+    db: DbSession = Depends(get_db)
 ):
     """
     Get a list of assets with optional filtering
+
+    Offset pagination (skip/limit) returns a plain list. Pass pagination=cursor,
+    or a cursor from a previous page, to get a page with a next_cursor instead.
     """
-    assets = crud.get_assets(
+    if pagination == "cursor" or cursor:
+        try:
+            assets, next_cursor = await run_db(
+                db,
+                crud.get_assets_page,
+                cursor=cursor,
+                limit=limit,
+                sort_by=sort_by,
+                status=status,
+                category=category,
+                search=search,
+                project_id=project_id
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return schemas.AssetPage(items=assets, next_cursor=next_cursor)
+    
+    assets = await run_db(
         db, 
+        crud.get_assets,
         skip=skip, 
         limit=limit, 
         status=status,
@@ -50,127 +97,248 @@ def read_assets(
     )
     return assets
 
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/json")
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+@app.post("/assets/import", response_model=schemas.AssetImportResult)
+async def import_assets(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, regex="^(csv|ndjson)$"),
+    db: DbSession = Depends(get_db)
+):
+    """
+    Bulk import assets from a CSV or NDJSON upload
+
+    Rows are validated and inserted in chunks; rows that fail are reported
+    by line number and do not stop the import.
+    """
+    if format is None:
+        filename = (file.filename or "").lower()
+        is_ndjson = file.content_type in NDJSON_CONTENT_TYPES or filename.endswith((".ndjson", ".jsonl"))
+        format = "ndjson" if is_ndjson else "csv"
+    
+    if isinstance(db, AsyncSession):
+        return await crud.aimport_assets(db, file.file, fmt=format)
+    return await run_db(db, crud.import_assets, file.file, fmt=format)
+
+@app.get("/assets/export")
+async def export_assets(
+    format: str = Query("csv", regex="^(csv|ndjson)$"),
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    project_id: Optional[int] = None,
+    db: DbSession = Depends(get_db)
+):
+    """
+    Stream all active assets as CSV or NDJSON
+    """
+    filters = dict(status=status, category=category, project_id=project_id)
+    if isinstance(db, AsyncSession):
+        content = crud.astream_assets_export(db, fmt=format, **filters)
+    else:
+        content = crud.stream_assets_export(db, fmt=format, **filters)
+    
+    return StreamingResponse(
+        content,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=assets.{format}"}
+    )
+
+@app.get("/assets/utilization/fleet", response_model=schemas.FleetUtilization)
+async def get_fleet_utilization(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    group_by: str = Query("category", regex="^(category|type|project)$"),
+    bucket: str = Query("day", regex="^(day|week|month)$"),
+    project_id: Optional[int] = None,
+    category: Optional[str] = None,
+    type: Optional[str] = None,
+    db: DbSession = Depends(get_db)
+):
+    """
+    Get utilization across the fleet, grouped by category, type or project and date bucket
+    """
+    return await run_db(
+        db,
+        crud.get_fleet_utilization,
+        start_date=start_date,
+        end_date=end_date,
+        group_by=group_by,
+        bucket=bucket,
+        project_id=project_id,
+        category=category,
+        asset_type=type
+    )
+
+# Batch routes are declared before /assets/{asset_id}/... so "batch" is not parsed as an id
+@app.post("/assets/batch/status", response_model=schemas.AssetBatchResult)
+async def update_assets_status(batch: schemas.AssetBatchStatusUpdate, db: DbSession = Depends(get_db)):
+    """
+    Set the status of many assets in one transaction
+
+    "assigned" and "available" are rejected; they go through the assign and
+    release endpoints so assignment records stay in step.
+    """
+    try:
+        return await run_db(db, crud.update_assets_status, batch=batch)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/assets/batch/assign", response_model=schemas.AssetBatchResult)
+async def assign_assets(batch: schemas.AssetBatchAssign, db: DbSession = Depends(get_db)):
+    """
+    Assign many assets to a project or user in one transaction
+
+    Only assets that are available at the time of the update are assigned;
+    the rest are reported as failed. With all_or_nothing, none are assigned
+    unless every asset is available.
+    """
+    return await run_db(db, crud.assign_assets, batch=batch)
+
+@app.post("/assets/batch/release", response_model=schemas.AssetBatchResult)
+async def release_assets(batch: schemas.AssetBatchRelease, db: DbSession = Depends(get_db)):
+    """
+    Release many assets from their current assignments in one transaction
+    """
+    return await run_db(db, crud.release_assets, batch=batch)
+
 @app.get("/assets/{asset_id}", response_model=schemas.AssetDetail)
-def read_asset(asset_id: int, db: Session = Depends(get_db)):
+async def read_asset(asset_id: int, db: DbSession = Depends(get_db)):
     """
     Get detailed information about a specific asset
     """
-    db_asset = crud.get_asset(db, asset_id=asset_id)
+    db_asset = await run_db(db, crud.get_asset_detail, asset_id=asset_id)
     if db_asset is None:
         raise HTTPException(status_code=404, detail="Asset not found")
     return db_asset
 
 @app.post("/assets/", response_model=schemas.Asset, status_code=201)
-def create_asset(asset: schemas.AssetCreate, db: Session = Depends(get_db)):
+async def create_asset(asset: schemas.AssetCreate, db: DbSession = Depends(get_db)):
     """
     Create a new asset
     """
-    return crud.create_asset(db=db, asset=asset)
+    return await run_db(db, crud.create_asset, asset=asset)
 
 @app.put("/assets/{asset_id}", response_model=schemas.Asset)
-def update_asset(asset_id: int, asset: schemas.AssetUpdate, db: Session = Depends(get_db)):
+async def update_asset(asset_id: int, asset: schemas.AssetUpdate, db: DbSession = Depends(get_db)):
     """
     Update an existing asset
     """
-    db_asset = crud.update_asset(db=db, asset_id=asset_id, asset=asset)
+    db_asset = await run_db(db, crud.update_asset, asset_id=asset_id, asset=asset)
     if db_asset is None:
         raise HTTPException(status_code=404, detail="Asset not found")
     return db_asset
 
 @app.delete("/assets/{asset_id}", response_model=schemas.AssetDelete)
-def delete_asset(asset_id: int, db: Session = Depends(get_db)):
+async def delete_asset(asset_id: int, db: DbSession = Depends(get_db)):
     """
     Delete an asset (soft delete)
     """
-    success = crud.delete_asset(db=db, asset_id=asset_id)
+    success = await run_db(db, crud.delete_asset, asset_id=asset_id)
     if not success:
         raise HTTPException(status_code=404, detail="Asset not found")
     return {"id": asset_id, "deleted": True}
 
 @app.get("/assets/categories/", response_model=List[schemas.Category])
-def get_asset_categories(db: Session = Depends(get_db)):
+async def get_asset_categories(db: DbSession = Depends(get_db)):
     """
     Get all asset categories
     """
-    categories = crud.get_asset_categories(db)
+    categories = await run_db(db, crud.get_asset_categories)
     return categories
 
 @app.get("/assets/types/", response_model=List[schemas.AssetType])
-def get_asset_types(db: Session = Depends(get_db)):
+async def get_asset_types(db: DbSession = Depends(get_db)):
     """
     Get all asset types
     """
-    types = crud.get_asset_types(db)
+    types = await run_db(db, crud.get_asset_types)
     return types
 
 @app.get("/assets/{asset_id}/maintenance-history", response_model=List[schemas.MaintenanceRecord])
-def get_asset_maintenance_history(asset_id: int, db: Session = Depends(get_db)):
+async def get_asset_maintenance_history(asset_id: int, db: DbSession = Depends(get_db)):
     """
     Get maintenance history for an asset
     """
-    db_asset = crud.get_asset(db, asset_id=asset_id)
+    db_asset = await run_db(db, crud.get_asset, asset_id=asset_id)
     if db_asset is None:
         raise HTTPException(status_code=404, detail="Asset not found")
     
-    maintenance_records = crud.get_asset_maintenance_history(db, asset_id=asset_id)
+    maintenance_records = await run_db(db, crud.get_asset_maintenance_history, asset_id=asset_id)
     return maintenance_records
 
 @app.get("/assets/{asset_id}/utilization", response_model=schemas.AssetUtilization)
-def get_asset_utilization(
+async def get_asset_utilization(
     asset_id: int, 
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_db)
 ):
     """
     Get utilization data for an asset
+
+    Telemetry is rolled up by the hour, so the range is widened to whole
+    hours: start_date is rounded down and end_date up.
     """
-    db_asset = crud.get_asset(db, asset_id=asset_id)
+    db_asset = await run_db(db, crud.get_asset, asset_id=asset_id)
     if db_asset is None:
         raise HTTPException(status_code=404, detail="Asset not found")
     
-    utilization = crud.get_asset_utilization(
+    utilization = await run_db(
         db, 
+        crud.get_asset_utilization,
         asset_id=asset_id,
         start_date=start_date,
         end_date=end_date
     )
     return utilization
 
+@app.post("/assets/{asset_id}/telemetry", response_model=schemas.AssetTelemetryRecorded, status_code=201)
+async def record_asset_telemetry(
+    asset_id: int,
+    telemetry: schemas.AssetTelemetryBatch,
+    db: DbSession = Depends(get_db)
+):
+    """
+    Record running/idle/down state samples for an asset's utilization rollups
+    """
+    db_asset = await run_db(db, crud.get_asset, asset_id=asset_id)
+    if db_asset is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    
+    return await run_db(db, crud.record_asset_telemetry, asset_id=asset_id, telemetry=telemetry)
+
 @app.post("/assets/{asset_id}/assign", response_model=schemas.AssetAssignment)
-def assign_asset(
+async def assign_asset(
     asset_id: int,
     assignment: schemas.AssetAssignmentCreate,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_db)
 ):
     """
     Assign an asset to a project or user
     """
-    db_asset = crud.get_asset(db, asset_id=asset_id)
+    db_asset = await run_db(db, crud.get_asset, asset_id=asset_id)
     if db_asset is None:
         raise HTTPException(status_code=404, detail="Asset not found")
     
-    # Check if asset is available
-    if db_asset.status != "available":
+    # Availability is checked by the assignment's UPDATE itself
+    assignment_record = await run_db(db, crud.assign_asset, asset_id=asset_id, assignment=assignment)
+    if assignment_record is None:
         raise HTTPException(status_code=400, detail="Asset is not available for assignment")
-    
-    assignment_record = crud.assign_asset(db, asset_id=asset_id, assignment=assignment)
     return assignment_record
 
 @app.post("/assets/{asset_id}/release", response_model=schemas.AssetAssignment)
-def release_asset(asset_id: int, db: Session = Depends(get_db)):
+async def release_asset(asset_id: int, db: DbSession = Depends(get_db)):
     """
     Release an asset from its current assignment
     """
-    db_asset = crud.get_asset(db, asset_id=asset_id)
+    db_asset = await run_db(db, crud.get_asset, asset_id=asset_id)
     if db_asset is None:
         raise HTTPException(status_code=404, detail="Asset not found")
     
-    # Check if asset is assigned
-    if db_asset.status == "available":
+    assignment_record = await run_db(db, crud.release_asset, asset_id=asset_id)
+    if assignment_record is None:
         raise HTTPException(status_code=400, detail="Asset is not currently assigned")
-    
-    assignment_record = crud.release_asset(db, asset_id=asset_id)
     return assignment_record
 
 # Run the app
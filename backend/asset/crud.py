@@ -1,24 +1,84 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from typing import List, Optional, Dict, Any
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, raiseload, selectinload
+from sqlalchemy import and_, or_, func, insert, select, update
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional, Dict, Any, Tuple, BinaryIO, Iterator, AsyncIterator
 from datetime import datetime, timedelta
+import base64
+import csv
+import io
+import json
 import models
 import schemas
+import utilization
+
+# Asset search
+#
+# On PostgreSQL a search matches the generated search_vector (word matches,
+# ranked) or a substring of one of the trigram-indexed columns, so both halves
+# of the OR are index-backed. Other dialects keep the plain ilike scan.
+def _search_clause(search: str, dialect: Optional[str]):
+    search_term = f"%{search}%"
+    substring_match = or_(
+        *(getattr(models.Asset, column).ilike(search_term) for column in models.ASSET_SEARCH_COLUMNS)
+    )
+    
+    if dialect != "postgresql":
+        return substring_match
+    
+    return or_(models.asset_search_vector.op("@@")(_search_query(search)), substring_match)
+
+def _search_query(search: str):
+    return func.websearch_to_tsquery(models.ASSET_SEARCH_CONFIG, search)
+
+def _search_rank(search: str):
+    return (
+        func.ts_rank(models.asset_search_vector, _search_query(search))
+        + func.similarity(models.Asset.name, search)
+    )
+
+# Loader strategies
+#
+# Each endpoint declares up front which relationships it serializes. Detail
+# reads load every collection in AssetDetail with one SELECT ... IN per
+# collection; list reads serialize no relationships, so any lazy load from
+# them is a bug and raises instead of silently issuing a query per row.
+ASSET_DETAIL_LOADERS = (
+    selectinload(models.Asset.maintenance_records),
+    selectinload(models.Asset.documents),
+    selectinload(models.Asset.images),
+    selectinload(models.Asset.assignments),
+)
+
+ASSET_LIST_LOADERS = (
+    raiseload("*"),
+)
+
+# Statements each endpoint may issue, checked with database.query_budget
+ASSET_DETAIL_QUERY_BUDGET = 1 + len(ASSET_DETAIL_LOADERS)
+ASSET_LIST_QUERY_BUDGET = 1
 
 # Asset CRUD operations
 def get_asset(db: Session, asset_id: int):
     return db.query(models.Asset).filter(models.Asset.id == asset_id, models.Asset.is_active == True).first()
 
-def get_assets(
-    db: Session, 
-    skip: int = 0, 
-    limit: int = 100, 
+def get_asset_detail(db: Session, asset_id: int):
+    return db.query(models.Asset).options(*ASSET_DETAIL_LOADERS).filter(
+        models.Asset.id == asset_id,
+        models.Asset.is_active == True
+    ).first()
+
+def _filter_assets(
+    query,
     status: Optional[str] = None,
     category: Optional[str] = None,
     search: Optional[str] = None,
-    project_id: Optional[int] = None
+    project_id: Optional[int] = None,
+    dialect: Optional[str] = None
 ):
-    query = db.query(models.Asset).filter(models.Asset.is_active == True)
+    query = query.filter(models.Asset.is_active == True)
     
     if status:
         query = query.filter(models.Asset.status == status)
@@ -27,23 +87,131 @@ def get_assets(
         query = query.filter(models.Asset.category == category)
     
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                models.Asset.name.ilike(search_term),
-                models.Asset.serial_number.ilike(search_term),
-                models.Asset.manufacturer.ilike(search_term),
-                models.Asset.model.ilike(search_term)
-            )
-        )
+        query = query.filter(_search_clause(search, dialect))
     
     if project_id:
         query = query.filter(models.Asset.current_project_id == project_id)
     
+    return query
+
+def get_assets(
+    db: Session, 
+    skip: int = 0, 
+    limit: int = 100, 
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    project_id: Optional[int] = None
+):
+    dialect = db.get_bind().dialect.name
+    query = _filter_assets(
+        db.query(models.Asset).options(*ASSET_LIST_LOADERS),
+        status=status,
+        category=category,
+        search=search,
+        project_id=project_id,
+        dialect=dialect
+    )
+    
+    if search and dialect == "postgresql":
+        query = query.order_by(_search_rank(search).desc(), models.Asset.id)
+    else:
+        query = query.order_by(models.Asset.id)
+    
     return query.offset(skip).limit(limit).all()
 
-def create_asset(db: Session, asset: schemas.AssetCreate):
-    db_asset = models.Asset(
+# Keyset (cursor) pagination
+#
+# Cursors are opaque to clients: a URL-safe base64 encoding of the sort key,
+# the last row's value for that key and its id. Rows are ordered by
+# (sort key, id) so the ordering is total and stable across pages, and the
+# next page is fetched with a range predicate instead of an OFFSET scan.
+ASSET_SORT_KEYS = {
+    "id": models.Asset.id,
+    "name": models.Asset.name,
+    "created_at": models.Asset.created_at,
+    "updated_at": models.Asset.updated_at,
+}
+
+def encode_cursor(sort_by: str, value: Any, last_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort_by, value, last_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_by, value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    
+    # A NULL value would turn the range predicate into "sort_column > NULL" and match nothing
+    if sort_by not in ASSET_SORT_KEYS or not isinstance(last_id, int) or value is None:
+        raise ValueError("Invalid cursor")
+    
+    if sort_by in ("created_at", "updated_at"):
+        try:
+            value = datetime.fromisoformat(value)
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+    
+    return sort_by, value, last_id
+
+def get_assets_page(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    sort_by: str = "id",
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    project_id: Optional[int] = None
+) -> Tuple[List[models.Asset], Optional[str]]:
+    """Return one page of assets and the cursor for the next page (None on the last page)"""
+    if cursor:
+        # The cursor carries its own sort key so a client cannot mix orderings mid-scan
+        sort_by, last_value, last_id = decode_cursor(cursor)
+    elif sort_by not in ASSET_SORT_KEYS:
+        raise ValueError(f"Unsupported sort key: {sort_by}")
+    
+    sort_column = ASSET_SORT_KEYS[sort_by]
+    query = _filter_assets(
+        db.query(models.Asset).options(*ASSET_LIST_LOADERS),
+        status=status,
+        category=category,
+        search=search,
+        project_id=project_id,
+        dialect=db.get_bind().dialect.name
+    )
+    
+    if cursor:
+        if sort_by == "id":
+            query = query.filter(models.Asset.id > last_id)
+        else:
+            query = query.filter(
+                or_(
+                    sort_column > last_value,
+                    and_(sort_column == last_value, models.Asset.id > last_id)
+                )
+            )
+    
+    if sort_by == "id":
+        query = query.order_by(models.Asset.id)
+    else:
+        query = query.order_by(sort_column, models.Asset.id)
+    
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(sort_by, getattr(last, sort_by), last.id)
+
+def _asset_values(asset: schemas.AssetCreate) -> Dict[str, Any]:
+    return dict(
         name=asset.name,
         type=asset.type,
         category=asset.category,
@@ -61,6 +229,9 @@ def create_asset(db: Session, asset: schemas.AssetCreate):
         notes=asset.notes,
         properties=asset.properties
     )
+
+def create_asset(db: Session, asset: schemas.AssetCreate):
+    db_asset = models.Asset(**_asset_values(asset))
     db.add(db_asset)
     db.commit()
     db.refresh(db_asset)
@@ -89,6 +260,180 @@ def delete_asset(db: Session, asset_id: int):
     db.commit()
     return True
 
+# Bulk import/export
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_MAX_ERRORS = 1000
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_COLUMNS = list(schemas.Asset.__fields__)
+
+def _read_import_rows(stream: BinaryIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """Yield (line number, row dict or parse error) from a CSV or NDJSON byte stream"""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            data = {key: value for key, value in row.items() if key and value != ""}
+            if isinstance(data.get("properties"), str):
+                try:
+                    data["properties"] = json.loads(data["properties"])
+                except ValueError as e:
+                    yield reader.line_num, e
+                    continue
+            yield reader.line_num, data
+        return
+    
+    for line_number, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, e
+
+def _import_failure(result: schemas.AssetImportResult, line_number: int, errors: List[str]):
+    result.failed += 1
+    if len(result.errors) < IMPORT_MAX_ERRORS:
+        result.errors.append(schemas.AssetImportError(row=line_number, errors=errors))
+
+def _validated_import_chunks(
+    stream: BinaryIO,
+    fmt: str,
+    chunk_size: int,
+    result: schemas.AssetImportResult
+) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+    """Parse and validate rows against AssetCreate, yielding insert-ready chunks and recording failures"""
+    chunk = []
+    for line_number, data in _read_import_rows(stream, fmt):
+        result.total += 1
+        
+        if isinstance(data, Exception):
+            _import_failure(result, line_number, [f"Could not parse row: {data}"])
+            continue
+        
+        try:
+            asset = schemas.AssetCreate.parse_obj(data)
+        except ValidationError as e:
+            _import_failure(result, line_number, [
+                f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" for error in e.errors()
+            ])
+            continue
+        
+        chunk.append((line_number, _asset_values(asset)))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    
+    if chunk:
+        yield chunk
+
+def _insert_import_chunk(db: Session, chunk: List[Tuple[int, Dict[str, Any]]], result: schemas.AssetImportResult):
+    """One multi-row INSERT in its own transaction; a database error fails only this chunk's rows"""
+    try:
+        db.execute(insert(models.Asset), [values for _, values in chunk])
+        db.commit()
+        result.imported += len(chunk)
+    except SQLAlchemyError as e:
+        db.rollback()
+        for line_number, _ in chunk:
+            _import_failure(result, line_number, [str(getattr(e, "orig", e))])
+
+def import_assets(
+    db: Session,
+    stream: BinaryIO,
+    fmt: str = "csv",
+    chunk_size: int = IMPORT_CHUNK_SIZE
+) -> schemas.AssetImportResult:
+    """
+    Validate rows against AssetCreate and insert them in chunks.
+    
+    Each chunk is one multi-row INSERT in its own transaction, so a database
+    error fails only that chunk's rows and earlier chunks stay committed.
+    """
+    result = schemas.AssetImportResult()
+    for chunk in _validated_import_chunks(stream, fmt, chunk_size, result):
+        _insert_import_chunk(db, chunk, result)
+    return result
+
+async def aimport_assets(
+    db: AsyncSession,
+    stream: BinaryIO,
+    fmt: str = "csv",
+    chunk_size: int = IMPORT_CHUNK_SIZE
+) -> schemas.AssetImportResult:
+    """
+    Async counterpart of import_assets.
+    
+    Parsing and validation are CPU-bound and run in the threadpool one chunk
+    at a time; only finished chunks are handed to the session for the insert.
+    """
+    result = schemas.AssetImportResult()
+    chunks = _validated_import_chunks(stream, fmt, chunk_size, result)
+    while True:
+        chunk = await run_in_threadpool(next, chunks, None)
+        if chunk is None:
+            return result
+        await db.run_sync(_insert_import_chunk, chunk, result)
+
+def _export_statement(
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    project_id: Optional[int] = None
+):
+    stmt = select(*(getattr(models.Asset, column) for column in EXPORT_COLUMNS)).where(
+        models.Asset.is_active == True
+    )
+    if status:
+        stmt = stmt.where(models.Asset.status == status)
+    if category:
+        stmt = stmt.where(models.Asset.category == category)
+    if project_id:
+        stmt = stmt.where(models.Asset.current_project_id == project_id)
+    
+    # Server-side cursor: rows arrive in partitions instead of all at once
+    return stmt.order_by(models.Asset.id).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _format_export_rows(rows, fmt: str, header: bool = False) -> str:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if header:
+            writer.writerow(EXPORT_COLUMNS)
+        for row in rows:
+            writer.writerow([
+                json.dumps(value) if isinstance(value, dict) else _export_value(value) for value in row
+            ])
+        return buffer.getvalue()
+    
+    return "".join(
+        json.dumps({column: _export_value(value) for column, value in zip(EXPORT_COLUMNS, row)}) + "\n"
+        for row in rows
+    )
+
+def stream_assets_export(db: Session, fmt: str = "csv", **filters) -> Iterator[str]:
+    """Yield the export one partition at a time"""
+    if fmt == "csv":
+        yield _format_export_rows([], fmt, header=True)
+    
+    result = db.execute(_export_statement(**filters))
+    for partition in result.partitions():
+        yield _format_export_rows(partition, fmt)
+
+async def astream_assets_export(db: AsyncSession, fmt: str = "csv", **filters) -> AsyncIterator[str]:
+    """Async counterpart of stream_assets_export"""
+    if fmt == "csv":
+        yield _format_export_rows([], fmt, header=True)
+    
+    result = await db.stream(_export_statement(**filters))
+    async for partition in result.partitions():
+        yield _format_export_rows(partition, fmt)
+
 def get_asset_maintenance_history(db: Session, asset_id: int):
     return db.query(models.MaintenanceRecord).filter(
         models.MaintenanceRecord.asset_id == asset_id
@@ -109,103 +454,207 @@ def get_asset_utilization(
     if not asset:
         return None
     
-    # In a real application, this would query actual utilization data
-    # For this example, we'll return a dummy utilization report
-    
-    # Calculate days in the period
-    days_in_period = (end_dt - start_dt).days
-    
-    # Generate dummy daily utilization
-    daily_utilization = {}
-    current_date = start_dt
-    while current_date <= end_dt:
-        date_str = current_date.strftime("%Y-%m-%d")
-        # Generate a utilization value between 0 and 100
-        utilization_value = min(100, max(0, asset.utilization_rate or 70))
-        daily_utilization[date_str] = utilization_value
-        current_date += timedelta(days=1)
-    
-    # Generate dummy monthly utilization
-    monthly_utilization = {}
-    month_start = datetime(start_dt.year, start_dt.month, 1)
-    while month_start <= end_dt:
-        month_str = month_start.strftime("%Y-%m")
-        # Generate a utilization value between 0 and 100
-        utilization_value = min(100, max(0, asset.utilization_rate or 70))
-        monthly_utilization[month_str] = utilization_value
-        
-        # Move to next month
-        if month_start.month == 12:
-            month_start = datetime(month_start.year + 1, 1, 1)
-        else:
-            month_start = datetime(month_start.year, month_start.month + 1, 1)
-    
-    # Calculate hours
-    total_hours = days_in_period * 24
-    utilization_rate = asset.utilization_rate or 70
-    total_hours_used = total_hours * (utilization_rate / 100)
-    idle_hours = total_hours * ((100 - utilization_rate) / 100) * 0.7
-    downtime_hours = total_hours * ((100 - utilization_rate) / 100) * 0.3
-    
-    # Create and return the utilization report
-    utilization_report = schemas.AssetUtilization(
-        asset_id=asset_id,
-        utilization_rate=utilization_rate,
-        daily_utilization=daily_utilization,
-        monthly_utilization=monthly_utilization,
-        total_hours_used=total_hours_used,
-        idle_hours=idle_hours,
-        downtime_hours=downtime_hours
+    return utilization.get_asset_utilization(db, asset_id=asset_id, start_dt=start_dt, end_dt=end_dt)
+
+def get_fleet_utilization(
+    db: Session,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    group_by: str = "category",
+    bucket: str = "day",
+    project_id: Optional[int] = None,
+    category: Optional[str] = None,
+    asset_type: Optional[str] = None
+):
+    end_day = datetime.fromisoformat(end_date).date() if end_date else datetime.utcnow().date()
+    start_day = datetime.fromisoformat(start_date).date() if start_date else end_day - timedelta(days=30)
+    
+    return utilization.get_fleet_utilization(
+        db,
+        start_day=start_day,
+        end_day=end_day,
+        group_by=group_by,
+        bucket=bucket,
+        project_id=project_id,
+        category=category,
+        asset_type=asset_type
     )
+
+def record_asset_telemetry(db: Session, asset_id: int, telemetry: schemas.AssetTelemetryBatch):
+    recorded = utilization.record_usage(db, asset_id=asset_id, samples=telemetry.samples)
+    return schemas.AssetTelemetryRecorded(asset_id=asset_id, recorded=recorded)
+
+# Assignment
+#
+# Assign and release are set-based: one conditional UPDATE claims every asset
+# that is still in the right state, and the assignment rows are written in a
+# single multi-row statement. The availability check is part of the UPDATE's
+# WHERE clause, so two concurrent requests cannot both claim an asset.
+def _claim_assets(db: Session, asset_ids: List[int], assignment: schemas.AssetAssignmentCreate) -> Dict[int, int]:
+    """Assign every available asset in asset_ids; returns asset_id -> assignment_id"""
+    now = datetime.utcnow()
+    claimed = db.execute(
+        update(models.Asset)
+        .where(
+            models.Asset.id.in_(asset_ids),
+            models.Asset.is_active == True,
+            models.Asset.status == "available"
+        )
+        .values(
+            status="assigned",
+            current_project_id=assignment.project_id,
+            assigned_user_id=assignment.user_id,
+            updated_at=now
+        )
+        .returning(models.Asset.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
     
-    return utilization_report
+    if not claimed:
+        return {}
+    
+    rows = db.execute(
+        insert(models.AssetAssignment).returning(models.AssetAssignment.asset_id, models.AssetAssignment.id),
+        [
+            dict(
+                asset_id=asset_id,
+                project_id=assignment.project_id,
+                user_id=assignment.user_id,
+                notes=assignment.notes,
+                assigned_at=now,
+                status="active"
+            )
+            for asset_id in claimed
+        ]
+    ).all()
+    return dict(rows)
 
-def assign_asset(db: Session, asset_id: int, assignment: schemas.AssetAssignmentCreate):
-    # Create assignment record
-    db_assignment = models.AssetAssignment(
-        asset_id=asset_id,
-        project_id=assignment.project_id,
-        user_id=assignment.user_id,
-        notes=assignment.notes
+def _release_assets(db: Session, asset_ids: List[int]) -> Dict[int, List[int]]:
+    """Close the open assignments of every asset in asset_ids; returns asset_id -> closed assignment_ids"""
+    now = datetime.utcnow()
+    active_assets = select(models.Asset.id).where(
+        models.Asset.id.in_(asset_ids),
+        models.Asset.is_active == True
     )
-    db.add(db_assignment)
+    rows = db.execute(
+        update(models.AssetAssignment)
+        .where(
+            models.AssetAssignment.asset_id.in_(active_assets),
+            models.AssetAssignment.status == "active",
+            models.AssetAssignment.returned_at == None
+        )
+        .values(status="completed", returned_at=now)
+        .returning(models.AssetAssignment.asset_id, models.AssetAssignment.id)
+        .execution_options(synchronize_session=False)
+    ).all()
     
-    # Update asset status and assignment references
-    db_asset = get_asset(db, asset_id=asset_id)
-    db_asset.status = "assigned"
-    db_asset.current_project_id = assignment.project_id
-    db_asset.assigned_user_id = assignment.user_id
-    db_asset.updated_at = datetime.utcnow()
+    released = {}
+    for asset_id, assignment_id in sorted(rows):
+        released.setdefault(asset_id, []).append(assignment_id)
+    if released:
+        db.execute(
+            update(models.Asset)
+            .where(models.Asset.id.in_(list(released)))
+            .values(status="available", current_project_id=None, assigned_user_id=None, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    return released
+
+def _batch_result(
+    db: Session,
+    asset_ids: List[int],
+    succeeded: Dict[int, List[int]],
+    failure_detail: str
+) -> schemas.AssetBatchResult:
+    """Per-asset outcome, telling missing assets apart from ones in the wrong state"""
+    failed_ids = [asset_id for asset_id in asset_ids if asset_id not in succeeded]
+    existing = set()
+    if failed_ids:
+        existing = set(db.execute(
+            select(models.Asset.id).where(models.Asset.id.in_(failed_ids), models.Asset.is_active == True)
+        ).scalars())
+    
+    results = []
+    for asset_id in asset_ids:
+        if asset_id in succeeded:
+            assignment_ids = succeeded[asset_id]
+            results.append(schemas.AssetBatchItemResult(
+                asset_id=asset_id,
+                success=True,
+                assignment_id=assignment_ids[-1] if assignment_ids else None,
+                assignment_ids=assignment_ids
+            ))
+        else:
+            results.append(schemas.AssetBatchItemResult(
+                asset_id=asset_id,
+                success=False,
+                detail=failure_detail if asset_id in existing else "Asset not found"
+            ))
     
+    return schemas.AssetBatchResult(
+        succeeded=len(succeeded),
+        failed=len(asset_ids) - len(succeeded),
+        results=results
+    )
+
+def assign_asset(db: Session, asset_id: int, assignment: schemas.AssetAssignmentCreate):
+    """Assign one asset; returns None if it was not available"""
+    claimed = _claim_assets(db, [asset_id], assignment)
     db.commit()
-    db.refresh(db_assignment)
-    return db_assignment
+    if asset_id not in claimed:
+        return None
+    return db.get(models.AssetAssignment, claimed[asset_id])
 
 def release_asset(db: Session, asset_id: int):
-    # Find the active assignment
-    db_assignment = db.query(models.AssetAssignment).filter(
-        models.AssetAssignment.asset_id == asset_id,
-        models.AssetAssignment.status == "active",
-        models.AssetAssignment.returned_at == None
-    ).first()
-    
-    if not db_assignment:
+    """Release one asset; returns None if it had no open assignment"""
+    released = _release_assets(db, [asset_id])
+    db.commit()
+    if asset_id not in released:
         return None
-    
-    # Update assignment record
-    db_assignment.status = "completed"
-    db_assignment.returned_at = datetime.utcnow()
-    
-    # Update asset status
-    db_asset = get_asset(db, asset_id=asset_id)
-    db_asset.status = "available"
-    db_asset.current_project_id = None
-    db_asset.assigned_user_id = None
-    db_asset.updated_at = datetime.utcnow()
-    
+    return db.get(models.AssetAssignment, released[asset_id][-1])
+
+def assign_assets(db: Session, batch: schemas.AssetBatchAssign) -> schemas.AssetBatchResult:
+    asset_ids = list(dict.fromkeys(batch.asset_ids))
+    claimed = _claim_assets(db, asset_ids, batch)
+    if batch.all_or_nothing and len(claimed) < len(asset_ids):
+        db.rollback()
+        result = _batch_result(db, asset_ids, {}, "Asset is not available for assignment")
+        for item in result.results:
+            if item.asset_id in claimed:
+                item.detail = "Not assigned because other assets in the batch were not available"
+        return result
+    result = _batch_result(
+        db, asset_ids, {asset_id: [assignment_id] for asset_id, assignment_id in claimed.items()},
+        "Asset is not available for assignment"
+    )
+    db.commit()
+    return result
+
+def release_assets(db: Session, batch: schemas.AssetBatchRelease) -> schemas.AssetBatchResult:
+    asset_ids = list(dict.fromkeys(batch.asset_ids))
+    released = _release_assets(db, asset_ids)
+    result = _batch_result(db, asset_ids, released, "Asset is not currently assigned")
+    db.commit()
+    return result
+
+# Statuses owned by assignments; the batch status update would leave AssetAssignment out of step
+ASSIGNMENT_STATUSES = ("assigned", "available")
+
+def update_assets_status(db: Session, batch: schemas.AssetBatchStatusUpdate) -> schemas.AssetBatchResult:
+    """Set a non-assignment status on many assets; use assign_assets/release_assets for the others"""
+    if batch.status in ASSIGNMENT_STATUSES:
+        raise ValueError(f"Status '{batch.status}' is set by assigning or releasing assets")
+    asset_ids = list(dict.fromkeys(batch.asset_ids))
+    updated = db.execute(
+        update(models.Asset)
+        .where(models.Asset.id.in_(asset_ids), models.Asset.is_active == True)
+        .values(status=batch.status, updated_at=datetime.utcnow())
+        .returning(models.Asset.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    result = _batch_result(db, asset_ids, {asset_id: [] for asset_id in updated}, "Asset not found")
     db.commit()
-    db.refresh(db_assignment)
-    return db_assignment
+    return result
 
 def get_asset_categories(db: Session):
     return db.query(models.Category).all()
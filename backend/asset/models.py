@@ -1,5 +1,7 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, DateTime, Text, JSON
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, Date, DateTime, Text, JSON, DDL, Index, event, literal_column
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship
+from sqlalchemy.schema import CreateIndex
 from datetime import datetime
 from database import Base
 
@@ -41,6 +43,80 @@ class Asset(Base):
     images = relationship("AssetImage", back_populates="asset")
     assignments = relationship("AssetAssignment", back_populates="asset")
     inspection_records = relationship("InspectionRecord", back_populates="asset")
+    
+    # Indexes for the filters crud.get_assets combines. Every listing query is
+    # restricted to active rows, so the hot indexes are partial on is_active.
+    __table_args__ = (
+        Index("ix_assets_active_id", "id",
+              postgresql_where=is_active == True, sqlite_where=is_active == True),
+        Index("ix_assets_active_status_id", "status", "id",
+              postgresql_where=is_active == True, sqlite_where=is_active == True),
+        Index("ix_assets_active_status_category", "status", "category",
+              postgresql_where=is_active == True, sqlite_where=is_active == True),
+        Index("ix_assets_active_category", "category",
+              postgresql_where=is_active == True, sqlite_where=is_active == True),
+        Index("ix_assets_active_project_status", "current_project_id", "status",
+              postgresql_where=is_active == True, sqlite_where=is_active == True),
+        # Keyset pagination sort keys
+        Index("ix_assets_active_name_id", "name", "id",
+              postgresql_where=is_active == True, sqlite_where=is_active == True),
+        Index("ix_assets_active_created_at_id", "created_at", "id",
+              postgresql_where=is_active == True, sqlite_where=is_active == True),
+        Index("ix_assets_active_updated_at_id", "updated_at", "id",
+              postgresql_where=is_active == True, sqlite_where=is_active == True),
+        Index("ix_assets_assigned_user_id", "assigned_user_id"),
+    )
+
+# Asset search (PostgreSQL only)
+#
+# search_vector is a stored generated tsvector maintained by the database, and
+# the free-text columns carry trigram indexes so substring matches stay
+# index-backed. None of this exists on SQLite, where crud falls back to ilike.
+ASSET_SEARCH_CONFIG = "simple"
+# Column -> tsvector weight; identifiers rank above maker/model text
+ASSET_SEARCH_COLUMNS = {
+    "name": "A",
+    "serial_number": "A",
+    "manufacturer": "B",
+    "model": "B",
+}
+
+asset_search_vector = literal_column("assets.search_vector", TSVECTOR)
+
+# Search DDL. create_all only runs for tables it creates, so these are
+# written to be idempotent and applied by upgrade_schema on every startup,
+# which also brings databases created before search existed up to date.
+ASSET_SEARCH_DDL = (
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+    DDL(
+        "ALTER TABLE assets ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS (" + " || ".join(
+            f"setweight(to_tsvector('{ASSET_SEARCH_CONFIG}', coalesce({column}, '')), '{weight}')"
+            for column, weight in ASSET_SEARCH_COLUMNS.items()
+        ) + ") STORED"
+    ),
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_assets_search_vector "
+        "ON assets USING gin (search_vector)"
+    ),
+)
+
+# The trigram indexes below need the extension before create_all builds a new table
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+ASSET_TRIGRAM_INDEXES = [
+    Index(
+        f"ix_assets_{_column}_trgm",
+        getattr(Asset, _column),
+        postgresql_using="gin",
+        postgresql_ops={_column: "gin_trgm_ops"}
+    ).ddl_if(dialect="postgresql")
+    for _column in ASSET_SEARCH_COLUMNS
+]
 
 class Project(Base):
     __tablename__ = "projects"
@@ -64,7 +140,7 @@ class MaintenanceRecord(Base):
     __tablename__ = "maintenance_records"
 
     id = Column(Integer, primary_key=True, index=True)
-    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)  # indexed by ix_maintenance_records_asset_performed_at
     maintenance_type = Column(String(50), nullable=False)  # preventive, corrective, etc.
     description = Column(Text)
     performed_by = Column(String(255))
@@ -76,12 +152,17 @@ class MaintenanceRecord(Base):
     
     # Relationships
     asset = relationship("Asset", back_populates="maintenance_records")
+    
+    __table_args__ = (
+        # Maintenance history is read per asset, newest first
+        Index("ix_maintenance_records_asset_performed_at", "asset_id", "performed_at"),
+    )
 
 class AssetDocument(Base):
     __tablename__ = "asset_documents"
 
     id = Column(Integer, primary_key=True, index=True)
-    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False, index=True)
     name = Column(String(255), nullable=False)
     document_type = Column(String(50))  # manual, certificate, invoice, etc.
     file_path = Column(String(255), nullable=False)
@@ -95,7 +176,7 @@ class AssetImage(Base):
     __tablename__ = "asset_images"
 
     id = Column(Integer, primary_key=True, index=True)
-    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False, index=True)
     file_path = Column(String(255), nullable=False)
     caption = Column(String(255))
     upload_date = Column(DateTime, default=datetime.utcnow)
@@ -107,9 +188,9 @@ class AssetAssignment(Base):
     __tablename__ = "asset_assignments"
 
     id = Column(Integer, primary_key=True, index=True)
-    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     assigned_at = Column(DateTime, default=datetime.utcnow)
     returned_at = Column(DateTime, nullable=True)
     status = Column(String(50), default="active")
@@ -119,12 +200,18 @@ class AssetAssignment(Base):
     asset = relationship("Asset", back_populates="assignments")
     project = relationship("Project")
     user = relationship("User")
+    
+    __table_args__ = (
+        # release_asset looks up the open assignment for an asset
+        Index("ix_asset_assignments_open", "asset_id",
+              postgresql_where=returned_at == None, sqlite_where=returned_at == None),
+    )
 
 class InspectionRecord(Base):
     __tablename__ = "inspection_records"
 
     id = Column(Integer, primary_key=True, index=True)
-    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False, index=True)
     inspection_type = Column(String(50), nullable=False)
     performed_by = Column(String(255))
     performed_at = Column(DateTime, default=datetime.utcnow)
@@ -135,6 +222,34 @@ class InspectionRecord(Base):
     # Relationships
     asset = relationship("Asset", back_populates="inspection_records")
 
+# Utilization rollups
+#
+# Telemetry state samples are folded into these on write, so utilization
+# reads sum a handful of rollup rows instead of scanning raw points. Hourly
+# rows cover the partial days at the edges of a range, daily rows the rest.
+class AssetUsageHourly(Base):
+    __tablename__ = "asset_usage_hourly"
+
+    asset_id = Column(Integer, ForeignKey("assets.id"), primary_key=True)
+    hour = Column(DateTime, primary_key=True)  # start of the hour, UTC
+    used_seconds = Column(Float, nullable=False, default=0)
+    idle_seconds = Column(Float, nullable=False, default=0)
+    downtime_seconds = Column(Float, nullable=False, default=0)
+
+class AssetUsageDaily(Base):
+    __tablename__ = "asset_usage_daily"
+
+    asset_id = Column(Integer, ForeignKey("assets.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    used_seconds = Column(Float, nullable=False, default=0)
+    idle_seconds = Column(Float, nullable=False, default=0)
+    downtime_seconds = Column(Float, nullable=False, default=0)
+    
+    __table_args__ = (
+        # Fleet-wide range scans read by day first
+        Index("ix_asset_usage_daily_day", "day"),
+    )
+
 class Category(Base):
     __tablename__ = "asset_categories"
 
@@ -149,4 +264,24 @@ class AssetType(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False, unique=True)
     description = Column(Text)
-    category_id = Column(Integer, ForeignKey("asset_categories.id"), nullable=True)
\ No newline at end of file
+    category_id = Column(Integer, ForeignKey("asset_categories.id"), nullable=True)
+
+def upgrade_schema(bind):
+    """
+    Apply schema additions that create_all skips on existing tables.
+    
+    Every statement checks for the object first, so this is safe to run on
+    each startup against new and existing databases.
+    """
+    with bind.begin() as connection:
+        postgresql = connection.dialect.name == "postgresql"
+        if postgresql:
+            for statement in ASSET_SEARCH_DDL:
+                connection.execute(statement)
+        
+        # Indexes declared on the models, including ones added after a table was created
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                if index in ASSET_TRIGRAM_INDEXES and not postgresql:
+                    continue
+                connection.execute(CreateIndex(index, if_not_exists=True))
@@ -1,6 +1,6 @@
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import date, datetime
 
 # Base schemas
 class MaintenanceRecordBase(BaseModel):
@@ -195,6 +195,45 @@ class AssetDetail(Asset):
     class Config:
         orm_mode = True
 
+class AssetPage(BaseModel):
+    items: List[Asset] = []
+    next_cursor: Optional[str] = None
+
+class AssetBatchStatusUpdate(BaseModel):
+    asset_ids: List[int] = Field(..., min_items=1, max_items=1000)
+    status: str
+
+class AssetBatchAssign(AssetAssignmentBase):
+    asset_ids: List[int] = Field(..., min_items=1, max_items=1000)
+    # Assign none of the assets unless all of them are available
+    all_or_nothing: bool = False
+
+class AssetBatchRelease(BaseModel):
+    asset_ids: List[int] = Field(..., min_items=1, max_items=1000)
+
+class AssetBatchItemResult(BaseModel):
+    asset_id: int
+    success: bool
+    detail: Optional[str] = None
+    assignment_id: Optional[int] = None
+    # Every assignment a release closed; assignment_id is the latest of them
+    assignment_ids: List[int] = []
+
+class AssetBatchResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[AssetBatchItemResult] = []
+
+class AssetImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+class AssetImportResult(BaseModel):
+    total: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: List[AssetImportError] = []
+
 class AssetDelete(BaseModel):
     id: int
     deleted: bool
@@ -209,4 +248,36 @@ class AssetUtilization(BaseModel):
     downtime_hours: Optional[float] = None
     
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class AssetTelemetrySample(BaseModel):
+    started_at: datetime
+    duration_seconds: float = Field(..., gt=0, le=86400)
+    state: str = Field(..., regex="^(running|idle|down)$")
+
+class AssetTelemetryBatch(BaseModel):
+    samples: List[AssetTelemetrySample] = Field(..., min_items=1, max_items=10000)
+
+class AssetTelemetryRecorded(BaseModel):
+    asset_id: int
+    recorded: int
+
+class FleetUtilizationGroup(BaseModel):
+    group: Optional[str] = None
+    bucket: str
+    asset_count: int
+    hours_used: float
+    idle_hours: float
+    downtime_hours: float
+    utilization_rate: float
+
+class FleetUtilization(BaseModel):
+    start_date: date
+    end_date: date
+    group_by: str
+    bucket: str
+    utilization_rate: float
+    total_hours_used: float
+    idle_hours: float
+    downtime_hours: float
+    groups: List[FleetUtilizationGroup] = []
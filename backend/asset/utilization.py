@@ -0,0 +1,257 @@
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from sqlalchemy import Date, func, select, union_all
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+import models
+import schemas
+
+# Telemetry state -> rollup column
+USAGE_COLUMNS = {
+    "running": "used_seconds",
+    "idle": "idle_seconds",
+    "down": "downtime_seconds",
+}
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+def _floor_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+def _ceil_hour(value: datetime) -> datetime:
+    floored = _floor_hour(value)
+    return floored if floored == value else floored + HOUR
+
+def _split_by_hour(started_at: datetime, seconds: float) -> Iterable[Tuple[datetime, float]]:
+    """Split an interval into (hour start, seconds inside that hour) pieces"""
+    position = started_at
+    end = started_at + timedelta(seconds=seconds)
+    while position < end:
+        hour = _floor_hour(position)
+        piece_end = min(end, hour + HOUR)
+        yield hour, (piece_end - position).total_seconds()
+        position = piece_end
+
+def _upsert_increments(db: Session, model, key_columns: List[str], rows: List[Dict]):
+    """Add each row's usage seconds onto the existing rollup row, creating it if needed"""
+    if not rows:
+        return
+    
+    insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={
+            column: getattr(model, column) + getattr(stmt.excluded, column)
+            for column in USAGE_COLUMNS.values()
+        }
+    )
+    db.execute(stmt, rows)
+
+def record_usage(db: Session, asset_id: int, samples: List[schemas.AssetTelemetrySample]) -> int:
+    """Fold telemetry state samples into the hourly and daily rollups"""
+    hourly = defaultdict(lambda: dict.fromkeys(USAGE_COLUMNS.values(), 0.0))
+    daily = defaultdict(lambda: dict.fromkeys(USAGE_COLUMNS.values(), 0.0))
+    
+    for sample in samples:
+        # Rollups are keyed in naive UTC like the rest of the schema
+        started_at = sample.started_at
+        if started_at.tzinfo is not None:
+            started_at = started_at.astimezone(timezone.utc).replace(tzinfo=None)
+        column = USAGE_COLUMNS[sample.state]
+        for hour, seconds in _split_by_hour(started_at, sample.duration_seconds):
+            hourly[hour][column] += seconds
+            daily[hour.date()][column] += seconds
+    
+    _upsert_increments(db, models.AssetUsageHourly, ["asset_id", "hour"], [
+        dict(asset_id=asset_id, hour=hour, **usage) for hour, usage in hourly.items()
+    ])
+    _upsert_increments(db, models.AssetUsageDaily, ["asset_id", "day"], [
+        dict(asset_id=asset_id, day=day, **usage) for day, usage in daily.items()
+    ])
+    db.commit()
+    return len(samples)
+
+def _rate(used: float, idle: float, downtime: float) -> float:
+    tracked = used + idle + downtime
+    return round(used / tracked * 100, 2) if tracked else 0.0
+
+def _bucket_expression(dialect: str, bucket: str, column):
+    if bucket == "day":
+        return column
+    if dialect == "postgresql":
+        return func.date(func.date_trunc(bucket, column))
+    # SQLite stores dates as ISO text; weeks start on Monday like date_trunc
+    if bucket == "week":
+        return func.date(column, "weekday 0", "-6 days")
+    return func.strftime("%Y-%m-01", column)
+
+def _bucket_key(value) -> str:
+    return value.isoformat() if isinstance(value, date) else str(value)[:10]
+
+def _usage_rows(asset_id: int, start: datetime, end: datetime):
+    """
+    (day, used, idle, downtime) rows covering [start, end), which must fall on hour boundaries.
+    
+    Whole days come straight from the daily rollup; the partial days at
+    either edge come from the hourly rollup.
+    """
+    hourly = models.AssetUsageHourly
+    
+    def hourly_rows(range_start: datetime, range_end: datetime):
+        return select(
+            func.date(hourly.hour, type_=Date).label("day"),
+            hourly.used_seconds,
+            hourly.idle_seconds,
+            hourly.downtime_seconds
+        ).where(
+            hourly.asset_id == asset_id,
+            hourly.hour >= range_start,
+            hourly.hour < range_end
+        )
+    
+    first_full_day = start.replace(hour=0)
+    if first_full_day < start:
+        first_full_day += DAY
+    last_full_day_end = end.replace(hour=0)
+    if first_full_day >= last_full_day_end:
+        return hourly_rows(start, end)
+    
+    daily = models.AssetUsageDaily
+    return union_all(
+        select(
+            daily.day.label("day"),
+            daily.used_seconds,
+            daily.idle_seconds,
+            daily.downtime_seconds
+        ).where(
+            daily.asset_id == asset_id,
+            daily.day >= first_full_day.date(),
+            daily.day < last_full_day_end.date()
+        ),
+        hourly_rows(start, first_full_day),
+        hourly_rows(last_full_day_end, end)
+    )
+
+def get_asset_utilization(
+    db: Session,
+    asset_id: int,
+    start_dt: datetime,
+    end_dt: datetime
+) -> schemas.AssetUtilization:
+    """
+    Utilization for one asset over [start_dt, end_dt), read from the rollups.
+    
+    The hourly rollup is the finest grain kept, so the range is widened to
+    whole hours: start_dt is rounded down and end_dt up to the hour.
+    Rates are the share of tracked time the asset was running. Days and
+    months without telemetry are left out rather than reported as zero.
+    """
+    usage = _usage_rows(asset_id, _floor_hour(start_dt), _ceil_hour(end_dt)).subquery()
+    sums = (
+        func.sum(usage.c.used_seconds),
+        func.sum(usage.c.idle_seconds),
+        func.sum(usage.c.downtime_seconds)
+    )
+    month = _bucket_expression(db.get_bind().dialect.name, "month", usage.c.day)
+    
+    daily = db.execute(select(usage.c.day, *sums).group_by(usage.c.day).order_by(usage.c.day)).all()
+    monthly = db.execute(select(month, *sums).group_by(month).order_by(month)).all()
+    
+    total_used = sum(used for _, used, _, _ in monthly)
+    total_idle = sum(idle for _, _, idle, _ in monthly)
+    total_downtime = sum(downtime for _, _, _, downtime in monthly)
+    
+    return schemas.AssetUtilization(
+        asset_id=asset_id,
+        utilization_rate=_rate(total_used, total_idle, total_downtime),
+        daily_utilization={_bucket_key(day): _rate(*values) for day, *values in daily},
+        monthly_utilization={_bucket_key(month_start)[:7]: _rate(*values) for month_start, *values in monthly},
+        total_hours_used=round(total_used / 3600, 2),
+        idle_hours=round(total_idle / 3600, 2),
+        downtime_hours=round(total_downtime / 3600, 2)
+    )
+
+# Fleet utilization
+FLEET_GROUP_COLUMNS = {
+    "category": models.Asset.category,
+    "type": models.Asset.type,
+    # Assets are grouped by their current project, not the one they were on that day
+    "project": models.Asset.current_project_id,
+}
+
+def get_fleet_utilization(
+    db: Session,
+    start_day: date,
+    end_day: date,
+    group_by: str = "category",
+    bucket: str = "day",
+    project_id: Optional[int] = None,
+    category: Optional[str] = None,
+    asset_type: Optional[str] = None
+) -> schemas.FleetUtilization:
+    """
+    Utilization for every active asset matching the filters over [start_day, end_day],
+    grouped by category, type or project and a date bucket.
+    
+    The grouping and sums run as one GROUP BY over the daily rollup, so the
+    cost does not depend on how many assets are in each group.
+    """
+    group_column = FLEET_GROUP_COLUMNS[group_by]
+    bucket_column = _bucket_expression(db.get_bind().dialect.name, bucket, models.AssetUsageDaily.day)
+    
+    stmt = (
+        select(
+            group_column.label("group_key"),
+            bucket_column.label("bucket"),
+            func.count(func.distinct(models.AssetUsageDaily.asset_id)),
+            func.sum(models.AssetUsageDaily.used_seconds),
+            func.sum(models.AssetUsageDaily.idle_seconds),
+            func.sum(models.AssetUsageDaily.downtime_seconds)
+        )
+        .join(models.Asset, models.Asset.id == models.AssetUsageDaily.asset_id)
+        .where(
+            models.Asset.is_active == True,
+            models.AssetUsageDaily.day >= start_day,
+            models.AssetUsageDaily.day <= end_day
+        )
+        .group_by(group_column, bucket_column)
+        .order_by(bucket_column, group_column)
+    )
+    if project_id:
+        stmt = stmt.where(models.Asset.current_project_id == project_id)
+    if category:
+        stmt = stmt.where(models.Asset.category == category)
+    if asset_type:
+        stmt = stmt.where(models.Asset.type == asset_type)
+    
+    groups = []
+    total_used = total_idle = total_downtime = 0.0
+    for group_key, bucket_value, asset_count, used, idle, downtime in db.execute(stmt):
+        groups.append(schemas.FleetUtilizationGroup(
+            group=None if group_key is None else str(group_key),
+            bucket=_bucket_key(bucket_value),
+            asset_count=asset_count,
+            hours_used=round(used / 3600, 2),
+            idle_hours=round(idle / 3600, 2),
+            downtime_hours=round(downtime / 3600, 2),
+            utilization_rate=_rate(used, idle, downtime)
+        ))
+        total_used += used
+        total_idle += idle
+        total_downtime += downtime
+    
+    return schemas.FleetUtilization(
+        start_date=start_day,
+        end_date=end_day,
+        group_by=group_by,
+        bucket=bucket,
+        utilization_rate=_rate(total_used, total_idle, total_downtime),
+        total_hours_used=round(total_used / 3600, 2),
+        idle_hours=round(total_idle / 3600, 2),
+        downtime_hours=round(total_downtime / 3600, 2),
+        groups=groups
+    )
@@ -2,25 +2,35 @@
 from datetime import datetime, timedelta
 import os
 import json
-import httpx
 import asyncio
-from typing import List, Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
 
 import models
 import schemas
 import crud
+from alert_rules import NORMAL, SEVERITY_NAMES, Rule, RuleSet, message_time
+from alert_state import AlertRecord, AlertStateSnapshotter, ShardedAlertStateStore, make_key, snapshot_backend_from_environment
+from device_cache import DeviceCache
+from notification_dispatcher import NotificationDispatcher
 
 class AlertProcessor:
     def __init__(self, db: Session):
         self.db = db
         self.alert_thresholds = self._load_alert_thresholds()
+        self.rules = RuleSet.load(self.alert_thresholds)
         self.notification_endpoints = self._load_notification_endpoints()
-        self.active_alerts = {}  # device_id -> {alert_type -> alert_data}
+        self.notifications = NotificationDispatcher(self.notification_endpoints)
+        self.alert_state = ShardedAlertStateStore.from_environment()
+        backend = snapshot_backend_from_environment()
+        self.snapshotter = AlertStateSnapshotter(self.alert_state, backend) if backend else None
+        # The session is shared by device lookups and alert writes, both run in executor threads
+        self._db_lock = threading.Lock()
+        self.device_cache = DeviceCache.from_environment(self._load_device)
         
     def _load_alert_thresholds(self) -> Dict[str, Dict[str, Any]]:
-        """Load alert thresholds from configuration"""
-        # In a real application, this would load from a database or config file
+        """Default alert thresholds; ALERT_RULES_FILE can override them (see alert_rules.RuleSet)"""
         return {
             "temperature": {
                 "warning": 75,  # degrees Celsius
@@ -40,11 +50,13 @@ class AlertProcessor:
             "fuel_level": {
                 "warning": 15,  # percent
                 "critical": 5,
+                "direction": "below",
                 "duration": 0,  # immediate
             },
             "battery": {
                 "warning": 20,  # percent
                 "critical": 10,
+                "direction": "below",
                 "duration": 0,  # immediate
             },
             "utilization": {
@@ -72,41 +84,78 @@ class AlertProcessor:
             "webhook": os.environ.get("WEBHOOK_NOTIFICATION_ENDPOINT", "http://notification-service/webhook"),
         }
     
+    async def start(self) -> None:
+        """Restore persisted alert state and start periodic snapshots"""
+        if self.snapshotter:
+            await self.snapshotter.start()
+    
+    async def close(self) -> None:
+        """Flush queued notifications, release the HTTP client and save alert state"""
+        await self.notifications.stop()
+        if self.snapshotter:
+            await self.snapshotter.stop()
+    
+    def _load_device(self, device_id: str):
+        with self._db_lock:
+            return crud.get_device(self.db, device_id)
+    
+    async def invalidate_device(self, device_id: str) -> None:
+        """Drop cached metadata for a device; call whenever a device is updated or deleted"""
+        await self.device_cache.invalidate(device_id)
+    
     async def process_telemetry(self, device_id: str, telemetry: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Process telemetry data and generate alerts if thresholds are exceeded"""
-        alerts = []
-        
-        # Get device information
-        device = crud.get_device(self.db, device_id)
-        if not device:
-            return alerts
+        return await self.process_telemetry_batch([(device_id, telemetry)])
+    
+    async def process_telemetry_batch(self, batch: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Process a batch of (device_id, telemetry) messages in arrival order
         
-        # Process each sensor reading
-        timestamp = telemetry.get("timestamp") or datetime.utcnow().isoformat()
-        readings = telemetry.get("readings", {})
+        Each device is looked up once per batch, thresholds are evaluated for
+        every reading, and the resulting alert changes are written in one pass
+        off the event loop before notifications go out.
+        """
+        by_device: Dict[str, List[Dict[str, Any]]] = {}
+        for device_id, telemetry in batch:
+            by_device.setdefault(device_id, []).append(telemetry)
         
-        for sensor_type, value in readings.items():
-            if sensor_type in self.alert_thresholds:
-                threshold = self.alert_thresholds[sensor_type]
-                
-                # Check if the value exceeds any thresholds
-                alert_data = self._check_threshold(
-                    device_id=device_id,
-                    device_name=device.name,
-                    sensor_type=sensor_type,
-                    value=value,
-                    threshold=threshold,
-                    timestamp=timestamp
-                )
+        transitions = []
+        for device_id, messages in by_device.items():
+            # Get device information
+            device = await self.device_cache.get(device_id)
+            if not device:
+                continue
+            
+            rules = self.rules.rules_for(device_id, device.asset_type)
+            for telemetry in messages:
+                timestamp, epoch = message_time(telemetry)
+                readings = telemetry.get("readings", {})
                 
-                if alert_data:
-                    # Create or update the alert in the database
-                    alert = await self._create_or_update_alert(alert_data)
-                    if alert:
-                        alerts.append(alert)
-                        
-                        # Send notification for the alert
-                        await self._send_notification(alert)
+                for sensor_type, value in readings.items():
+                    rule = rules.get(sensor_type)
+                    if rule is not None:
+                        # Check if the value crosses any thresholds
+                        alert_data = self._check_threshold(
+                            device_id=device_id,
+                            device_name=device.name,
+                            sensor_type=sensor_type,
+                            value=value,
+                            rule=rule,
+                            timestamp=timestamp,
+                            epoch=epoch
+                        )
+                        if alert_data:
+                            transitions.append(alert_data)
+        
+        if not transitions:
+            return []
+        
+        # Create or update the alerts in the database
+        loop = asyncio.get_running_loop()
+        alerts = await loop.run_in_executor(None, self._write_alerts, transitions)
+        
+        # Send notifications for the alerts
+        for alert in alerts:
+            await self._send_notification(alert)
         
         return alerts
     
@@ -116,90 +165,76 @@ class AlertProcessor:
         device_name: str,
         sensor_type: str, 
         value: Any, 
-        threshold: Dict[str, Any],
-        timestamp: str
+        rule: Rule,
+        timestamp: str,
+        epoch: float
     ) -> Optional[Dict[str, Any]]:
-        """Check if a sensor reading exceeds the configured thresholds"""
-        alert_key = f"{device_id}_{sensor_type}"
+        """Feed a reading to its rule and return alert data when the alert level changes"""
+        alert_key = make_key(device_id, sensor_type)
+        record = self.alert_state.get(alert_key)
+        new_record = record is None
+        if new_record:
+            record = AlertRecord(device_name=device_name)
         
-        # Handle special case for boolean triggers (motion, geofence)
-        if "unexpected" in threshold or "exit" in threshold:
-            trigger_key = "unexpected" if "unexpected" in threshold else "exit"
-            if value == threshold[trigger_key]:
-                return {
-                    "device_id": device_id,
-                    "device_name": device_name,
-                    "sensor_type": sensor_type,
-                    "value": value,
-                    "threshold_value": threshold[trigger_key],
-                    "severity": "warning",
-                    "message": f"Unexpected {sensor_type} detected for {device_name}",
-                    "timestamp": timestamp
-                }
-            return None
-        
-        # Handle numeric thresholds
-        severity = None
-        threshold_value = None
+        previous_level = record.level
+        level = rule.evaluate(value, epoch, record)
         
-        if "critical" in threshold and value >= threshold["critical"]:
-            severity = "critical"
-            threshold_value = threshold["critical"]
-        elif "warning" in threshold and value >= threshold["warning"]:
-            severity = "warning"
-            threshold_value = threshold["warning"]
+        if record.is_idle():
+            # Only pairs with a pending or active alert keep a record
+            if not new_record:
+                self.alert_state.delete(alert_key)
+        elif new_record or level is not None:
+            if not self.alert_state.put(alert_key, record):
+                print(f"Alert state store full, not tracking {sensor_type} on {device_id}")
         
-        if severity:
-            # If this is a new alert or escalation, create it
-            existing_alert = self.active_alerts.get(alert_key)
-            if not existing_alert or existing_alert["severity"] != severity:
-                alert_data = {
-                    "device_id": device_id,
-                    "device_name": device_name,
-                    "sensor_type": sensor_type,
-                    "value": value,
-                    "threshold_value": threshold_value,
-                    "severity": severity,
-                    "message": self._generate_alert_message(
-                        device_name, sensor_type, value, threshold_value, severity
-                    ),
-                    "timestamp": timestamp
-                }
-                
-                # Store in active alerts
-                self.active_alerts[alert_key] = alert_data
-                return alert_data
-            
-            # Update existing alert with new value
-            existing_alert["value"] = value
-            existing_alert["timestamp"] = timestamp
+        if level is None:
+            # Same level as before: keep the active alert's latest reading
+            if record.level != NORMAL:
+                record.value = value
+                record.timestamp = timestamp
             return None
-        else:
-            # If value is below thresholds and there was an active alert, resolve it
-            if alert_key in self.active_alerts:
-                alert_data = self.active_alerts[alert_key].copy()
-                alert_data["resolved"] = True
-                alert_data["resolved_timestamp"] = datetime.utcnow().isoformat()
-                
-                # Remove from active alerts
-                del self.active_alerts[alert_key]
-                return alert_data
         
-        return None
-    
-    def _generate_alert_message(
-        self, device_name: str, sensor_type: str, value: Any, threshold: Any, severity: str
-    ) -> str:
-        """Generate a human-readable alert message"""
-        sensor_name = sensor_type.replace("_", " ").title()
+        if level == NORMAL:
+            # Back within thresholds: resolve the active alert
+            return {
+                "device_id": device_id,
+                "device_name": record.device_name,
+                "sensor_type": sensor_type,
+                "value": record.value,
+                "threshold_value": rule.threshold_for(previous_level),
+                "severity": SEVERITY_NAMES[previous_level],
+                "message": rule.message(record.device_name, record.value, previous_level),
+                "timestamp": record.timestamp,
+                "resolved": True,
+                "resolved_timestamp": datetime.utcnow().isoformat()
+            }
         
-        if severity == "critical":
-            return f"CRITICAL: {sensor_name} on {device_name} is {value}, exceeding critical threshold of {threshold}"
-        else:
-            return f"WARNING: {sensor_name} on {device_name} is {value}, exceeding warning threshold of {threshold}"
+        # New alert, escalation or de-escalation
+        record.device_name = device_name
+        record.value = value
+        record.timestamp = timestamp
+        return {
+            "device_id": device_id,
+            "device_name": device_name,
+            "sensor_type": sensor_type,
+            "value": value,
+            "threshold_value": rule.threshold_for(level),
+            "severity": SEVERITY_NAMES[level],
+            "message": rule.message(device_name, value, level),
+            "timestamp": timestamp
+        }
     
-    async def _create_or_update_alert(self, alert_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Create a new alert or update an existing one in the database"""
+    def _write_alerts(self, transitions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Write a batch of alert changes in order; runs in an executor thread"""
+        alerts = []
+        with self._db_lock:
+            for alert_data in transitions:
+                alert = self._write_alert(alert_data)
+                if alert:
+                    alerts.append(alert)
+        return alerts
+    
+    def _write_alert(self, alert_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         try:
             # Check for existing unresolved alert for this device and sensor type
             device_id = alert_data["device_id"]
@@ -254,42 +289,20 @@ class AlertProcessor:
             return None
     
     async def _send_notification(self, alert: Dict[str, Any]) -> None:
-        """Send notifications for an alert via configured channels"""
-        try:
-            # Skip notifications for resolved alerts
-            if alert.get("resolved"):
-                return
-            
-            # Prepare notification payload
-            notification = {
-                "alert_id": alert["id"],
-                "device_id": alert["device_id"],
-                "device_name": alert["device_name"],
-                "message": alert["message"],
-                "severity": alert["severity"],
-                "timestamp": alert.get("created_at", datetime.utcnow().isoformat())
-            }
-            
-            # Determine which channels to use based on severity
-            channels = ["push"]  # Always send push notifications
-            
-            if alert["severity"] == "critical":
-                channels.extend(["email", "sms"])
-            
-            # Send to each channel
-            for channel in channels:
-                if channel in self.notification_endpoints:
-                    try:
-                        async with httpx.AsyncClient() as client:
-                            response = await client.post(
-                                self.notification_endpoints[channel],
-                                json=notification,
-                                timeout=5.0
-                            )
-                            if response.status_code != 200:
-                                print(f"Failed to send {channel} notification: {response.text}")
-                    except Exception as e:
-                        print(f"Error sending {channel} notification: {e}")
-            
-        except Exception as e:
-            print(f"Error in send_notification: {e}")
\ No newline at end of file
+        """Queue notifications for an alert; delivery happens in the dispatcher"""
+        # Skip notifications for resolved alerts
+        if alert.get("resolved"):
+            return
+        
+        # Prepare notification payload
+        notification = {
+            "alert_id": alert["id"],
+            "device_id": alert["device_id"],
+            "device_name": alert["device_name"],
+            "sensor_type": alert["sensor_type"],
+            "message": alert["message"],
+            "severity": alert["severity"],
+            "timestamp": alert.get("created_at", datetime.utcnow().isoformat())
+        }
+        
+        self.notifications.submit(notification)
@@ -0,0 +1,257 @@
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple, Union
+
+# Alert levels, ordered by severity
+NORMAL = 0
+WARNING = 1
+CRITICAL = 2
+
+SEVERITY_NAMES = {WARNING: "warning", CRITICAL: "critical"}
+
+# Keys that turn a threshold spec into a boolean trigger rule
+TRIGGER_KEYS = ("unexpected", "exit")
+
+class RuleState:
+    """Evaluation state for one (device, sensor) pair
+    
+    warning_since / critical_since hold the timestamp at which the reading
+    started to satisfy that level's threshold, or None while it does not.
+    A level is confirmed once its condition has held for the rule's duration.
+    """
+    __slots__ = ("level", "warning_since", "critical_since")
+    
+    def __init__(self, level: int = NORMAL, warning_since: Optional[float] = None, critical_since: Optional[float] = None):
+        self.level = level
+        self.warning_since = warning_since
+        self.critical_since = critical_since
+    
+    def is_idle(self) -> bool:
+        return self.level == NORMAL and self.warning_since is None and self.critical_since is None
+
+class ThresholdRule:
+    """Numeric warning/critical thresholds with hysteresis and debounce
+    
+    direction is "above" when high readings are bad (temperature) and "below"
+    when low readings are bad (fuel level). Readings are multiplied by
+    sign so both directions reduce to the same "value >= threshold" test.
+    A level is entered when the reading crosses its threshold and left only
+    once it is back past the threshold by more than hysteresis.
+    """
+    __slots__ = (
+        "sensor_type", "warning", "critical", "direction", "hysteresis", "duration",
+        "sign", "warning_enter", "warning_exit", "critical_enter", "critical_exit"
+    )
+    kind = "threshold"
+    
+    def __init__(
+        self,
+        sensor_type: str,
+        warning: Optional[float] = None,
+        critical: Optional[float] = None,
+        direction: str = "above",
+        hysteresis: float = 0.0,
+        duration: float = 0.0
+    ):
+        if direction not in ("above", "below"):
+            raise ValueError(f"Invalid direction for {sensor_type}: {direction}")
+        
+        self.sensor_type = sensor_type
+        self.warning = warning
+        self.critical = critical
+        self.direction = direction
+        self.hysteresis = hysteresis
+        self.duration = duration
+        self.sign = 1.0 if direction == "above" else -1.0
+        
+        # Unset levels compare against infinity so they never trigger
+        inf = float("inf")
+        self.warning_enter = self.sign * warning if warning is not None else inf
+        self.warning_exit = self.warning_enter - hysteresis
+        self.critical_enter = self.sign * critical if critical is not None else inf
+        self.critical_exit = self.critical_enter - hysteresis
+    
+    def threshold_for(self, level: int) -> Optional[float]:
+        return self.critical if level == CRITICAL else self.warning
+    
+    def evaluate(self, value: Any, timestamp: float, state: RuleState) -> Optional[int]:
+        """Update state with a reading; returns the new level if it changed, else None"""
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        
+        v = self.sign * value
+        if v >= self.warning_enter:
+            if state.warning_since is None:
+                state.warning_since = timestamp
+        elif v < self.warning_exit:
+            state.warning_since = None
+        
+        if v >= self.critical_enter:
+            if state.critical_since is None:
+                state.critical_since = timestamp
+        elif v < self.critical_exit:
+            state.critical_since = None
+        
+        if state.critical_since is not None and timestamp - state.critical_since >= self.duration:
+            level = CRITICAL
+        elif state.warning_since is not None and timestamp - state.warning_since >= self.duration:
+            level = WARNING
+        else:
+            level = NORMAL
+        
+        if level == state.level:
+            return None
+        state.level = level
+        return level
+    
+    def message(self, device_name: str, value: Any, level: int) -> str:
+        sensor_name = self.sensor_type.replace("_", " ").title()
+        relation = "exceeding" if self.direction == "above" else "below"
+        if level == CRITICAL:
+            return f"CRITICAL: {sensor_name} on {device_name} is {value}, {relation} critical threshold of {self.critical}"
+        return f"WARNING: {sensor_name} on {device_name} is {value}, {relation} warning threshold of {self.warning}"
+
+class TriggerRule:
+    """Boolean trigger (unexpected motion, geofence exit) raised as a warning"""
+    __slots__ = ("sensor_type", "trigger", "duration")
+    kind = "trigger"
+    
+    def __init__(self, sensor_type: str, trigger: Any = True, duration: float = 0.0):
+        self.sensor_type = sensor_type
+        self.trigger = trigger
+        self.duration = duration
+    
+    def threshold_for(self, level: int) -> Any:
+        return self.trigger
+    
+    def evaluate(self, value: Any, timestamp: float, state: RuleState) -> Optional[int]:
+        if value == self.trigger:
+            if state.warning_since is None:
+                state.warning_since = timestamp
+        else:
+            state.warning_since = None
+        
+        if state.warning_since is not None and timestamp - state.warning_since >= self.duration:
+            level = WARNING
+        else:
+            level = NORMAL
+        
+        if level == state.level:
+            return None
+        state.level = level
+        return level
+    
+    def message(self, device_name: str, value: Any, level: int) -> str:
+        return f"Unexpected {self.sensor_type} detected for {device_name}"
+
+Rule = Union[ThresholdRule, TriggerRule]
+
+def compile_rule(sensor_type: str, spec: Dict[str, Any]) -> Rule:
+    """Turn a threshold spec from configuration into an evaluator"""
+    duration = float(spec.get("duration", 0))
+    for key in TRIGGER_KEYS:
+        if key in spec:
+            return TriggerRule(sensor_type, trigger=spec[key], duration=duration)
+    
+    return ThresholdRule(
+        sensor_type,
+        warning=spec.get("warning"),
+        critical=spec.get("critical"),
+        direction=spec.get("direction", "above"),
+        hysteresis=float(spec.get("hysteresis", 0)),
+        duration=duration
+    )
+
+def _merge_specs(*layers: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    merged: Dict[str, Dict[str, Any]] = {}
+    for layer in layers:
+        for sensor_type, spec in layer.items():
+            merged[sensor_type] = {**merged.get(sensor_type, {}), **spec}
+    return merged
+
+class RuleSet:
+    """Compiled rules with per-asset-type and per-device overrides
+    
+    Overrides are merged field by field over the defaults (device over asset
+    type over default) and compiled once; lookups after that are dict hits.
+    """
+    
+    def __init__(
+        self,
+        defaults: Dict[str, Dict[str, Any]],
+        asset_types: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None,
+        devices: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None
+    ):
+        self.defaults = defaults
+        self.asset_types = asset_types or {}
+        self.devices = devices or {}
+        self._by_asset_type: Dict[Optional[str], Dict[str, Rule]] = {}
+        self._by_device: Dict[str, Dict[str, Rule]] = {}
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RuleSet":
+        return cls(
+            defaults=config.get("defaults", {}),
+            asset_types=config.get("asset_types"),
+            devices=config.get("devices")
+        )
+    
+    @classmethod
+    def load(cls, defaults: Dict[str, Dict[str, Any]], path: Optional[str] = None) -> "RuleSet":
+        """Load rules from the JSON file at path (or ALERT_RULES_FILE), layered over defaults"""
+        path = path or os.environ.get("ALERT_RULES_FILE")
+        if not path:
+            return cls(defaults)
+        
+        with open(path) as f:
+            config = json.load(f)
+        return cls(
+            defaults=_merge_specs(defaults, config.get("defaults", {})),
+            asset_types=config.get("asset_types"),
+            devices=config.get("devices")
+        )
+    
+    def rules_for(self, device_id: str, asset_type: Optional[str] = None) -> Dict[str, Rule]:
+        rules = self._by_device.get(device_id)
+        if rules is not None:
+            return rules
+        
+        if device_id in self.devices:
+            specs = _merge_specs(self.defaults, self.asset_types.get(asset_type, {}), self.devices[device_id])
+            rules = self._by_device[device_id] = self._compile(specs)
+            return rules
+        
+        rules = self._by_asset_type.get(asset_type)
+        if rules is None:
+            specs = _merge_specs(self.defaults, self.asset_types.get(asset_type, {}))
+            rules = self._by_asset_type[asset_type] = self._compile(specs)
+        return rules
+    
+    @staticmethod
+    def _compile(specs: Dict[str, Dict[str, Any]]) -> Dict[str, Rule]:
+        return {sensor_type: compile_rule(sensor_type, spec) for sensor_type, spec in specs.items()}
+
+def parse_timestamp(timestamp: Optional[str]) -> float:
+    """ISO-8601 telemetry timestamp to epoch seconds (naive timestamps are UTC)"""
+    if not timestamp:
+        return datetime.now(timezone.utc).timestamp()
+    parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def message_time(telemetry: Dict[str, Any]) -> Tuple[str, float]:
+    """(timestamp, epoch seconds) of a telemetry message
+    
+    A missing or malformed timestamp falls back to the receive time, so one
+    bad message cannot fail the batch it arrived in.
+    """
+    timestamp = telemetry.get("timestamp")
+    if timestamp:
+        try:
+            return timestamp, parse_timestamp(timestamp)
+        except (AttributeError, TypeError, ValueError):
+            print(f"Invalid telemetry timestamp {timestamp!r}, using receive time")
+    received = datetime.now(timezone.utc)
+    return received.replace(tzinfo=None).isoformat(), received.timestamp()
@@ -0,0 +1,261 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import sys
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from alert_rules import NORMAL, RuleState
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # Redis persistence is optional
+    redis = None
+
+AlertKey = Tuple[str, str]
+
+class AlertRecord(RuleState):
+    """Rule state plus the latest reading of an active alert
+    
+    Records exist only for (device, sensor) pairs with a pending or active
+    alert; the message and threshold are rebuilt from the rule on demand.
+    """
+    __slots__ = ("device_name", "value", "timestamp")
+    
+    def __init__(self, device_name: Optional[str] = "", value: Any = None, timestamp: Optional[str] = None, **state):
+        super().__init__(**state)
+        self.device_name = device_name
+        self.value = value
+        self.timestamp = timestamp
+    
+    def to_row(self, key: AlertKey) -> list:
+        return [key[0], key[1], self.level, self.warning_since, self.critical_since,
+                self.device_name, self.value, self.timestamp]
+    
+    @classmethod
+    def from_row(cls, row: list) -> Tuple[AlertKey, "AlertRecord"]:
+        device_id, sensor_type, level, warning_since, critical_since, device_name, value, timestamp = row
+        record = cls(
+            device_name=sys.intern(device_name) if device_name is not None else None,
+            value=value,
+            timestamp=timestamp,
+            level=level,
+            warning_since=warning_since,
+            critical_since=critical_since
+        )
+        return make_key(device_id, sensor_type), record
+
+def make_key(device_id: str, sensor_type: str) -> AlertKey:
+    # Interned strings: each device id and sensor name is stored once however many keys use it
+    return (sys.intern(device_id), sys.intern(sensor_type))
+
+def shard_for(device_id: str, num_shards: int) -> int:
+    """Stable shard index for a device, the same across restarts and replicas"""
+    return zlib.crc32(device_id.encode()) % num_shards
+
+class InMemoryAlertStateStore:
+    """Bounded in-memory store of alert records
+    
+    When full, the oldest pending (not yet confirmed) record is evicted to
+    make room; active alerts are never evicted, and a new key is refused if
+    every record is active.
+    """
+    
+    def __init__(self, max_records: int = 1_000_000):
+        self.max_records = max_records
+        self._records: Dict[AlertKey, AlertRecord] = {}
+        self._pending: "OrderedDict[AlertKey, None]" = OrderedDict()
+        self.evictions = 0
+        self.rejections = 0
+    
+    def __len__(self) -> int:
+        return len(self._records)
+    
+    def get(self, key: AlertKey) -> Optional[AlertRecord]:
+        return self._records.get(key)
+    
+    def put(self, key: AlertKey, record: AlertRecord) -> bool:
+        if key not in self._records and len(self._records) >= self.max_records:
+            if not self._pending:
+                self.rejections += 1
+                return False
+            evicted, _ = self._pending.popitem(last=False)
+            del self._records[evicted]
+            self.evictions += 1
+        
+        self._records[key] = record
+        if record.level == NORMAL:
+            self._pending[key] = None
+        else:
+            self._pending.pop(key, None)
+        return True
+    
+    def delete(self, key: AlertKey):
+        self._records.pop(key, None)
+        self._pending.pop(key, None)
+    
+    def items(self) -> Iterator[Tuple[AlertKey, AlertRecord]]:
+        return iter(self._records.items())
+
+class ShardedAlertStateStore:
+    """Alert records partitioned by device id
+    
+    Each shard is owned by one ingestion worker (see TelemetryBatcher), so a
+    device's readings are always evaluated by the same worker, in order.
+    """
+    
+    def __init__(self, num_shards: int = 1, max_records: int = 1_000_000):
+        self.num_shards = num_shards
+        per_shard = max(1, max_records // num_shards)
+        self.shards = [InMemoryAlertStateStore(per_shard) for _ in range(num_shards)]
+    
+    @classmethod
+    def from_environment(cls) -> "ShardedAlertStateStore":
+        return cls(
+            num_shards=int(os.environ.get("ALERT_STATE_SHARDS", "1")),
+            max_records=int(os.environ.get("ALERT_STATE_MAX_RECORDS", "1000000"))
+        )
+    
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards)
+    
+    def shard(self, device_id: str) -> InMemoryAlertStateStore:
+        return self.shards[shard_for(device_id, self.num_shards)]
+    
+    def get(self, key: AlertKey) -> Optional[AlertRecord]:
+        return self.shard(key[0]).get(key)
+    
+    def put(self, key: AlertKey, record: AlertRecord) -> bool:
+        return self.shard(key[0]).put(key, record)
+    
+    def delete(self, key: AlertKey):
+        self.shard(key[0]).delete(key)
+    
+    def items(self) -> Iterator[Tuple[AlertKey, AlertRecord]]:
+        for shard in self.shards:
+            yield from shard.items()
+    
+    async def snapshot_rows(self, chunk_size: int = 10_000) -> List[list]:
+        """Copy of every record as plain rows, yielding to the event loop between chunks
+        
+        Each shard's items are listed up front so the shard can keep changing
+        while the rows are built; a record changed meanwhile is saved as it
+        is when its chunk is reached.
+        """
+        rows = []
+        for shard in self.shards:
+            items = list(shard.items())
+            for start in range(0, len(items), chunk_size):
+                rows.extend(record.to_row(key) for key, record in items[start:start + chunk_size])
+                await asyncio.sleep(0)
+        return rows
+    
+    def load_rows(self, rows: List[list]):
+        for row in rows:
+            key, record = AlertRecord.from_row(row)
+            self.put(key, record)
+
+class FileSnapshotBackend:
+    """Snapshots as JSON lines on local disk, replaced atomically"""
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    async def save(self, rows: List[list]):
+        await asyncio.get_running_loop().run_in_executor(None, self._write, rows)
+    
+    async def load(self) -> List[list]:
+        return await asyncio.get_running_loop().run_in_executor(None, self._read)
+    
+    def _write(self, rows: List[list]):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            for row in rows:
+                f.write(json.dumps(row, separators=(",", ":")))
+                f.write("\n")
+        os.replace(tmp_path, self.path)
+    
+    def _read(self) -> List[list]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+class RedisSnapshotBackend:
+    """Snapshots in a Redis hash, so a replacement replica can pick up the alert state
+    
+    Each replica owns the hash under its own key, since replicas hold state
+    for different devices. Give replicas a stable ALERT_STATE_REPLICA_ID
+    (e.g. a StatefulSet pod name) so a replacement restores its predecessor's
+    snapshot; the default is the host name.
+    """
+    
+    def __init__(self, url: str, replica_id: Optional[str] = None, key_prefix: str = "iot:alert-state"):
+        if redis is None:
+            raise RuntimeError("The redis package is required for the Redis alert state backend")
+        self.client = redis.from_url(url)
+        self.key = f"{key_prefix}:{replica_id or socket.gethostname()}"
+    
+    async def save(self, rows: List[list]):
+        tmp_key = f"{self.key}:tmp"
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(tmp_key)
+            for start in range(0, len(rows), 10_000):
+                chunk = rows[start:start + 10_000]
+                pipe.hset(tmp_key, mapping={
+                    f"{row[0]}\x1f{row[1]}": json.dumps(row, separators=(",", ":")) for row in chunk
+                })
+            if rows:
+                pipe.rename(tmp_key, self.key)
+            else:
+                pipe.delete(self.key)
+            await pipe.execute()
+    
+    async def load(self) -> List[list]:
+        return [json.loads(value) for value in (await self.client.hgetall(self.key)).values()]
+
+def snapshot_backend_from_environment():
+    redis_url = os.environ.get("ALERT_STATE_REDIS_URL")
+    if redis_url:
+        return RedisSnapshotBackend(redis_url, replica_id=os.environ.get("ALERT_STATE_REPLICA_ID"))
+    path = os.environ.get("ALERT_STATE_SNAPSHOT_PATH")
+    if path:
+        return FileSnapshotBackend(path)
+    return None
+
+class AlertStateSnapshotter:
+    """Restores the store on start and snapshots it every interval seconds"""
+    
+    def __init__(self, store: ShardedAlertStateStore, backend, interval: Optional[float] = None):
+        self.store = store
+        self.backend = backend
+        self.interval = interval or float(os.environ.get("ALERT_STATE_SNAPSHOT_INTERVAL", "30"))
+        self._task: Optional[asyncio.Task] = None
+        self.logger = logging.getLogger(__name__)
+    
+    async def start(self):
+        rows = await self.backend.load()
+        self.store.load_rows(rows)
+        self.logger.info(f"Restored {len(rows)} alert state records")
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.backend.save(await self.store.snapshot_rows())
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.backend.save(await self.store.snapshot_rows())
+            except Exception as e:
+                self.logger.error(f"Error saving alert state snapshot: {e}")
@@ -0,0 +1,184 @@
+"""Columnar alert evaluation for replaying or backfilling historical telemetry
+
+evaluate_columns produces exactly the alert transitions the streaming path
+(AlertProcessor._check_threshold via alert_rules) would emit when fed the
+same readings one by one, in timestamp order per (device, sensor), starting
+from no active alerts. evaluate_stream is that streaming reference, driven
+by the same rule objects.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+from alert_rules import CRITICAL, NORMAL, SEVERITY_NAMES, WARNING, RuleSet, RuleState, TriggerRule
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for the vectorized path
+    np = None
+
+def _transition(rule, device_id: str, sensor_type: str, value: Any, timestamp: float, level: int) -> Dict[str, Any]:
+    return {
+        "device_id": device_id,
+        "sensor_type": sensor_type,
+        "value": value,
+        "timestamp": timestamp,
+        "severity": SEVERITY_NAMES.get(level),
+        "threshold_value": rule.threshold_for(level) if level != NORMAL else None,
+        "resolved": level == NORMAL,
+    }
+
+def _sort_key(transition: Dict[str, Any]):
+    return (transition["device_id"], transition["sensor_type"], transition["timestamp"])
+
+def evaluate_stream(
+    device_ids: Sequence[str],
+    sensor_types: Sequence[str],
+    values: Sequence[float],
+    timestamps: Sequence[float],
+    rules: RuleSet,
+    asset_types: Optional[Dict[str, str]] = None
+) -> List[Dict[str, Any]]:
+    """Reference implementation: feed readings one at a time through the rule evaluators"""
+    asset_types = asset_types or {}
+    order = sorted(range(len(values)), key=lambda i: (device_ids[i], sensor_types[i], timestamps[i]))
+    states: Dict[tuple, RuleState] = {}
+    transitions = []
+    
+    for i in order:
+        device_id, sensor_type = device_ids[i], sensor_types[i]
+        rule = rules.rules_for(device_id, asset_types.get(device_id)).get(sensor_type)
+        if rule is None:
+            continue
+        state = states.setdefault((device_id, sensor_type), RuleState())
+        level = rule.evaluate(values[i], timestamps[i], state)
+        if level is not None:
+            transitions.append(_transition(rule, device_id, sensor_type, values[i], timestamps[i], level))
+    
+    return transitions
+
+def _forward_fill_index(defined):
+    """Index of the most recent row (within the same group) where defined is True"""
+    index = np.where(defined, np.arange(defined.size), 0)
+    return np.maximum.accumulate(index)
+
+def _latched(enter, exit, group_start):
+    """Per-row latch: set on enter, cleared on exit, held otherwise, clear at group start"""
+    # Group starts are always defined so a latch never carries across groups
+    marker = np.where(enter, 1, np.where(exit | group_start, 0, -1))
+    return marker[_forward_fill_index(marker >= 0)] == 1
+
+def _confirmed(latched, group_start, timestamps, duration):
+    """Latched rows whose current run has lasted at least duration"""
+    previous = np.concatenate(([False], latched[:-1]))
+    run_start = latched & (group_start | ~previous)
+    since = timestamps[_forward_fill_index(run_start)]
+    return latched & (timestamps - since >= duration)
+
+def evaluate_columns(
+    device_ids: Sequence[str],
+    sensor_types: Sequence[str],
+    values: Sequence[float],
+    timestamps: Sequence[float],
+    rules: RuleSet,
+    asset_types: Optional[Dict[str, str]] = None
+) -> List[Dict[str, Any]]:
+    """Evaluate columnar readings with NumPy and return the alert transitions
+    
+    Readings are grouped by (device, sensor) and ordered by timestamp. Rule
+    parameters are broadcast per group, the enter/exit latches and debounce
+    runs are computed with forward fills, and a transition is emitted
+    wherever a group's confirmed level changes.
+    """
+    if np is None:
+        raise RuntimeError("NumPy is required for columnar alert evaluation")
+    
+    asset_types = asset_types or {}
+    device_ids = np.asarray(device_ids)
+    sensor_types = np.asarray(sensor_types)
+    values = np.asarray(values, dtype=float)
+    timestamps = np.asarray(timestamps, dtype=float)
+    if values.size == 0:
+        return []
+    
+    # Integer code per (device, sensor) pair
+    devices, device_codes = np.unique(device_ids, return_inverse=True)
+    sensors, sensor_codes = np.unique(sensor_types, return_inverse=True)
+    pairs, group = np.unique(device_codes * len(sensors) + sensor_codes, return_inverse=True)
+    
+    # Rule parameters per group; groups without a rule are dropped
+    count = len(pairs)
+    sign = np.ones(count)
+    warning_enter = np.full(count, np.inf)
+    warning_exit = np.full(count, np.inf)
+    critical_enter = np.full(count, np.inf)
+    critical_exit = np.full(count, np.inf)
+    duration = np.zeros(count)
+    is_trigger = np.zeros(count, dtype=bool)
+    trigger = np.zeros(count)
+    has_rule = np.zeros(count, dtype=bool)
+    group_rules = [None] * count
+    
+    for code, pair in enumerate(pairs):
+        device_id = devices[pair // len(sensors)]
+        sensor_type = sensors[pair % len(sensors)]
+        rule = rules.rules_for(str(device_id), asset_types.get(str(device_id))).get(str(sensor_type))
+        if rule is None:
+            continue
+        has_rule[code] = True
+        group_rules[code] = rule
+        duration[code] = rule.duration
+        if isinstance(rule, TriggerRule):
+            is_trigger[code] = True
+            trigger[code] = float(rule.trigger)
+        else:
+            sign[code] = rule.sign
+            warning_enter[code] = rule.warning_enter
+            warning_exit[code] = rule.warning_exit
+            critical_enter[code] = rule.critical_enter
+            critical_exit[code] = rule.critical_exit
+    
+    keep = has_rule[group]
+    order = np.lexsort((timestamps[keep], group[keep]))
+    rows = np.flatnonzero(keep)[order]
+    group = group[rows]
+    values = values[rows]
+    timestamps = timestamps[rows]
+    if rows.size == 0:
+        return []
+    
+    group_start = np.concatenate(([True], group[1:] != group[:-1]))
+    trigger_row = is_trigger[group]
+    v = sign[group] * values
+    
+    matches = values == trigger[group]
+    warning_latched = _latched(
+        np.where(trigger_row, matches, v >= warning_enter[group]),
+        np.where(trigger_row, ~matches, v < warning_exit[group]),
+        group_start
+    )
+    critical_latched = _latched(
+        ~trigger_row & (v >= critical_enter[group]),
+        trigger_row | (v < critical_exit[group]),
+        group_start
+    )
+    
+    row_duration = duration[group]
+    level = np.where(
+        _confirmed(critical_latched, group_start, timestamps, row_duration), CRITICAL,
+        np.where(_confirmed(warning_latched, group_start, timestamps, row_duration), WARNING, NORMAL)
+    )
+    previous_level = np.where(group_start, NORMAL, np.concatenate(([NORMAL], level[:-1])))
+    
+    transitions = []
+    for i in np.flatnonzero(level != previous_level):
+        code = group[i]
+        pair = pairs[code]
+        transitions.append(_transition(
+            group_rules[code],
+            str(devices[pair // len(sensors)]),
+            str(sensors[pair % len(sensors)]),
+            values[i].item(),
+            timestamps[i].item(),
+            int(level[i])
+        ))
+    
+    return transitions
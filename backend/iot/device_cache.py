@@ -0,0 +1,207 @@
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # Redis tier is optional
+    redis = None
+
+class CachedDevice:
+    """The device fields the telemetry path needs, detached from any DB session"""
+    __slots__ = ("id", "name", "asset_type")
+    
+    def __init__(self, id: str, name: str, asset_type: Optional[str] = None):
+        self.id = id
+        self.name = name
+        self.asset_type = asset_type
+    
+    @classmethod
+    def from_model(cls, device: Any) -> "CachedDevice":
+        # asset_type selects per-asset-type alert rules; not every device carries one
+        return cls(id=str(device.id), name=device.name, asset_type=getattr(device, "asset_type", None))
+
+class InMemorySharedStore:
+    """Stand-in for the Redis tier in tests and single-replica deployments"""
+    
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+    
+    async def set(self, key: str, value: bytes, ttl: float):
+        self._data[key] = (time.monotonic() + ttl, value)
+    
+    async def delete(self, key: str):
+        self._data.pop(key, None)
+
+class RedisSharedStore:
+    """Shared cache tier so iot-service replicas reuse each other's device lookups"""
+    
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("The redis package is required for the Redis device cache tier")
+        self.client = redis.from_url(url)
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+    
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self.client.set(key, value, px=int(ttl * 1000))
+    
+    async def delete(self, key: str):
+        await self.client.delete(key)
+
+# Marker for "this device does not exist", cached locally and in the shared tier
+_NOT_FOUND = object()
+_NOT_FOUND_BYTES = b""
+
+class DeviceCache:
+    """Size-bounded LRU cache of device metadata with TTLs and negative caching
+    
+    Lookups go local tier -> shared tier (if configured) -> loader. Unknown
+    devices are cached for negative_ttl so a misconfigured sensor cannot
+    hammer the database. Call invalidate() whenever a device changes.
+    The loader is blocking and runs in the default executor, never on the
+    event loop.
+    Shared tier failures are counted and skipped, never raised to callers.
+    """
+    
+    def __init__(
+        self,
+        loader: Callable[[str], Optional[Any]],
+        max_size: Optional[int] = None,
+        ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None,
+        shared: Optional[Any] = None,
+        key_prefix: str = "iot:device:"
+    ):
+        self.loader = loader
+        self.max_size = max_size or int(os.environ.get("DEVICE_CACHE_SIZE", "50000"))
+        self.ttl = ttl if ttl is not None else float(os.environ.get("DEVICE_CACHE_TTL", "300"))
+        self.negative_ttl = negative_ttl if negative_ttl is not None else (
+            float(os.environ.get("DEVICE_CACHE_NEGATIVE_TTL", "30"))
+        )
+        self.shared = shared
+        self.key_prefix = key_prefix
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.shared_errors = 0
+        self.evictions = 0
+    
+    @classmethod
+    def from_environment(cls, loader: Callable[[str], Optional[Any]]) -> "DeviceCache":
+        """Build a cache with the Redis tier enabled when DEVICE_CACHE_REDIS_URL is set"""
+        redis_url = os.environ.get("DEVICE_CACHE_REDIS_URL")
+        if redis_url and redis is None:
+            print("DEVICE_CACHE_REDIS_URL is set but the redis package is not installed; using the local tier only")
+            redis_url = None
+        return cls(loader, shared=RedisSharedStore(redis_url) if redis_url else None)
+    
+    async def get(self, device_id: str) -> Optional[CachedDevice]:
+        value = self._get_local(device_id)
+        if value is not None:
+            self.hits += 1
+            return None if value is _NOT_FOUND else value
+        
+        self.misses += 1
+        
+        if self.shared is not None:
+            value = await self._get_shared(device_id)
+            if value is not None:
+                self.shared_hits += 1
+                self._put_local(device_id, value)
+                return None if value is _NOT_FOUND else value
+        
+        value = await asyncio.get_running_loop().run_in_executor(None, self._load, device_id)
+        self._put_local(device_id, value)
+        
+        if self.shared is not None:
+            if value is _NOT_FOUND:
+                await self._call_shared(self.shared.set, self.key_prefix + device_id, _NOT_FOUND_BYTES, self.negative_ttl)
+            else:
+                raw = json.dumps({"id": value.id, "name": value.name, "asset_type": value.asset_type}).encode()
+                await self._call_shared(self.shared.set, self.key_prefix + device_id, raw, self.ttl)
+        
+        return None if value is _NOT_FOUND else value
+    
+    async def invalidate(self, device_id: str):
+        self._entries.pop(device_id, None)
+        if self.shared is not None:
+            await self._call_shared(self.shared.delete, self.key_prefix + device_id)
+    
+    def _load(self, device_id: str):
+        # Detach in the executor too: reading model attributes can hit the session
+        device = self.loader(device_id)
+        return CachedDevice.from_model(device) if device else _NOT_FOUND
+    
+    async def _get_shared(self, device_id: str):
+        """Decoded shared tier entry, or None on a miss or any shared tier failure"""
+        try:
+            raw = await self.shared.get(self.key_prefix + device_id)
+            if raw is None:
+                return None
+            return _NOT_FOUND if raw == _NOT_FOUND_BYTES else CachedDevice(**json.loads(raw))
+        except Exception as e:
+            self._shared_failed(e)
+            return None
+    
+    async def _call_shared(self, operation, *args):
+        try:
+            await operation(*args)
+        except Exception as e:
+            self._shared_failed(e)
+    
+    def _shared_failed(self, error: Exception):
+        # The local tier and the loader still answer; the shared tier is only an optimization
+        self.shared_errors += 1
+        print(f"Device cache shared tier error: {error}")
+    
+    def clear(self):
+        """Drop the local tier; entries in the shared tier expire on their TTL"""
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared_hits": self.shared_hits,
+            "shared_errors": self.shared_errors,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+    
+    def _get_local(self, device_id: str):
+        entry = self._entries.get(device_id)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[device_id]
+            return None
+        self._entries.move_to_end(device_id)
+        return value
+    
+    def _put_local(self, device_id: str, value):
+        ttl = self.negative_ttl if value is _NOT_FOUND else self.ttl
+        self._entries[device_id] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(device_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
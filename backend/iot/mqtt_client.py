@@ -1,11 +1,45 @@
 import paho.mqtt.client as mqtt
 import asyncio
-import json
 import logging
-from typing import Callable, Dict, Any, Optional
+import os
+import time
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+
+from payload_codecs import CodecRegistry
+from topic_router import TopicRouter
+
+OVERFLOW_POLICIES = ("drop_newest", "drop_oldest", "block")
 
 class MqttClient:
-    def __init__(self, broker: str, port: int, client_id: str, username: Optional[str] = None, password: Optional[str] = None):
+    """Asyncio wrapper around paho-mqtt
+    
+    Outgoing messages are handed to paho from the event loop; each publish
+    gets a future resolved from on_publish (on send for QoS 0, PUBACK for
+    QoS 1, PUBCOMP for QoS 2), and at most max_inflight publishes are
+    unconfirmed at any time.
+    
+    Incoming messages are handed from paho's network thread to the event
+    loop with call_soon_threadsafe and put on a bounded queue, which a pool
+    of worker tasks drains into the registered callbacks. When the queue is
+    full, overflow_policy decides what happens: drop_newest discards the
+    incoming message, drop_oldest discards the oldest queued one, and block
+    holds paho's network thread until there is room, pushing back on the
+    broker.
+    """
+    
+    def __init__(
+        self,
+        broker: str,
+        port: int,
+        client_id: str,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        codecs: Optional[CodecRegistry] = None,
+        max_inflight: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        overflow_policy: Optional[str] = None
+    ):
         self.broker = broker
         self.port = port
         self.client_id = client_id
@@ -14,13 +48,37 @@ class MqttClient:
         self.client = mqtt.Client(client_id=client_id)
         self.loop = asyncio.get_event_loop()
         self._connected = False
-        self._message_callbacks = {}
+        self._router = TopicRouter()
+        self.codecs = codecs or CodecRegistry.from_environment()
+        
+        # Outbound publishes awaiting on_publish, by message id
+        self.max_inflight = max_inflight or int(os.environ.get("MQTT_MAX_INFLIGHT", "1000"))
+        self.client.max_inflight_messages_set(self.max_inflight)
+        self._inflight: Optional[asyncio.Semaphore] = None
+        self._publish_futures: Dict[int, asyncio.Future] = {}
+        self.messages_published = 0
+        
+        # Inbound dispatch
+        self.max_queue_size = max_queue_size or int(os.environ.get("MQTT_QUEUE_SIZE", "10000"))
+        self.workers = workers or int(os.environ.get("MQTT_WORKERS", "4"))
+        self.overflow_policy = overflow_policy or os.environ.get("MQTT_OVERFLOW_POLICY", "drop_newest")
+        if self.overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid MQTT overflow policy: {self.overflow_policy}")
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self.messages_received = 0
+        self.messages_dropped = 0
+        self.messages_handled = 0
+        self.handler_errors = 0
+        self.handler_seconds_total = 0.0
+        self.handler_seconds_max = 0.0
         
         # Set up callbacks
         self.client.on_connect = self._on_connect
         self.client.on_disconnect = self._on_disconnect
         self.client.on_message = self._on_message
         self.client.on_subscribe = self._on_subscribe
+        self.client.on_publish = self._on_publish
         
         # Set username and password if provided
         if username and password:
@@ -41,29 +99,130 @@ class MqttClient:
         self._connected = False
     
     def _on_message(self, client, userdata, msg):
+        # Runs on paho's network thread: hand the message to the event loop and return
+        if self._queue is None:
+            return
+        if self.overflow_policy == "block":
+            asyncio.run_coroutine_threadsafe(self._put_blocking(msg), self.loop).result()
+        else:
+            self.loop.call_soon_threadsafe(self._enqueue, msg)
+    
+    async def _put_blocking(self, msg):
+        self.messages_received += 1
+        await self._queue.put(msg)
+    
+    def _enqueue(self, msg):
+        self.messages_received += 1
+        try:
+            self._queue.put_nowait(msg)
+            return
+        except asyncio.QueueFull:
+            pass
+        
+        self.messages_dropped += 1
+        if self.overflow_policy == "drop_oldest":
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self._queue.put_nowait(msg)
+    
+    async def _dispatch_worker(self):
+        while True:
+            msg = await self._queue.get()
+            try:
+                await self._dispatch(msg)
+            finally:
+                self._queue.task_done()
+    
+    async def _dispatch(self, msg):
         topic = msg.topic
-        payload = msg.payload.decode()
-        self.logger.debug(f"Received message on topic {topic}: {payload}")
+        callbacks = self._router.match(topic)
+        if not callbacks:
+            return
         
-        # Try to parse JSON
+        # Decode on the worker, from the payload bytes as received
+        properties = getattr(msg, "properties", None)
+        content_type = getattr(properties, "ContentType", None)
         try:
-            data = json.loads(payload)
-        except json.JSONDecodeError:
-            data = payload
+            data = self.codecs.decode(topic, msg.payload, content_type)
+        except Exception as e:
+            self.handler_errors += 1
+            self.logger.error(f"Failed to decode message on topic {topic}: {e}")
+            return
         
-        # Call the appropriate callback for this topic
-        for topic_pattern, callback in self._message_callbacks.items():
-            if mqtt.topic_matches_sub(topic_pattern, topic):
-                asyncio.create_task(callback(topic, data))
+        # Call the callbacks of every filter matching this topic
+        for callback in callbacks:
+            start = time.perf_counter()
+            try:
+                await callback(topic, data)
+            except Exception as e:
+                self.handler_errors += 1
+                self.logger.error(f"Error in callback for topic {topic}: {e}")
+            elapsed = time.perf_counter() - start
+            self.messages_handled += 1
+            self.handler_seconds_total += elapsed
+            self.handler_seconds_max = max(self.handler_seconds_max, elapsed)
+    
+    def _start_workers(self):
+        if self._worker_tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker_tasks = [asyncio.create_task(self._dispatch_worker()) for _ in range(self.workers)]
+    
+    async def _stop_workers(self):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Publish and inbound dispatch counters"""
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "publishes_inflight": len(self._publish_futures),
+            "published": self.messages_published,
+            "received": self.messages_received,
+            "dropped": self.messages_dropped,
+            "handled": self.messages_handled,
+            "handler_errors": self.handler_errors,
+            "handler_seconds_total": self.handler_seconds_total,
+            "handler_seconds_max": self.handler_seconds_max,
+        }
     
     def _on_subscribe(self, client, userdata, mid, granted_qos):
         self.logger.info(f"Subscribed to topic with QoS {granted_qos}")
     
+    def _on_publish(self, client, userdata, mid):
+        # Runs on paho's network thread
+        self.loop.call_soon_threadsafe(self._resolve_publish, mid)
+    
+    def _resolve_publish(self, mid):
+        future = self._publish_futures.pop(mid, None)
+        if future is None:
+            return
+        self._inflight.release()
+        self.messages_published += 1
+        if not future.done():
+            future.set_result(mid)
+    
+    def _fail_pending_publishes(self, error: Exception):
+        for future in self._publish_futures.values():
+            self._inflight.release()
+            if not future.done():
+                future.set_exception(error)
+        self._publish_futures = {}
+    
     async def connect(self):
         """Connect to the MQTT broker with retry logic"""
         max_retries = 5
         retry_count = 0
         
+        # Messages are dispatched on the loop connect() is awaited from
+        self.loop = asyncio.get_running_loop()
+        if self._inflight is None:
+            self._inflight = asyncio.Semaphore(self.max_inflight)
+        self._start_workers()
+        
         while retry_count < max_retries:
             try:
                 def _connect():
@@ -108,6 +267,8 @@ class MqttClient:
             self.client.disconnect()
         
         await self.loop.run_in_executor(None, _disconnect)
+        await self._stop_workers()
+        self._fail_pending_publishes(Exception("Disconnected before the publish was confirmed"))
         self.logger.info("Disconnected from MQTT broker")
     
     async def subscribe(self, topic: str, qos: int = 0):
@@ -123,30 +284,63 @@ class MqttClient:
         await self.loop.run_in_executor(None, _subscribe)
         self.logger.info(f"Subscribed to topic {topic} with QoS {qos}")
     
-    async def publish(self, topic: str, payload: Any, qos: int = 0, retain: bool = False):
-        """Publish a message to a topic"""
+    async def send(self, topic: str, payload: Any, qos: int = 0, retain: bool = False) -> asyncio.Future:
+        """Hand a message to paho and return a future resolved with its message id once confirmed
+        
+        Waits only for an in-flight slot, not for the broker.
+        """
         if not self._connected:
             raise Exception("Not connected to MQTT broker")
         
-        # Convert payload to JSON string if it's a dict
-        if isinstance(payload, dict):
-            payload = json.dumps(payload)
+        # Strings and bytes go out as-is; anything else is encoded with the topic's codec
+        if not isinstance(payload, (str, bytes, bytearray)):
+            payload = self.codecs.encode(topic, payload)
         
-        def _publish():
-            result = self.client.publish(topic, payload, qos, retain)
-            if result.rc != mqtt.MQTT_ERR_SUCCESS:
-                raise Exception(f"Failed to publish to topic {topic}")
+        await self._inflight.acquire()
+        # paho's publish only queues the packet for its network thread
+        result = self.client.publish(topic, payload, qos, retain)
+        if result.rc != mqtt.MQTT_ERR_SUCCESS:
+            self._inflight.release()
+            raise Exception(f"Failed to publish to topic {topic}")
         
-        await self.loop.run_in_executor(None, _publish)
-        self.logger.debug(f"Published message to topic {topic}: {payload}")
+        # on_publish is delivered through call_soon_threadsafe, so it cannot run before this
+        future = self.loop.create_future()
+        self._publish_futures[result.mid] = future
+        return future
+    
+    async def publish(self, topic: str, payload: Any, qos: int = 0, retain: bool = False) -> int:
+        """Publish a message to a topic and wait until it is confirmed"""
+        future = await self.send(topic, payload, qos, retain)
+        mid = await future
+        self.logger.debug(f"Published message to topic {topic}")
+        return mid
+    
+    async def publish_many(
+        self,
+        messages: Iterable[Tuple[str, Any]],
+        qos: int = 0,
+        retain: bool = False
+    ) -> List[Any]:
+        """Publish (topic, payload) pairs back to back and wait for all confirmations
+        
+        Returns a message id or the exception for each message, in order.
+        """
+        futures = []
+        for topic, payload in messages:
+            try:
+                futures.append(await self.send(topic, payload, qos, retain))
+            except Exception as e:
+                failed = self.loop.create_future()
+                failed.set_exception(e)
+                futures.append(failed)
+        return await asyncio.gather(*futures, return_exceptions=True)
     
     def register_callback(self, topic: str, callback: Callable[[str, Any], None]):
-        """Register a callback for a topic"""
-        self._message_callbacks[topic] = callback
+        """Register a callback for a topic filter; a filter can have several callbacks"""
+        self._router.add(topic, callback)
         self.logger.debug(f"Registered callback for topic {topic}")
     
-    def unregister_callback(self, topic: str):
-        """Unregister a callback for a topic"""
-        if topic in self._message_callbacks:
-            del self._message_callbacks[topic]
-            self.logger.debug(f"Unregistered callback for topic {topic}")
\ No newline at end of file
+    def unregister_callback(self, topic: str, callback: Optional[Callable[[str, Any], None]] = None):
+        """Unregister one callback for a topic filter, or all of them when callback is None"""
+        if self._router.remove(topic, callback):
+            self.logger.debug(f"Unregistered callback for topic {topic}")
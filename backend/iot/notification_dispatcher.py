@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+class NotificationDispatcher:
+    """Delivers alert notifications off the telemetry path
+    
+    Alerts are put on a bounded queue and sent by worker tasks through one
+    long-lived pooled HTTP client. Each alert is fanned out to its channels
+    concurrently, failed posts are retried with exponential backoff, and
+    repeats of the same alert for a device inside coalesce_window are
+    dropped. When the queue is full, new notifications are dropped and
+    counted rather than slowing ingestion down.
+    """
+    
+    # Responses worth retrying; anything else is a permanent failure
+    RETRY_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+    
+    def __init__(
+        self,
+        endpoints: Dict[str, str],
+        max_queue_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        coalesce_window: Optional[float] = None,
+        timeout: float = 5.0,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        self.endpoints = endpoints
+        self.max_queue_size = max_queue_size or int(os.environ.get("NOTIFICATION_QUEUE_SIZE", "10000"))
+        self.workers = workers or int(os.environ.get("NOTIFICATION_WORKERS", "4"))
+        self.max_retries = max_retries if max_retries is not None else (
+            int(os.environ.get("NOTIFICATION_MAX_RETRIES", "3"))
+        )
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.coalesce_window = coalesce_window if coalesce_window is not None else (
+            float(os.environ.get("NOTIFICATION_COALESCE_SECONDS", "60"))
+        )
+        self.timeout = timeout
+        self._client = client
+        self._owns_client = client is None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Coalesce key -> last send time, oldest first so expired keys are popped from the front
+        self._last_sent: "OrderedDict[Tuple[str, str, str], float]" = OrderedDict()
+        
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.dropped = 0
+        self.coalesced = 0
+        
+        self.logger = logging.getLogger(__name__)
+    
+    @staticmethod
+    def channels_for(notification: Dict[str, Any]) -> List[str]:
+        """Determine which channels to use based on severity"""
+        channels = ["push"]  # Always send push notifications
+        if notification["severity"] == "critical":
+            channels.extend(["email", "sms"])
+        return channels
+    
+    def start(self):
+        if self._tasks:
+            return
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+            )
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+    
+    async def stop(self):
+        """Deliver what is already queued, then shut the workers and client down"""
+        if not self._tasks:
+            return
+        await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def submit(self, notification: Dict[str, Any]) -> bool:
+        """Queue a notification without waiting; returns False if it was coalesced or dropped"""
+        self.start()
+        
+        key = (notification["device_id"], notification.get("sensor_type", ""), notification["severity"])
+        now = time.monotonic()
+        self._prune_coalesce_keys(now)
+        last_sent = self._last_sent.get(key)
+        if last_sent is not None and now - last_sent < self.coalesce_window:
+            self.coalesced += 1
+            return False
+        
+        try:
+            self._queue.put_nowait(notification)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self.logger.warning(f"Notification queue full, dropping alert {notification.get('alert_id')}")
+            return False
+        
+        self._last_sent[key] = now
+        self._last_sent.move_to_end(key)
+        return True
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+    
+    def _prune_coalesce_keys(self, now: float):
+        # Amortized O(1): each key is popped at most once per send
+        while self._last_sent:
+            key, sent_at = next(iter(self._last_sent.items()))
+            if now - sent_at < self.coalesce_window:
+                break
+            self._last_sent.popitem(last=False)
+    
+    async def _worker(self):
+        while True:
+            notification = await self._queue.get()
+            try:
+                channels = [channel for channel in self.channels_for(notification) if channel in self.endpoints]
+                await asyncio.gather(*(self._post(channel, notification) for channel in channels))
+            except Exception as e:
+                self.logger.error(f"Error in notification worker: {e}")
+            finally:
+                self._queue.task_done()
+    
+    async def _post(self, channel: str, notification: Dict[str, Any]) -> bool:
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            
+            try:
+                response = await self._client.post(self.endpoints[channel], json=notification)
+            except httpx.TransportError as e:
+                self.logger.warning(f"Error sending {channel} notification (attempt {attempt + 1}): {e}")
+                continue
+            
+            if response.is_success:
+                self.sent += 1
+                return True
+            if response.status_code not in self.RETRY_STATUS_CODES:
+                break
+            self.logger.warning(f"Failed to send {channel} notification (attempt {attempt + 1}): {response.status_code}")
+        
+        self.failed += 1
+        self.logger.error(f"Giving up on {channel} notification for alert {notification.get('alert_id')}")
+        return False
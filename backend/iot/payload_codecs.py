@@ -0,0 +1,137 @@
+import json
+import os
+from typing import Any, Dict, Optional
+
+from topic_router import TopicRouter
+
+try:
+    import orjson
+except ImportError:  # Falls back to the stdlib json module
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # MessagePack payloads are optional
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # CBOR payloads are optional
+    cbor2 = None
+
+class JsonCodec:
+    """JSON via orjson when installed; non-JSON payloads decode to text as before"""
+
+    name = "json"
+    content_types = ("application/json",)
+
+    def decode(self, payload: bytes) -> Any:
+        # Both parsers take the payload bytes directly, without a str copy
+        try:
+            if orjson is not None:
+                return orjson.loads(payload)
+            return json.loads(payload)
+        except ValueError:
+            return bytes(payload).decode(errors="replace")
+
+    def encode(self, data: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(data)
+        return json.dumps(data, separators=(",", ":")).encode()
+
+class MsgpackCodec:
+    """MessagePack for compact device payloads"""
+
+    name = "msgpack"
+    content_types = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+    def decode(self, payload: bytes) -> Any:
+        return msgpack.unpackb(payload, raw=False)
+
+    def encode(self, data: Any) -> bytes:
+        return msgpack.packb(data, use_bin_type=True)
+
+class CborCodec:
+    """CBOR for compact device payloads"""
+
+    name = "cbor"
+    content_types = ("application/cbor",)
+
+    def decode(self, payload: bytes) -> Any:
+        return cbor2.loads(payload)
+
+    def encode(self, data: Any) -> bytes:
+        return cbor2.dumps(data)
+
+class RawCodec:
+    """Payload bytes passed through untouched"""
+
+    name = "raw"
+    content_types = ("application/octet-stream",)
+
+    def decode(self, payload: bytes) -> Any:
+        return payload
+
+    def encode(self, data: Any) -> bytes:
+        if isinstance(data, str):
+            return data.encode()
+        return bytes(data)
+
+def available_codecs() -> Dict[str, Any]:
+    """Codecs whose libraries are installed, by name"""
+    codecs = [JsonCodec(), RawCodec()]
+    if msgpack is not None:
+        codecs.append(MsgpackCodec())
+    if cbor2 is not None:
+        codecs.append(CborCodec())
+    return {codec.name: codec for codec in codecs}
+
+class CodecRegistry:
+    """Picks the codec for a message
+
+    An MQTT v5 content-type property wins; otherwise the first topic filter
+    routed to a codec decides, and anything else uses the default codec.
+    """
+
+    def __init__(self, default: str = "json"):
+        self.codecs = available_codecs()
+        self._by_content_type: Dict[str, Any] = {}
+        for codec in self.codecs.values():
+            for content_type in codec.content_types:
+                self._by_content_type[content_type] = codec
+        self._topics = TopicRouter()
+        self.default = self._get(default)
+
+    @classmethod
+    def from_environment(cls) -> "CodecRegistry":
+        """MQTT_DEFAULT_CODEC, plus MQTT_TOPIC_CODECS as 'filter=codec' pairs separated by ';'"""
+        registry = cls(os.environ.get("MQTT_DEFAULT_CODEC", "json"))
+        for entry in os.environ.get("MQTT_TOPIC_CODECS", "").split(";"):
+            if entry.strip():
+                topic_filter, _, name = entry.partition("=")
+                registry.route(topic_filter.strip(), name.strip())
+        return registry
+
+    def _get(self, name: str):
+        codec = self.codecs.get(name)
+        if codec is None:
+            raise ValueError(f"Codec {name} is unknown or its library is not installed")
+        return codec
+
+    def route(self, topic_filter: str, name: str) -> None:
+        """Use a codec for topics matching a filter"""
+        self._topics.add(topic_filter, self._get(name))
+
+    def for_message(self, topic: str, content_type: Optional[str] = None):
+        if content_type:
+            codec = self._by_content_type.get(content_type.split(";", 1)[0].strip().lower())
+            if codec is not None:
+                return codec
+        codecs = self._topics.match(topic)
+        return codecs[0] if codecs else self.default
+
+    def decode(self, topic: str, payload: bytes, content_type: Optional[str] = None) -> Any:
+        return self.for_message(topic, content_type).decode(payload)
+
+    def encode(self, topic: str, data: Any, content_type: Optional[str] = None) -> bytes:
+        return self.for_message(topic, content_type).encode(data)
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from alert_state import shard_for
+
+if TYPE_CHECKING:  # the batcher only needs alert_state and process_telemetry_batch
+    from alert_processor import AlertProcessor
+
+class TelemetryBatcher:
+    """Micro-batching stage between the MQTT handlers and the AlertProcessor
+    
+    Messages are queued as they arrive and handed to the processor in
+    batches of up to batch_size, waiting at most max_linger seconds for a
+    batch to fill. The bounded queue makes producers wait when ingestion
+    falls behind instead of growing without limit.
+    
+    There is one queue and worker per alert state shard, and messages are
+    routed by device id, so each device is always handled by the same
+    worker and its readings stay in order.
+    """
+    
+    def __init__(
+        self,
+        processor: "AlertProcessor",
+        batch_size: Optional[int] = None,
+        max_linger: Optional[float] = None,
+        max_queue_size: Optional[int] = None
+    ):
+        self.processor = processor
+        self.batch_size = batch_size or int(os.environ.get("TELEMETRY_BATCH_SIZE", "500"))
+        self.max_linger = max_linger if max_linger is not None else (
+            float(os.environ.get("TELEMETRY_BATCH_LINGER_MS", "50")) / 1000
+        )
+        max_queue_size = max_queue_size or int(os.environ.get("TELEMETRY_QUEUE_SIZE", "20000"))
+        self.num_shards = processor.alert_state.num_shards
+        self.queues: List[asyncio.Queue] = [
+            asyncio.Queue(maxsize=max(1, max_queue_size // self.num_shards)) for _ in range(self.num_shards)
+        ]
+        self.batches_processed = 0
+        self.messages_processed = 0
+        self._workers: List[asyncio.Task] = []
+        self.logger = logging.getLogger(__name__)
+    
+    async def submit(self, device_id: str, telemetry: Dict[str, Any]):
+        """Queue a telemetry message, waiting if the queue is full"""
+        await self.queues[shard_for(device_id, self.num_shards)].put((device_id, telemetry))
+    
+    def queue_depth(self) -> int:
+        return sum(queue.qsize() for queue in self.queues)
+    
+    def start(self):
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._run(queue)) for queue in self.queues]
+    
+    async def stop(self):
+        """Process everything already queued, then stop the workers"""
+        if not self._workers:
+            return
+        await asyncio.gather(*(queue.join() for queue in self.queues))
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+    
+    async def _next_batch(self, queue: asyncio.Queue) -> List[Tuple[str, Dict[str, Any]]]:
+        batch = [await queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_linger
+        
+        while len(batch) < self.batch_size:
+            # Take whatever is already queued without waiting
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        return batch
+    
+    async def _run(self, queue: asyncio.Queue):
+        while True:
+            batch = await self._next_batch(queue)
+            try:
+                await self.processor.process_telemetry_batch(batch)
+            except Exception as e:
+                self.logger.error(f"Error processing telemetry batch of {len(batch)} messages: {e}")
+            finally:
+                self.batches_processed += 1
+                self.messages_processed += len(batch)
+                for _ in batch:
+                    queue.task_done()
@@ -0,0 +1,117 @@
+from typing import Any, Dict, Iterator, List, Optional
+
+class _Node:
+    __slots__ = ("children", "handlers")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.handlers: List[Any] = []
+
+def _split_pattern(pattern: str) -> List[str]:
+    levels = pattern.split("/")
+    for i, level in enumerate(levels):
+        if "#" in level and (level != "#" or i != len(levels) - 1):
+            raise ValueError(f"Invalid topic filter {pattern}: '#' must be the whole last level")
+        if "+" in level and level != "+":
+            raise ValueError(f"Invalid topic filter {pattern}: '+' must be a whole level")
+    return levels
+
+class TopicRouter:
+    """Trie of MQTT topic filters
+
+    Each level of a filter is a node, with '+' and '#' stored as ordinary
+    children, so matching a topic walks the trie level by level instead of
+    testing every registered filter. Matching follows the MQTT rules:
+    'a/#' also matches 'a', and topics starting with '$' are not matched by
+    wildcards in the first level. A filter can carry several handlers;
+    they are returned in registration order.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, pattern: str, handler: Any) -> None:
+        """Register a handler for a topic filter"""
+        node = self._root
+        for level in _split_pattern(pattern):
+            child = node.children.get(level)
+            if child is None:
+                child = node.children[level] = _Node()
+            node = child
+        node.handlers.append(handler)
+        self._count += 1
+
+    def remove(self, pattern: str, handler: Optional[Any] = None) -> int:
+        """Remove one handler, or every handler when handler is None; returns how many were removed"""
+        path = [self._root]
+        for level in _split_pattern(pattern):
+            child = path[-1].children.get(level)
+            if child is None:
+                return 0
+            path.append(child)
+
+        node = path[-1]
+        if handler is None:
+            removed = len(node.handlers)
+            node.handlers = []
+        else:
+            kept = [h for h in node.handlers if h != handler]
+            removed = len(node.handlers) - len(kept)
+            node.handlers = kept
+        self._count -= removed
+
+        # Prune nodes left without handlers or children
+        levels = pattern.split("/")
+        for depth in range(len(levels), 0, -1):
+            node = path[depth]
+            if node.handlers or node.children:
+                break
+            del path[depth - 1].children[levels[depth - 1]]
+        return removed
+
+    def match(self, topic: str) -> List[Any]:
+        """Handlers of every filter matching a topic"""
+        handlers = []
+        nodes = [self._root]
+        # Wildcards in the first level never match $SYS-style topics
+        wildcards = not topic.startswith("$")
+
+        for level in topic.split("/"):
+            next_nodes = []
+            for node in nodes:
+                child = node.children.get(level)
+                if child is not None:
+                    next_nodes.append(child)
+                if wildcards:
+                    hash_node = node.children.get("#")
+                    if hash_node is not None:
+                        handlers.extend(hash_node.handlers)
+                    plus_node = node.children.get("+")
+                    if plus_node is not None:
+                        next_nodes.append(plus_node)
+            if not next_nodes:
+                return handlers
+            nodes = next_nodes
+            wildcards = True
+
+        for node in nodes:
+            handlers.extend(node.handlers)
+            # 'a/#' matches 'a' itself
+            hash_node = node.children.get("#")
+            if hash_node is not None:
+                handlers.extend(hash_node.handlers)
+        return handlers
+
+    def patterns(self) -> Iterator[str]:
+        """Every topic filter with at least one handler"""
+        stack = [(self._root, [])]
+        while stack:
+            node, levels = stack.pop()
+            if node.handlers:
+                yield "/".join(levels)
+            for level, child in node.children.items():
+                stack.append((child, levels + [level]))
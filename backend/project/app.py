@@ -1,11 +1,20 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Body, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import confloat
+from sqlalchemy import exc
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 import uvicorn
 import models
 import schemas
 import crud
-from database import SessionLocal, engine
+import portfolio
+import project_overview
+from overview_sections import load_overview, parse_fields, parse_include
+from project_cache import budget_cache, invalidate_project, performance_cache
+from schedule import level_resources, what_if
+from timeline import CyclicDependencyError, timeline_store
+from database import SessionLocal, engine, pool_metrics, run_db
 
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
@@ -17,7 +26,7 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Dependency to get DB session
+# Dependency to get DB session (sync only; see DATABASE_ASYNC in database.py)
 def get_db():
     db = SessionLocal()
     try:
@@ -25,9 +34,22 @@ def get_db():
     finally:
         db.close()
 
+@app.exception_handler(exc.TimeoutError)
+async def pool_timeout_handler(request: Request, error: exc.TimeoutError):
+    # Raised when no pooled connection frees up within DB_POOL_TIMEOUT
+    pool_metrics.increment("timeouts")
+    return JSONResponse(status_code=503, content={"detail": "Database connection pool exhausted"})
+
 # Routes
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Database connection pool and cache metrics in Prometheus text format
+    """
+    return pool_metrics.render(engine.pool) + budget_cache.render() + performance_cache.render()
+
 @app.get("/projects/", response_model=List[schemas.Project])
-def read_projects(
+async def read_projects(
     skip: int = 0, 
     limit: int = 100, 
     status: Optional[str] = None,
@@ -39,8 +61,9 @@ def read_projects(
     """
     Get a list of projects with optional filtering
     """
-    projects = crud.get_projects(
+    projects = await run_db(
         db, 
+        crud.get_projects,
         skip=skip, 
         limit=limit, 
         status=status,
@@ -50,61 +73,153 @@ def read_projects(
     )
     return projects
 
+# Declared before /projects/{project_id} so "performance" is not parsed as an id
+@app.get("/projects/performance", response_model=schemas.ProjectPerformanceData)
+async def get_project_performance(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    project_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get performance data for projects
+
+    Read through a cache keyed by project and date range; writes to a project
+    invalidate its entries and every portfolio-wide entry.
+    """
+    async def load_performance():
+        performance_data = await run_db(
+            db, 
+            crud.get_project_performance,
+            start_date=start_date,
+            end_date=end_date,
+            project_id=project_id
+        )
+        return schemas.ProjectPerformanceData.validate(performance_data)
+    
+    return await performance_cache.get((project_id, start_date, end_date), load_performance)
+
+@app.get("/projects/performance/portfolio", response_model=portfolio.PortfolioPerformance)
+async def get_portfolio_performance(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Earned value, SPI, CPI and burn rate for every active project in a date window
+    """
+    async def load_portfolio():
+        try:
+            portfolio_data = await run_db(
+                db,
+                portfolio.get_portfolio_performance,
+                start_date=start_date,
+                end_date=end_date
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return portfolio.PortfolioPerformance.validate(portfolio_data)
+    
+    return await performance_cache.get((None, "portfolio", start_date, end_date), load_portfolio)
+
 @app.get("/projects/{project_id}", response_model=schemas.ProjectDetail)
-def read_project(project_id: int, db: Session = Depends(get_db)):
+async def read_project(project_id: int, db: Session = Depends(get_db)):
     """
     Get detailed information about a specific project
     """
-    db_project = crud.get_project(db, project_id=project_id)
+    db_project = await run_db(db, crud.get_project, project_id=project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     return db_project
 
+@app.get("/projects/{project_id}/overview")
+async def read_project_overview(
+    project_id: int,
+    include: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Several project sections in one response
+
+    include is a comma-separated subset of project, tasks, team, assets,
+    timeline and budget (all by default). fields keeps only the listed
+    fields per section, e.g. fields=tasks.id,tasks.name,project.status.
+    Timeline and budget come from their caches when warm; everything else
+    is loaded in a single pass with one project lookup.
+    """
+    try:
+        sections = parse_include(include)
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    async def load_sections(missing):
+        return await run_db(db, project_overview.load_sections, project_id=project_id, sections=missing)
+    
+    try:
+        loaded = await load_overview(project_id, sections, load_sections)
+    except CyclicDependencyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if loaded is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    return {
+        section: project_overview.serialize_section(section, loaded[section], selected.get(section))
+        for section in sections
+    }
+
 @app.post("/projects/", response_model=schemas.Project, status_code=201)
-def create_project(project: schemas.ProjectCreate, db: Session = Depends(get_db)):
+async def create_project(project: schemas.ProjectCreate, db: Session = Depends(get_db)):
     """
     Create a new project
     """
-    return crud.create_project(db=db, project=project)
+    db_project = await run_db(db, crud.create_project, project=project)
+    invalidate_project(db_project.id)
+    return db_project
 
 @app.put("/projects/{project_id}", response_model=schemas.Project)
-def update_project(project_id: int, project: schemas.ProjectUpdate, db: Session = Depends(get_db)):
+async def update_project(project_id: int, project: schemas.ProjectUpdate, db: Session = Depends(get_db)):
     """
     Update an existing project
     """
-    db_project = crud.update_project(db=db, project_id=project_id, project=project)
+    db_project = await run_db(db, crud.update_project, project_id=project_id, project=project)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
+    timeline_store.invalidate(project_id)
+    invalidate_project(project_id)
     return db_project
 
 @app.delete("/projects/{project_id}", response_model=schemas.ProjectDelete)
-def delete_project(project_id: int, db: Session = Depends(get_db)):
+async def delete_project(project_id: int, db: Session = Depends(get_db)):
     """
     Delete a project (soft delete)
     """
-    success = crud.delete_project(db=db, project_id=project_id)
+    success = await run_db(db, crud.delete_project, project_id=project_id)
     if not success:
         raise HTTPException(status_code=404, detail="Project not found")
+    timeline_store.invalidate(project_id)
+    invalidate_project(project_id)
     return {"id": project_id, "deleted": True}
 
 @app.get("/projects/{project_id}/tasks", response_model=List[schemas.Task])
-def read_project_tasks(project_id: int, db: Session = Depends(get_db)):
+async def read_project_tasks(project_id: int, db: Session = Depends(get_db)):
     """
     Get all tasks for a specific project
     """
-    db_project = crud.get_project(db, project_id=project_id)
+    db_project = await run_db(db, crud.get_project, project_id=project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    tasks = crud.get_project_tasks(db, project_id=project_id)
+    tasks = await run_db(db, crud.get_project_tasks, project_id=project_id)
     return tasks
 
 @app.post("/projects/{project_id}/tasks", response_model=schemas.Task, status_code=201)
-def create_project_task(project_id: int, task: schemas.TaskCreate, db: Session = Depends(get_db)):
+async def create_project_task(project_id: int, task: schemas.TaskCreate, db: Session = Depends(get_db)):
     """
     Create a new task for a project
     """
-    db_project = crud.get_project(db, project_id=project_id)
+    db_project = await run_db(db, crud.get_project, project_id=project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -112,26 +227,29 @@ def create_project_task(project_id: int, task: schemas.TaskCreate, db: Session =
     task_data = task.dict()
     task_data["project_id"] = project_id
     
-    return crud.create_task(db=db, task=schemas.TaskCreate(**task_data))
+    db_task = await run_db(db, crud.create_task, task=schemas.TaskCreate(**task_data))
+    timeline_store.task_added(project_id, db_task)
+    invalidate_project(project_id)
+    return db_task
 
 @app.get("/projects/{project_id}/team", response_model=List[schemas.TeamMember])
-def read_project_team(project_id: int, db: Session = Depends(get_db)):
+async def read_project_team(project_id: int, db: Session = Depends(get_db)):
     """
     Get all team members for a specific project
     """
-    db_project = crud.get_project(db, project_id=project_id)
+    db_project = await run_db(db, crud.get_project, project_id=project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    team_members = crud.get_project_team(db, project_id=project_id)
+    team_members = await run_db(db, crud.get_project_team, project_id=project_id)
     return team_members
 
 @app.post("/projects/{project_id}/team", response_model=schemas.TeamMember, status_code=201)
-def add_team_member(project_id: int, team_member: schemas.TeamMemberCreate, db: Session = Depends(get_db)):
+async def add_team_member(project_id: int, team_member: schemas.TeamMemberCreate, db: Session = Depends(get_db)):
     """
     Add a team member to a project
     """
-    db_project = crud.get_project(db, project_id=project_id)
+    db_project = await run_db(db, crud.get_project, project_id=project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -139,26 +257,28 @@ def add_team_member(project_id: int, team_member: schemas.TeamMemberCreate, db:
     member_data = team_member.dict()
     member_data["project_id"] = project_id
     
-    return crud.add_team_member(db=db, team_member=schemas.TeamMemberCreate(**member_data))
+    db_member = await run_db(db, crud.add_team_member, team_member=schemas.TeamMemberCreate(**member_data))
+    invalidate_project(project_id)
+    return db_member
 
 @app.get("/projects/{project_id}/assets", response_model=List[schemas.ProjectAsset])
-def read_project_assets(project_id: int, db: Session = Depends(get_db)):
+async def read_project_assets(project_id: int, db: Session = Depends(get_db)):
     """
     Get all assets assigned to a specific project
     """
-    db_project = crud.get_project(db, project_id=project_id)
+    db_project = await run_db(db, crud.get_project, project_id=project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    assets = crud.get_project_assets(db, project_id=project_id)
+    assets = await run_db(db, crud.get_project_assets, project_id=project_id)
     return assets
 
 @app.post("/projects/{project_id}/assets", response_model=schemas.ProjectAsset, status_code=201)
-def assign_asset_to_project(project_id: int, asset: schemas.ProjectAssetCreate, db: Session = Depends(get_db)):
+async def assign_asset_to_project(project_id: int, asset: schemas.ProjectAssetCreate, db: Session = Depends(get_db)):
     """
     Assign an asset to a project
     """
-    db_project = crud.get_project(db, project_id=project_id)
+    db_project = await run_db(db, crud.get_project, project_id=project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -166,49 +286,103 @@ def assign_asset_to_project(project_id: int, asset: schemas.ProjectAssetCreate,
     asset_data = asset.dict()
     asset_data["project_id"] = project_id
     
-    return crud.assign_asset_to_project(db=db, project_asset=schemas.ProjectAssetCreate(**asset_data))
+    db_asset = await run_db(db, crud.assign_asset_to_project, project_asset=schemas.ProjectAssetCreate(**asset_data))
+    invalidate_project(project_id)
+    return db_asset
 
 @app.get("/projects/{project_id}/timeline", response_model=schemas.ProjectTimeline)
-def get_project_timeline(project_id: int, db: Session = Depends(get_db)):
+async def get_project_timeline(project_id: int, db: Session = Depends(get_db)):
     """
     Get timeline data for a specific project
+
+    Served from the materialized timeline; it is rebuilt from the tasks only
+    after a write has invalidated it.
     """
-    db_project = crud.get_project(db, project_id=project_id)
+    timeline = timeline_store.get(project_id)
+    if timeline is not None:
+        return timeline
+    
+    db_project = await run_db(db, crud.get_project, project_id=project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    timeline = crud.get_project_timeline(db, project_id=project_id)
-    return timeline
+    generation = timeline_store.generation(project_id)
+    try:
+        db_timeline = await run_db(db, project_overview.build_project_timeline, project_id=project_id)
+    except CyclicDependencyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return timeline_store.put(db_timeline, generation)
 
-@app.get("/projects/{project_id}/budget", response_model=schemas.ProjectBudget)
-def get_project_budget(project_id: int, db: Session = Depends(get_db)):
+@app.get("/projects/{project_id}/schedule")
+async def get_project_schedule(
+    project_id: int,
+    level: bool = False,
+    db: Session = Depends(get_db)
+):
     """
-    Get budget information for a specific project
+    Critical path schedule for a project's tasks
+
+    Early/late start and finish and total float for every task. With
+    level=true, tasks assigned to team members are also leveled so each
+    member works on one task at a time.
     """
-    db_project = crud.get_project(db, project_id=project_id)
+    db_project = await run_db(db, crud.get_project, project_id=project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    budget = crud.get_project_budget(db, project_id=project_id)
-    return budget
+    try:
+        schedule = await run_db(db, project_overview.build_project_schedule, project_id=project_id)
+    except CyclicDependencyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not level:
+        return schedule.to_dict()
+    team = await run_db(db, project_overview.get_project_team_ids, project_id=project_id)
+    start, finish = level_resources(schedule, team)
+    return schedule.to_dict(start=start, finish=finish)
 
-@app.get("/projects/performance", response_model=schemas.ProjectPerformanceData)
-def get_project_performance(
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
-    project_id: Optional[int] = None,
+@app.post("/projects/{project_id}/schedule/what-if")
+async def evaluate_schedule_what_if(
+    project_id: int,
+    durations: Dict[int, confloat(ge=0)] = Body({}),
+    delays: Dict[int, confloat(ge=0)] = Body({}),
     db: Session = Depends(get_db)
 ):
     """
-    Get performance data for projects
+    Re-run the schedule with changed task durations or start delays (in days)
+
+    Returns the new end date, the slip against the current schedule and
+    the tasks whose dates move.
     """
-    performance_data = crud.get_project_performance(
-        db, 
-        start_date=start_date,
-        end_date=end_date,
-        project_id=project_id
-    )
-    return performance_data
+    db_project = await run_db(db, crud.get_project, project_id=project_id)
+    if db_project is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    try:
+        schedule = await run_db(db, project_overview.build_project_schedule, project_id=project_id)
+        return what_if(schedule, durations=durations, delays=delays)
+    except CyclicDependencyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Task {e.args[0]} is not in this project")
+
+@app.get("/projects/{project_id}/budget", response_model=schemas.ProjectBudget)
+async def get_project_budget(project_id: int, db: Session = Depends(get_db)):
+    """
+    Get budget information for a specific project
+
+    Read through a cache that project, task, team and asset writes invalidate.
+    """
+    async def load_budget():
+        db_project = await run_db(db, crud.get_project, project_id=project_id)
+        if db_project is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        
+        budget = await run_db(db, crud.get_project_budget, project_id=project_id)
+        # Cache the validated response rather than session-bound objects
+        return schemas.ProjectBudget.validate(budget)
+    
+    return await budget_cache.get((project_id,), load_budget)
 
 # Run the app
 if __name__ == "__main__":
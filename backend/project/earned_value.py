@@ -0,0 +1,72 @@
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Per-row fallback for the post-processing
+    np = None
+
+INDEX_NAMES = (
+    "percent_complete", "percent_planned", "earned_value", "planned_value",
+    "spi", "cpi", "burn_rate", "estimate_at_completion",
+)
+
+def ratio(numerator, denominator):
+    return numerator / denominator if denominator > 0 else None
+
+def indices_numpy(columns: Dict[str, List[float]]) -> Dict[str, List[Optional[float]]]:
+    budget = np.asarray(columns["budget"], dtype=float)
+    actual = np.asarray(columns["actual_cost"], dtype=float)
+    elapsed = np.maximum(np.asarray(columns["elapsed_days"], dtype=float), 0.0)
+    task_days = np.asarray(columns["task_days"], dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent_complete = np.where(task_days > 0, np.asarray(columns["earned_days"]) / task_days, 0.0)
+        percent_planned = np.where(task_days > 0, np.asarray(columns["planned_days"]) / task_days, 0.0)
+        earned = budget * percent_complete
+        planned = budget * percent_planned
+        spi = np.where(planned > 0, earned / planned, np.nan)
+        cpi = np.where(actual > 0, earned / actual, np.nan)
+        burn_rate = np.where(elapsed > 0, actual / elapsed, np.nan)
+        estimate = np.where(cpi > 0, budget / cpi, np.nan)
+
+    def column(values):
+        return [None if v != v else round(float(v), 4) for v in values]
+
+    return {
+        "percent_complete": column(percent_complete * 100),
+        "percent_planned": column(percent_planned * 100),
+        "earned_value": column(earned),
+        "planned_value": column(planned),
+        "spi": column(spi),
+        "cpi": column(cpi),
+        "burn_rate": column(burn_rate),
+        "estimate_at_completion": column(estimate),
+    }
+
+def indices_python(columns: Dict[str, List[float]]) -> Dict[str, List[Optional[float]]]:
+    result = {name: [] for name in INDEX_NAMES}
+    for budget, actual, elapsed, task_days, earned_days, planned_days in zip(
+        columns["budget"], columns["actual_cost"], columns["elapsed_days"],
+        columns["task_days"], columns["earned_days"], columns["planned_days"]
+    ):
+        complete = ratio(earned_days, task_days) or 0.0
+        scheduled = ratio(planned_days, task_days) or 0.0
+        earned = budget * complete
+        planned = budget * scheduled
+        cpi = ratio(earned, actual)
+        values = {
+            "percent_complete": complete * 100,
+            "percent_planned": scheduled * 100,
+            "earned_value": earned,
+            "planned_value": planned,
+            "spi": ratio(earned, planned),
+            "cpi": cpi,
+            "burn_rate": ratio(actual, max(elapsed, 0.0)),
+            "estimate_at_completion": budget / cpi if cpi else None,
+        }
+        for name, value in values.items():
+            result[name].append(None if value is None else round(value, 4))
+    return result
+
+def portfolio_indices(columns: Dict[str, List[float]]) -> Dict[str, List[Optional[float]]]:
+    """Earned value indices per project from the portfolio rollup columns, rounded to 4 places"""
+    return (indices_numpy if np is not None else indices_python)(columns)
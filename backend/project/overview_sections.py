@@ -0,0 +1,68 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from project_cache import ReadThroughCache, budget_cache
+from timeline import TimelineStore, timeline_store
+
+# Sections of /projects/{id}/overview, in response order when include is empty
+SECTION_NAMES = ("project", "tasks", "team", "assets", "timeline", "budget")
+
+def parse_include(include: Optional[str]) -> List[str]:
+    """Comma-separated section names; all sections when empty"""
+    if not include:
+        return list(SECTION_NAMES)
+    sections = [name.strip() for name in include.split(",") if name.strip()]
+    unknown = [name for name in sections if name not in SECTION_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown sections: {', '.join(unknown)}")
+    return sections
+
+def parse_fields(fields: Optional[str]) -> Dict[str, Set[str]]:
+    """'section.field' entries, comma-separated, grouped by section"""
+    selected: Dict[str, Set[str]] = {}
+    for entry in (fields or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        section, _, field = entry.partition(".")
+        if section not in SECTION_NAMES or not field:
+            raise ValueError(f"Invalid field selector: {entry}")
+        selected.setdefault(section, set()).add(field)
+    return selected
+
+async def load_overview(
+    project_id: int,
+    sections: List[str],
+    load_sections: Callable[[List[str]], Awaitable[Optional[Dict[str, Any]]]],
+    timelines: TimelineStore = timeline_store,
+    budgets: ReadThroughCache = budget_cache
+) -> Optional[Dict[str, Any]]:
+    """
+    Every requested section; None if the project does not exist.
+
+    Timeline and budget come from their caches when warm. load_sections is
+    awaited with the remaining sections (see project_overview.load_sections)
+    and is always called, so a cached section never hides a deleted project.
+    """
+    cached: Dict[str, Any] = {}
+    if "timeline" in sections:
+        timeline = timelines.get(project_id)
+        if timeline is not None:
+            cached["timeline"] = timeline
+    if "budget" in sections:
+        budget = budgets.peek((project_id,))
+        if budget is not None:
+            cached["budget"] = budget
+
+    # Generations are read before loading so a concurrent write keeps stale results out of the caches
+    timeline_generation = timelines.generation(project_id)
+    budget_generation = budgets.generation(project_id)
+    loaded = await load_sections([section for section in sections if section not in cached])
+    if loaded is None:
+        return None
+
+    if "timeline" in loaded:
+        loaded["timeline"] = timelines.put(loaded["timeline"], timeline_generation)
+    if "budget" in loaded:
+        budgets.put((project_id,), loaded["budget"], budget_generation)
+    loaded.update(cached)
+    return loaded
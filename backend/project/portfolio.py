@@ -0,0 +1,134 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import Date, case, func, literal, or_, select
+from sqlalchemy.orm import Session
+
+import models
+from earned_value import portfolio_indices, ratio
+
+class PortfolioProjectPerformance(BaseModel):
+    project_id: int
+    name: str
+    status: Optional[str] = None
+    budget: float
+    actual_cost: float
+    percent_complete: Optional[float] = None
+    percent_planned: Optional[float] = None
+    earned_value: Optional[float] = None
+    planned_value: Optional[float] = None
+    spi: Optional[float] = None
+    cpi: Optional[float] = None
+    burn_rate: Optional[float] = None
+    estimate_at_completion: Optional[float] = None
+
+class PortfolioPerformance(BaseModel):
+    start_date: date
+    end_date: date
+    project_count: int
+    budget: float
+    actual_cost: float
+    earned_value: float
+    planned_value: float
+    spi: Optional[float] = None
+    cpi: Optional[float] = None
+    projects: List[PortfolioProjectPerformance]
+
+def _days_between(dialect: str, start, end):
+    if dialect == "postgresql":
+        return (func.extract("epoch", end) - func.extract("epoch", start)) / 86400.0
+    # SQLite stores dates as ISO text
+    return func.julianday(end) - func.julianday(start)
+
+def _portfolio_statement(dialect: str, start_day: date, end_day: date):
+    """One statement: active projects in the window joined to their task rollups"""
+    task = models.Task
+    project = models.Project
+    as_of = literal(end_day, Date)
+
+    duration = _days_between(dialect, task.start_date, task.end_date)
+    elapsed = _days_between(dialect, task.start_date, as_of)
+    # Days of each task that should be done by as_of
+    planned = case((elapsed <= 0, 0.0), (elapsed >= duration, duration), else_=elapsed)
+
+    rollup = (
+        select(
+            task.project_id.label("project_id"),
+            func.sum(duration).label("task_days"),
+            func.sum(duration * func.coalesce(task.progress, 0) / 100.0).label("earned_days"),
+            func.sum(planned).label("planned_days"),
+        )
+        .where(task.start_date.isnot(None), task.end_date.isnot(None))
+        .group_by(task.project_id)
+        .subquery()
+    )
+
+    return (
+        select(
+            project.id,
+            project.name,
+            project.status,
+            func.coalesce(project.budget, 0.0),
+            func.coalesce(project.actual_cost, 0.0),
+            func.coalesce(_days_between(dialect, project.start_date, as_of), 0.0),
+            func.coalesce(rollup.c.task_days, 0.0),
+            func.coalesce(rollup.c.earned_days, 0.0),
+            func.coalesce(rollup.c.planned_days, 0.0),
+        )
+        .outerjoin(rollup, rollup.c.project_id == project.id)
+        .where(
+            project.is_active == True,
+            or_(project.start_date.is_(None), project.start_date <= end_day),
+            or_(project.end_date.is_(None), project.end_date >= start_day),
+        )
+        .order_by(project.id)
+    )
+
+def get_portfolio_performance(
+    db: Session,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Earned value, SPI, CPI and burn rate for every active project in the window, as of its end.
+
+    Planned and earned progress are task-duration weighted. The rollup is one
+    GROUP BY over tasks joined to projects; the indices are then computed
+    column-wise, so the cost is one query regardless of portfolio size.
+    """
+    end_day = datetime.fromisoformat(end_date).date() if end_date else datetime.utcnow().date()
+    start_day = datetime.fromisoformat(start_date).date() if start_date else end_day - timedelta(days=30)
+
+    rows = db.execute(_portfolio_statement(db.get_bind().dialect.name, start_day, end_day)).all()
+    names = ["project_id", "name", "status", "budget", "actual_cost", "elapsed_days", "task_days", "earned_days", "planned_days"]
+    columns = {name: [] for name in names}
+    for name, values in zip(names, zip(*rows)):
+        columns[name] = list(values)
+    for name in names[3:]:
+        columns[name] = [float(value) for value in columns[name]]
+
+    indices = portfolio_indices(columns)
+
+    projects = []
+    for i in range(len(rows)):
+        item = {name: columns[name][i] for name in ("project_id", "name", "status", "budget", "actual_cost")}
+        item.update({name: values[i] for name, values in indices.items()})
+        projects.append(item)
+
+    total_budget = sum(columns["budget"])
+    total_actual = sum(columns["actual_cost"])
+    total_earned = sum(v or 0.0 for v in indices["earned_value"])
+    total_planned = sum(v or 0.0 for v in indices["planned_value"])
+    return {
+        "start_date": start_day,
+        "end_date": end_day,
+        "project_count": len(projects),
+        "budget": total_budget,
+        "actual_cost": total_actual,
+        "earned_value": round(total_earned, 4),
+        "planned_value": round(total_planned, 4),
+        "spi": ratio(total_earned, total_planned),
+        "cpi": ratio(total_earned, total_actual),
+        "projects": projects,
+    }
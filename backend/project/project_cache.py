@@ -0,0 +1,133 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+class ReadThroughCache:
+    """Size-bounded LRU cache of read results, invalidated by project writes
+
+    Keys are tuples whose first element is the project id, or None for
+    results spanning all projects. invalidate_project(project_id) drops that
+    project's keys and every portfolio (None) key. Concurrent misses for the
+    same key share one load, and a load that raced with an invalidation is
+    returned but not stored. The TTL only bounds staleness from writes made
+    outside this process.
+    """
+
+    def __init__(self, name: str, max_size: int = 10000, ttl: float = 60.0):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._keys_by_project: Dict[Optional[int], Set[Tuple]] = {}
+        self._pending: Dict[Tuple, asyncio.Future] = {}
+        self._generations: Dict[Optional[int], int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_environment(cls, name: str) -> "ReadThroughCache":
+        return cls(
+            name,
+            max_size=int(os.environ.get("PROJECT_CACHE_MAX_SIZE", "10000")),
+            ttl=float(os.environ.get("PROJECT_CACHE_TTL", "60")),
+        )
+
+    def generation(self, project_id: Optional[int]) -> Tuple[int, int]:
+        return self._generations.get(project_id, 0), self._generations.get(None, 0)
+
+    def peek(self, key: Tuple) -> Optional[Any]:
+        """Cached value without loading; counts as a hit only when present"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Tuple, value: Any, generation: Tuple[int, int]) -> None:
+        """Store a value loaded elsewhere, unless key's project was invalidated since generation"""
+        self.misses += 1
+        if generation == self.generation(key[0]):
+            self._store(key, value)
+
+    async def get(self, key: Tuple, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        project_id = key[0]
+        generation = self.generation(project_id)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            value = await loader()
+        except BaseException as e:
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                # Waiters see the error; nobody else needs to retrieve it
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        finally:
+            del self._pending[key]
+
+        future.set_result(value)
+        if generation == self.generation(project_id):
+            self._store(key, value)
+        return value
+
+    def _store(self, key: Tuple, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        self._keys_by_project.setdefault(key[0], set()).add(key)
+        while len(self._entries) > self.max_size:
+            old_key, _ = self._entries.popitem(last=False)
+            self._keys_by_project.get(old_key[0], set()).discard(old_key)
+
+    def invalidate_project(self, project_id: int) -> None:
+        """Drop everything derived from a project's data"""
+        self.invalidations += 1
+        for scope in (project_id, None):
+            self._generations[scope] = self._generations.get(scope, 0) + 1
+            for key in self._keys_by_project.pop(scope, ()):
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits_total": self.hits,
+            "misses_total": self.misses,
+            "invalidations_total": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def render(self) -> str:
+        """Prometheus text exposition format, like PoolMetrics.render"""
+        lines = []
+        for name, value in self.stats().items():
+            metric = f"{self.name}_cache_{name}"
+            kind = "counter" if name.endswith("_total") else "gauge"
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+budget_cache = ReadThroughCache.from_environment("project_budget")
+performance_cache = ReadThroughCache.from_environment("project_performance")
+
+def invalidate_project(project_id: int) -> None:
+    """Call after any write that can change a project's budget or performance figures"""
+    budget_cache.invalidate_project(project_id)
+    performance_cache.invalidate_project(project_id)
@@ -0,0 +1,73 @@
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+import crud
+import schemas
+from schedule import Schedule, TaskGraph, compute_schedule
+from timeline import Timeline, task_field
+
+# Section name (see overview_sections.SECTION_NAMES) -> response model for one item
+SECTION_SCHEMAS = {
+    "project": schemas.Project,
+    "tasks": schemas.Task,
+    "team": schemas.TeamMember,
+    "assets": schemas.ProjectAsset,
+    "timeline": None,
+    "budget": schemas.ProjectBudget,
+}
+
+def load_sections(db: Session, project_id: int, sections: Iterable[str]) -> Optional[Dict[str, Any]]:
+    """
+    Load the requested sections in one pass on one session; None if the project does not exist.
+
+    The project is looked up once for all sections, and tasks are loaded
+    once when both the task list and a timeline rebuild need them.
+    """
+    sections = set(sections)
+    db_project = crud.get_project(db, project_id=project_id)
+    if db_project is None:
+        return None
+
+    loaded: Dict[str, Any] = {}
+    if "project" in sections:
+        loaded["project"] = db_project
+    if "tasks" in sections or "timeline" in sections:
+        tasks = crud.get_project_tasks(db, project_id=project_id)
+        if "tasks" in sections:
+            loaded["tasks"] = tasks
+        if "timeline" in sections:
+            loaded["timeline"] = Timeline(project_id, tasks)
+    if "team" in sections:
+        loaded["team"] = crud.get_project_team(db, project_id=project_id)
+    if "assets" in sections:
+        loaded["assets"] = crud.get_project_assets(db, project_id=project_id)
+    if "budget" in sections:
+        loaded["budget"] = schemas.ProjectBudget.validate(crud.get_project_budget(db, project_id=project_id))
+    return loaded
+
+def _select(data: Dict[str, Any], fields: Optional[Set[str]]) -> Dict[str, Any]:
+    if not fields:
+        return data
+    return {name: value for name, value in data.items() if name in fields}
+
+def serialize_section(section: str, value: Any, fields: Optional[Set[str]] = None) -> Any:
+    """Validate a section against its response model and keep only the selected fields"""
+    schema = SECTION_SCHEMAS[section]
+
+    def one(item):
+        data = schema.validate(item).dict() if schema is not None else item
+        return _select(data, fields)
+
+    if isinstance(value, list):
+        return [one(item) for item in value]
+    return one(value)
+
+def build_project_timeline(db: Session, project_id: int) -> Timeline:
+    return Timeline(project_id, crud.get_project_tasks(db, project_id=project_id))
+
+def build_project_schedule(db: Session, project_id: int) -> Schedule:
+    return compute_schedule(TaskGraph(crud.get_project_tasks(db, project_id=project_id)))
+
+def get_project_team_ids(db: Session, project_id: int) -> List[Any]:
+    return [task_field(member, "user_id") for member in crud.get_project_team(db, project_id=project_id)]
@@ -0,0 +1,242 @@
+import heapq
+from array import array
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from timeline import CyclicDependencyError, as_date, task_field
+
+class TaskGraph:
+    """Task dependency graph in flat arrays
+
+    Tasks are numbered 0..n-1 in input order. Successors and predecessors
+    are stored in CSR form: the successors of task i are
+    succ[succ_start[i]:succ_start[i + 1]]. Durations and release offsets
+    are in days from the project start. The topological order is computed
+    once and reused by every pass over the graph.
+    """
+
+    def __init__(self, tasks: Iterable[Any], project_start: Optional[date] = None):
+        tasks = list(tasks)
+        self.ids: List[Any] = [task_field(task, "id") for task in tasks]
+        self.index: Dict[Any, int] = {task_id: i for i, task_id in enumerate(self.ids)}
+        n = len(self.ids)
+
+        starts = [as_date(task_field(task, "start_date")) for task in tasks]
+        ends = [as_date(task_field(task, "end_date")) for task in tasks]
+        planned = [d for d in starts if d is not None]
+        self.project_start = project_start or (min(planned) if planned else date.today())
+
+        self.duration = [0.0] * n
+        self.release = [0.0] * n
+        self.assignee: List[Any] = [task_field(task, "assignee_id") for task in tasks]
+        for i in range(n):
+            if starts[i] is not None:
+                self.release[i] = float(max((starts[i] - self.project_start).days, 0))
+                if ends[i] is not None:
+                    self.duration[i] = float(max((ends[i] - starts[i]).days, 0))
+
+        # Edge list, then counting sort into CSR; unknown dependencies are ignored
+        edge_from = array("i")
+        edge_to = array("i")
+        index = self.index
+        for i, task in enumerate(tasks):
+            for dependency_id in task_field(task, "dependency_ids") or ():
+                j = index.get(dependency_id)
+                if j is not None:
+                    edge_from.append(j)
+                    edge_to.append(i)
+        self.succ_start, self.succ = self._csr(n, edge_from, edge_to)
+        self.pred_start, self.pred = self._csr(n, edge_to, edge_from)
+        self.order = self._topological_order()
+
+    @staticmethod
+    def _csr(n: int, sources: array, targets: array):
+        start = array("i", [0]) * (n + 1)
+        for s in sources:
+            start[s + 1] += 1
+        for i in range(n):
+            start[i + 1] += start[i]
+        fill = array("i", start[:n])
+        adjacency = array("i", [0]) * len(sources)
+        for s, t in zip(sources, targets):
+            adjacency[fill[s]] = t
+            fill[s] += 1
+        return start, adjacency
+
+    def _topological_order(self) -> array:
+        n = len(self.ids)
+        succ_start, succ = self.succ_start, self.succ
+        indegree = [self.pred_start[i + 1] - self.pred_start[i] for i in range(n)]
+        order = array("i", (i for i in range(n) if indegree[i] == 0))
+        head = 0
+        while head < len(order):
+            i = order[head]
+            head += 1
+            for k in range(succ_start[i], succ_start[i + 1]):
+                j = succ[k]
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    order.append(j)
+        if len(order) != n:
+            raise CyclicDependencyError("Task dependencies contain a cycle")
+        return order
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+class Schedule:
+    """Result of a CPM pass, indexed like TaskGraph; all values are day offsets"""
+
+    def __init__(self, graph: TaskGraph, early_start, early_finish, late_start, late_finish):
+        self.graph = graph
+        self.early_start = early_start
+        self.early_finish = early_finish
+        self.late_start = late_start
+        self.late_finish = late_finish
+        self.total_float = [ls - es for es, ls in zip(early_start, late_start)]
+        self.makespan = max(early_finish, default=0.0)
+
+    def critical(self) -> List[Any]:
+        return [self.graph.ids[i] for i in self.graph.order if self.total_float[i] <= 1e-9]
+
+    def to_dict(self, start: Optional[List[float]] = None, finish: Optional[List[float]] = None) -> Dict[str, Any]:
+        """Dates for every task in topological order; start/finish override the early dates (leveling)"""
+        graph = self.graph
+        origin = graph.project_start
+        start = start or self.early_start
+        finish = finish or self.early_finish
+        tasks = []
+        for i in graph.order:
+            tasks.append({
+                "id": graph.ids[i],
+                "start_date": origin + timedelta(days=start[i]),
+                "end_date": origin + timedelta(days=finish[i]),
+                "early_start": origin + timedelta(days=self.early_start[i]),
+                "early_finish": origin + timedelta(days=self.early_finish[i]),
+                "late_start": origin + timedelta(days=self.late_start[i]),
+                "late_finish": origin + timedelta(days=self.late_finish[i]),
+                "total_float": self.total_float[i],
+                "is_critical": self.total_float[i] <= 1e-9,
+            })
+        makespan = max(finish, default=0.0)
+        return {
+            "start_date": origin,
+            "end_date": origin + timedelta(days=makespan),
+            "duration_days": makespan,
+            "critical_path": self.critical(),
+            "tasks": tasks,
+        }
+
+def compute_schedule(graph: TaskGraph, duration: Optional[List[float]] = None, release: Optional[List[float]] = None) -> Schedule:
+    """CPM forward and backward pass in O(tasks + dependencies)
+
+    duration and release replace the graph's own arrays for what-if runs.
+    """
+    n = len(graph)
+    duration = duration or graph.duration
+    order = graph.order
+    succ_start, succ = graph.succ_start, graph.succ
+    pred_start, pred = graph.pred_start, graph.pred
+
+    early_start = list(release or graph.release)
+    early_finish = [0.0] * n
+    for i in order:
+        es = early_start[i]
+        for k in range(pred_start[i], pred_start[i + 1]):
+            finish = early_finish[pred[k]]
+            if finish > es:
+                es = finish
+        early_start[i] = es
+        early_finish[i] = es + duration[i]
+
+    makespan = max(early_finish, default=0.0)
+    late_finish = [makespan] * n
+    late_start = [0.0] * n
+    for i in reversed(order):
+        lf = late_finish[i]
+        for k in range(succ_start[i], succ_start[i + 1]):
+            start = late_start[succ[k]]
+            if start < lf:
+                lf = start
+        late_finish[i] = lf
+        late_start[i] = lf - duration[i]
+
+    return Schedule(graph, early_start, early_finish, late_start, late_finish)
+
+def level_resources(schedule: Schedule, resources: Iterable[Any]):
+    """Serial schedule generation: one task at a time per team member
+
+    Ready tasks are started in order of late start (least float first), each
+    no earlier than its dependencies finish and its assignee is free. Tasks
+    whose assignee is not in resources are not constrained. Returns the
+    leveled start and finish offsets.
+    """
+    graph = schedule.graph
+    n = len(graph)
+    duration = graph.duration
+    succ_start, succ = graph.succ_start, graph.succ
+    pred_start = graph.pred_start
+    free_at = {resource: 0.0 for resource in resources}
+
+    remaining = [pred_start[i + 1] - pred_start[i] for i in range(n)]
+    ready_at = list(graph.release)
+    start = [0.0] * n
+    finish = [0.0] * n
+    ready = [(schedule.late_start[i], i) for i in range(n) if remaining[i] == 0]
+    heapq.heapify(ready)
+
+    while ready:
+        _, i = heapq.heappop(ready)
+        begin = ready_at[i]
+        assignee = graph.assignee[i]
+        if assignee in free_at:
+            begin = max(begin, free_at[assignee])
+            free_at[assignee] = begin + duration[i]
+        start[i] = begin
+        finish[i] = begin + duration[i]
+        for k in range(succ_start[i], succ_start[i + 1]):
+            j = succ[k]
+            if finish[i] > ready_at[j]:
+                ready_at[j] = finish[i]
+            remaining[j] -= 1
+            if remaining[j] == 0:
+                heapq.heappush(ready, (schedule.late_start[j], j))
+
+    return start, finish
+
+def what_if(schedule: Schedule, durations: Optional[Dict[Any, float]] = None, delays: Optional[Dict[Any, float]] = None) -> Dict[str, Any]:
+    """Re-run CPM with changed durations and/or start delays (days) and report what moves"""
+    for name, changes in (("duration", durations), ("delay", delays)):
+        for task_id, days in (changes or {}).items():
+            if days < 0:
+                raise ValueError(f"Task {task_id} {name} must not be negative")
+    graph = schedule.graph
+    duration = list(graph.duration)
+    for task_id, days in (durations or {}).items():
+        duration[graph.index[task_id]] = float(days)
+
+    release = list(graph.release)
+    for task_id, days in (delays or {}).items():
+        i = graph.index[task_id]
+        release[i] = max(release[i], schedule.early_start[i] + float(days))
+
+    scenario = compute_schedule(graph, duration, release)
+
+    origin = graph.project_start
+    moved = [
+        {
+            "id": graph.ids[i],
+            "start_date": origin + timedelta(days=scenario.early_start[i]),
+            "end_date": origin + timedelta(days=scenario.early_finish[i]),
+            "slip_days": scenario.early_finish[i] - schedule.early_finish[i],
+        }
+        for i in graph.order
+        if scenario.early_finish[i] != schedule.early_finish[i] or scenario.early_start[i] != schedule.early_start[i]
+    ]
+    return {
+        "baseline_end_date": origin + timedelta(days=schedule.makespan),
+        "end_date": origin + timedelta(days=scenario.makespan),
+        "slip_days": scenario.makespan - schedule.makespan,
+        "critical_path": scenario.critical(),
+        "moved_tasks": moved,
+    }
@@ -0,0 +1,232 @@
+import os
+import time
+from collections import OrderedDict, deque
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+def task_field(task: Any, name: str, default: Any = None) -> Any:
+    """Read a field from a Task model or a plain dict"""
+    if isinstance(task, dict):
+        return task.get(name, default)
+    return getattr(task, name, default)
+
+def as_date(value: Any) -> Optional[date]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(str(value)).date()
+
+class CyclicDependencyError(ValueError):
+    pass
+
+class TimelineEntry:
+    """One task as placed on the materialized timeline"""
+    __slots__ = ("id", "name", "status", "progress", "dependency_ids", "duration",
+                 "earliest_start", "earliest_finish", "driver")
+
+    def __init__(self, task: Any):
+        self.id = task_field(task, "id")
+        self.name = task_field(task, "name")
+        self.status = task_field(task, "status")
+        self.progress = task_field(task, "progress") or 0
+        self.dependency_ids = list(task_field(task, "dependency_ids") or [])
+        start = as_date(task_field(task, "start_date"))
+        end = as_date(task_field(task, "end_date"))
+        self.duration = max((end - start).days, 0) if start and end else 0
+        self.earliest_start = start
+        self.earliest_finish = None
+        # Predecessor that determines the start date; the critical path follows these links
+        self.driver = None
+
+    def place(self, entries: Dict[Any, "TimelineEntry"]) -> None:
+        """Start after the latest-finishing dependency, but not before the planned start"""
+        for dependency_id in self.dependency_ids:
+            finish = entries[dependency_id].earliest_finish
+            if finish is not None and (self.earliest_start is None or finish > self.earliest_start):
+                self.earliest_start = finish
+                self.driver = dependency_id
+        if self.earliest_start is not None:
+            self.earliest_finish = self.earliest_start + timedelta(days=self.duration)
+
+class Timeline:
+    """Task ordering, critical path and milestone dates for one project
+
+    Built with a single topological pass over the task DAG, O(tasks +
+    dependencies). A task added with dependencies on existing tasks only is
+    placed without rebuilding anything else.
+    """
+
+    def __init__(self, project_id: int, tasks: Iterable[Any]):
+        self.project_id = project_id
+        self.entries: Dict[Any, TimelineEntry] = {}
+        for task in tasks:
+            entry = TimelineEntry(task)
+            self.entries[entry.id] = entry
+        self.order: List[Any] = self._topological_order()
+        self.finish_id = None
+        for task_id in self.order:
+            self._place(self.entries[task_id])
+
+    def _topological_order(self) -> List[Any]:
+        # Kahn's algorithm; dependencies on tasks outside the project are ignored
+        indegree = {task_id: 0 for task_id in self.entries}
+        dependents: Dict[Any, List[Any]] = {task_id: [] for task_id in self.entries}
+        for entry in self.entries.values():
+            entry.dependency_ids = [d for d in entry.dependency_ids if d in self.entries]
+            for dependency_id in entry.dependency_ids:
+                dependents[dependency_id].append(entry.id)
+                indegree[entry.id] += 1
+
+        ready = deque(task_id for task_id, count in indegree.items() if count == 0)
+        order = []
+        while ready:
+            task_id = ready.popleft()
+            order.append(task_id)
+            for dependent_id in dependents[task_id]:
+                indegree[dependent_id] -= 1
+                if indegree[dependent_id] == 0:
+                    ready.append(dependent_id)
+
+        if len(order) != len(self.entries):
+            raise CyclicDependencyError(f"Task dependencies in project {self.project_id} contain a cycle")
+        return order
+
+    def _place(self, entry: TimelineEntry) -> None:
+        entry.place(self.entries)
+        if entry.earliest_finish is None:
+            return
+        finish = self.entries[self.finish_id].earliest_finish if self.finish_id is not None else None
+        if finish is None or entry.earliest_finish > finish:
+            self.finish_id = entry.id
+
+    def add_task(self, task: Any) -> bool:
+        """Place a new task incrementally; returns False when the timeline must be rebuilt instead"""
+        entry = TimelineEntry(task)
+        if entry.id in self.entries:
+            return False
+        if any(d not in self.entries for d in entry.dependency_ids):
+            return False
+        # Existing tasks cannot depend on a task that did not exist, so appending keeps the order valid
+        self.entries[entry.id] = entry
+        self.order.append(entry.id)
+        self._place(entry)
+        return True
+
+    def critical_path(self) -> List[Any]:
+        path = []
+        task_id = self.finish_id
+        while task_id is not None:
+            path.append(task_id)
+            task_id = self.entries[task_id].driver
+        path.reverse()
+        return path
+
+    def to_dict(self) -> Dict[str, Any]:
+        critical = set(self.critical_path())
+        tasks = []
+        milestones = []
+        starts = []
+        for task_id in self.order:
+            entry = self.entries[task_id]
+            if entry.earliest_start is not None:
+                starts.append(entry.earliest_start)
+            tasks.append({
+                "id": entry.id,
+                "name": entry.name,
+                "status": entry.status,
+                "progress": entry.progress,
+                "dependency_ids": entry.dependency_ids,
+                "start_date": entry.earliest_start,
+                "end_date": entry.earliest_finish,
+                "is_critical": entry.id in critical,
+            })
+            # Zero-duration tasks are milestones
+            if entry.duration == 0 and entry.earliest_start is not None:
+                milestones.append({"id": entry.id, "name": entry.name, "date": entry.earliest_start})
+
+        return {
+            "project_id": self.project_id,
+            "start_date": min(starts) if starts else None,
+            "end_date": self.entries[self.finish_id].earliest_finish if self.finish_id is not None else None,
+            "tasks": tasks,
+            "critical_path": self.critical_path(),
+            "milestones": milestones,
+        }
+
+class TimelineStore:
+    """Materialized timelines by project id, LRU-bounded with a TTL
+
+    Reads are a dict lookup of the serialized timeline. Task writes either
+    place the new task in the stored timeline or drop that project's entry;
+    no other project is touched. Each invalidation bumps the project's
+    generation so a rebuild that started before a write is not stored. As
+    with ReadThroughCache, the TTL only bounds staleness from writes made
+    outside this process.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        # project id -> [expires_at, timeline, serialized timeline or None]
+        self._entries: "OrderedDict[int, list]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+
+    @classmethod
+    def from_environment(cls) -> "TimelineStore":
+        return cls(
+            max_size=int(os.environ.get("PROJECT_CACHE_MAX_SIZE", "10000")),
+            ttl=float(os.environ.get("PROJECT_CACHE_TTL", "60")),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def generation(self, project_id: int) -> int:
+        return self._generations.get(project_id, 0)
+
+    def _entry(self, project_id: int) -> Optional[list]:
+        entry = self._entries.get(project_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[project_id]
+            return None
+        self._entries.move_to_end(project_id)
+        return entry
+
+    def get(self, project_id: int) -> Optional[Dict[str, Any]]:
+        entry = self._entry(project_id)
+        if entry is None:
+            return None
+        if entry[2] is None:
+            entry[2] = entry[1].to_dict()
+        return entry[2]
+
+    def put(self, timeline: Timeline, generation: int) -> Dict[str, Any]:
+        serialized = timeline.to_dict()
+        if generation == self.generation(timeline.project_id):
+            self._entries[timeline.project_id] = [time.monotonic() + self.ttl, timeline, serialized]
+            self._entries.move_to_end(timeline.project_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return serialized
+
+    def task_added(self, project_id: int, task: Any) -> None:
+        """Place a newly created task, falling back to invalidation"""
+        entry = self._entry(project_id)
+        self._generations[project_id] = self.generation(project_id) + 1
+        if entry is not None and entry[1].add_task(task):
+            # Serialized again on the next read
+            entry[2] = None
+        else:
+            self._entries.pop(project_id, None)
+
+    def invalidate(self, project_id: int) -> None:
+        """Drop a project's timeline; call after task edits, deletes or project date changes"""
+        self._generations[project_id] = self.generation(project_id) + 1
+        self._entries.pop(project_id, None)
+
+timeline_store = TimelineStore.from_environment()
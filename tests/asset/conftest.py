@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("fastapi")
+
+# The service modules use flat imports and read DATABASE_URL at import time
+SERVICE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "backend", "asset")
+sys.path.insert(0, os.path.abspath(SERVICE_DIR))
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "asset.db"))
+os.environ["DATABASE_ASYNC"] = "false"
+
+import database
+import models
+
+@pytest.fixture
+def db():
+    models.Base.metadata.drop_all(bind=database.engine)
+    models.Base.metadata.create_all(bind=database.engine)
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def client(db):
+    from fastapi.testclient import TestClient
+    import app
+    
+    with TestClient(app.app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def make_assets(db):
+    """Insert count assets with a single executemany"""
+    def make(count: int, **overrides):
+        rows = []
+        for i in range(count):
+            row = dict(
+                name=f"Asset {i:07d}",
+                type="excavator" if i % 2 else "crane",
+                category=("heavy", "light", "tools")[i % 3],
+                serial_number=f"SN-{i:07d}",
+                status=("available", "assigned", "maintenance")[i % 3],
+                is_active=True,
+            )
+            row.update(overrides)
+            rows.append(row)
+        db.execute(models.Asset.__table__.insert(), rows)
+        db.commit()
+    return make
@@ -0,0 +1,118 @@
+from sqlalchemy import select
+
+import models
+
+def _assets(db):
+    db.expire_all()
+    return {asset.id: asset for asset in db.scalars(select(models.Asset))}
+
+def _open_assignments(db, asset_id: int):
+    return db.scalars(
+        select(models.AssetAssignment).where(
+            models.AssetAssignment.asset_id == asset_id,
+            models.AssetAssignment.returned_at == None
+        )
+    ).all()
+
+def _results(response) -> dict:
+    assert response.status_code == 200, response.text
+    return {item["asset_id"]: item for item in response.json()["results"]}
+
+def test_batch_assign_reports_each_asset(client, db, make_assets):
+    make_assets(3, status="available")
+    make_assets(1, status="maintenance", serial_number="SN-MAINT")
+
+    response = client.post("/assets/batch/assign", json={"asset_ids": [1, 2, 3, 4, 99, 1], "project_id": 7})
+
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (3, 2)
+    results = _results(response)
+    assert list(results) == [1, 2, 3, 4, 99]
+    assert results[4]["detail"] == "Asset is not available for assignment"
+    assert results[99]["detail"] == "Asset not found"
+    assets = _assets(db)
+    for asset_id in (1, 2, 3):
+        assert results[asset_id]["assignment_id"] == _open_assignments(db, asset_id)[0].id
+        assert assets[asset_id].status == "assigned"
+        assert assets[asset_id].current_project_id == 7
+    assert assets[4].status == "maintenance"
+    assert not _open_assignments(db, 4)
+
+def test_batch_assign_all_or_nothing_leaves_assets_untouched(client, db, make_assets):
+    make_assets(3, status="available")
+    make_assets(1, status="maintenance", serial_number="SN-MAINT")
+
+    response = client.post(
+        "/assets/batch/assign", json={"asset_ids": [1, 2, 3, 4], "project_id": 7, "all_or_nothing": True}
+    )
+
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (0, 4)
+    results = _results(response)
+    assert results[4]["detail"] == "Asset is not available for assignment"
+    assert results[1]["detail"] == "Not assigned because other assets in the batch were not available"
+    assets = _assets(db)
+    assert [assets[asset_id].status for asset_id in (1, 2, 3, 4)] == ["available"] * 3 + ["maintenance"]
+    assert db.scalars(select(models.AssetAssignment)).all() == []
+
+    # Once the blocking asset is back, the same batch goes through in full
+    db.execute(models.Asset.__table__.update().where(models.Asset.id == 4).values(status="available"))
+    db.commit()
+    response = client.post(
+        "/assets/batch/assign", json={"asset_ids": [1, 2, 3, 4], "project_id": 7, "all_or_nothing": True}
+    )
+    assert response.json()["succeeded"] == 4
+
+def test_batch_release_returns_assets(client, db, make_assets):
+    make_assets(3, status="available")
+    assigned = _results(client.post("/assets/batch/assign", json={"asset_ids": [1, 2], "user_id": 5}))
+
+    response = client.post("/assets/batch/release", json={"asset_ids": [1, 2, 3]})
+
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 1)
+    results = _results(response)
+    assert results[1]["assignment_ids"] == [assigned[1]["assignment_id"]]
+    assert results[3]["detail"] == "Asset is not currently assigned"
+    assets = _assets(db)
+    assert all(assets[asset_id].status == "available" for asset_id in (1, 2, 3))
+    assert assets[1].assigned_user_id is None
+    assert not _open_assignments(db, 1)
+
+def test_batch_release_reports_every_closed_assignment(client, db, make_assets):
+    make_assets(1, status="assigned")
+    # Two open assignments for one asset, as left behind by older status updates
+    for project_id in (1, 2):
+        db.add(models.AssetAssignment(asset_id=1, project_id=project_id, status="active"))
+    db.commit()
+    open_ids = sorted(assignment.id for assignment in _open_assignments(db, 1))
+
+    results = _results(client.post("/assets/batch/release", json={"asset_ids": [1]}))
+
+    assert results[1]["assignment_ids"] == open_ids
+    assert results[1]["assignment_id"] == open_ids[-1]
+    assert not _open_assignments(db, 1)
+
+def test_batch_status_updates_other_statuses(client, db, make_assets):
+    make_assets(2, status="available")
+
+    response = client.post("/assets/batch/status", json={"asset_ids": [1, 2, 3], "status": "maintenance"})
+
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 1)
+    assert _results(response)[3]["detail"] == "Asset not found"
+    assets = _assets(db)
+    assert assets[1].status == assets[2].status == "maintenance"
+
+def test_batch_status_rejects_assignment_statuses(client, db, make_assets):
+    make_assets(1, status="available")
+    assert client.post("/assets/batch/assign", json={"asset_ids": [1], "project_id": 7}).json()["succeeded"] == 1
+
+    for status in ("available", "assigned"):
+        response = client.post("/assets/batch/status", json={"asset_ids": [1], "status": status})
+        assert response.status_code == 400
+
+    # The asset stays assigned, so a second assignment cannot open alongside the first
+    response = client.post("/assets/batch/assign", json={"asset_ids": [1], "project_id": 8})
+    assert response.json()["succeeded"] == 0
+    assert len(_open_assignments(db, 1)) == 1
@@ -0,0 +1,55 @@
+import asyncio
+import io
+import threading
+
+import pytest
+
+import crud
+import database
+import schemas
+
+CSV_UPLOAD = (
+    "name,type,category,status\n"
+    "Crane 1,crane,heavy,available\n"
+    ",crane,heavy,available\n"
+    "Drill 1,drill,tools,available\n"
+    "Drill 2,drill,tools,available\n"
+).encode()
+
+def _check(result):
+    assert result.total == 4
+    assert result.imported == 3
+    assert result.failed == 1
+    assert result.errors[0].row == 3
+
+def test_import_reports_bad_rows(db):
+    _check(crud.import_assets(db, io.BytesIO(CSV_UPLOAD), fmt="csv", chunk_size=2))
+
+def test_async_import_validates_off_the_event_loop(db, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    validating_threads = set()
+    parse_obj = schemas.AssetCreate.parse_obj
+
+    def recording_parse_obj(data):
+        validating_threads.add(threading.get_ident())
+        return parse_obj(data)
+
+    monkeypatch.setattr(schemas.AssetCreate, "parse_obj", recording_parse_obj)
+
+    async def run():
+        async_engine = create_async_engine(database._async_database_url(database.DATABASE_URL))
+        try:
+            async with async_sessionmaker(async_engine)() as session:
+                return threading.get_ident(), await crud.aimport_assets(
+                    session, io.BytesIO(CSV_UPLOAD), fmt="csv", chunk_size=2
+                )
+        finally:
+            await async_engine.dispose()
+
+    loop_thread, result = asyncio.run(run())
+
+    _check(result)
+    assert validating_threads and loop_thread not in validating_threads
+    assert len(crud.get_assets(db)) == 3
@@ -0,0 +1,66 @@
+import asyncio
+import statistics
+import time
+
+import pytest
+
+import app
+import database
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+CLIENTS = 500
+
+async def _serve(clients: int):
+    """Every client issues one list request at once; returns per-request latencies and total seconds"""
+    async with httpx.AsyncClient(app=app.app, base_url="http://test") as client:
+        async def one(i):
+            start = time.perf_counter()
+            response = await client.get("/assets/", params={"skip": i % 50, "limit": 20})
+            return response, time.perf_counter() - start
+        
+        start = time.perf_counter()
+        results = await asyncio.gather(*(one(i) for i in range(clients)), return_exceptions=True)
+        elapsed = time.perf_counter() - start
+    
+    errors = [result for result in results if isinstance(result, BaseException)]
+    assert not errors, errors[:3]
+    failed = [response.status_code for response, _ in results if response.status_code != 200]
+    assert not failed, failed[:10]
+    assert all(len(response.json()) == 20 for response, _ in results)
+    return sorted(latency for _, latency in results), elapsed
+
+def _report(mode: str, latencies, elapsed: float) -> str:
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    return (
+        f"{mode}: {len(latencies) / elapsed:.0f} req/s, latency p50 {statistics.median(latencies) * 1000:.0f}ms "
+        f"p95 {p95 * 1000:.0f}ms max {latencies[-1] * 1000:.0f}ms"
+    )
+
+@pytest.mark.benchmark
+def test_list_at_500_concurrent_clients_sync_and_async(db, make_assets):
+    make_assets(500)
+    
+    async_engine = create_async_engine(database._async_database_url(database.DATABASE_URL))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    
+    async def get_async_db():
+        async with AsyncSessionLocal() as session:
+            yield session
+    
+    sync_latencies, sync_elapsed = asyncio.run(_serve(CLIENTS))
+    app.app.dependency_overrides[app.get_db] = get_async_db
+    try:
+        async_latencies, async_elapsed = asyncio.run(_serve(CLIENTS))
+    finally:
+        app.app.dependency_overrides.pop(app.get_db, None)
+        asyncio.run(async_engine.dispose())
+    
+    print(f"\n{CLIENTS} clients, 0 errors")
+    print(_report("sync ", sync_latencies, sync_elapsed))
+    print(_report("async", async_latencies, async_elapsed))
+    print(f"async/sync p50 latency: {statistics.median(async_latencies) / statistics.median(sync_latencies):.2f}")
+    assert len(sync_latencies) == len(async_latencies) == CLIENTS
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app
+import database
+
+def _metrics(client) -> dict:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    values = {}
+    for line in response.text.splitlines():
+        if not line.startswith("#"):
+            name, value = line.split()
+            values[name] = float(value)
+    return values
+
+def test_metrics_exposes_pool_counters_and_gauges(client):
+    response = client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE db_pool_checkouts_total counter" in response.text
+    assert "# TYPE db_pool_checked_out gauge" in response.text
+    values = _metrics(client)
+    assert {"db_pool_size", "db_pool_overflow", "db_pool_checked_in", "db_pool_timeouts_total"} <= set(values)
+
+def test_metrics_track_checkouts_from_requests(client, make_assets):
+    make_assets(3)
+    before = _metrics(client)
+
+    for _ in range(3):
+        assert client.get("/assets/").status_code == 200
+
+    after = _metrics(client)
+    assert after["db_pool_checkouts_total"] - before["db_pool_checkouts_total"] >= 3
+    assert after["db_pool_checkins_total"] - before["db_pool_checkins_total"] >= 3
+    assert after["db_pool_checked_out_seconds_total"] > before["db_pool_checked_out_seconds_total"]
+    assert after["db_pool_checked_out"] == 0
+
+def test_checkout_timing_uses_pool_events():
+    metrics = database.PoolMetrics()
+    engine = create_engine(database.DATABASE_URL)
+    metrics.instrument(engine)
+    try:
+        with engine.connect():
+            assert metrics.snapshot(engine.pool)["checked_out"] == 1
+        data = metrics.snapshot(engine.pool)
+    finally:
+        engine.dispose()
+
+    assert data["checkouts_total"] == data["checkins_total"] == 1
+    assert data["checked_out"] == 0
+    assert 0 < data["checked_out_seconds_max"] <= data["checked_out_seconds_total"]
+
+def test_pool_timeout_returns_503_and_is_counted(client):
+    small_engine = create_engine(database.DATABASE_URL, pool_size=1, max_overflow=0, pool_timeout=0.05)
+    SmallSession = sessionmaker(bind=small_engine)
+
+    def get_small_db():
+        db = SmallSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    before = _metrics(client)["db_pool_timeouts_total"]
+    app.app.dependency_overrides[app.get_db] = get_small_db
+    try:
+        with small_engine.connect():
+            response = client.get("/assets/")
+    finally:
+        app.app.dependency_overrides.pop(app.get_db, None)
+        small_engine.dispose()
+
+    assert response.status_code == 503
+    assert _metrics(client)["db_pool_timeouts_total"] == before + 1
@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+import crud
+
+def test_cursor_pages_cover_every_row_once(db, make_assets):
+    make_assets(250)
+    seen = []
+    cursor = None
+    while True:
+        rows, cursor = crud.get_assets_page(db, cursor=cursor, limit=40, sort_by="name")
+        seen.extend(row.id for row in rows)
+        if cursor is None:
+            break
+    assert sorted(seen) == list(range(1, 251))
+    assert len(seen) == len(set(seen))
+
+@pytest.mark.parametrize("sort_by", ["name", "created_at", "updated_at"])
+def test_cursor_with_null_value_is_rejected(sort_by):
+    with pytest.raises(ValueError):
+        crud.decode_cursor(crud.encode_cursor(sort_by, None, 10))
+
+def test_malformed_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        crud.decode_cursor("not-a-cursor")
+    with pytest.raises(ValueError):
+        crud.decode_cursor(crud.encode_cursor("created_at", 12, 10))
+
+def _best_of(runs: int, fn) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+@pytest.mark.benchmark
+def test_page_1000_cursor_is_faster_than_offset(db, make_assets):
+    page_size = 100
+    make_assets(1000 * page_size + page_size)
+    
+    # The cursor a client holds after reading 999 pages ordered by id
+    cursor = crud.encode_cursor("id", 999 * page_size, 999 * page_size)
+    offset_rows = crud.get_assets(db, skip=999 * page_size, limit=page_size)
+    cursor_rows, _ = crud.get_assets_page(db, cursor=cursor, limit=page_size)
+    assert [row.id for row in cursor_rows] == [row.id for row in offset_rows]
+    
+    offset_time = _best_of(5, lambda: crud.get_assets(db, skip=999 * page_size, limit=page_size))
+    cursor_time = _best_of(5, lambda: crud.get_assets_page(db, cursor=cursor, limit=page_size))
+    print(f"page 1000: offset {offset_time * 1000:.2f}ms, cursor {cursor_time * 1000:.2f}ms")
+    assert cursor_time < offset_time
@@ -0,0 +1,65 @@
+import pytest
+
+import app
+import crud
+import database
+import models
+
+@pytest.fixture
+def session_client(client, db):
+    """Client whose requests run on the test's session, so budgets can watch it"""
+    app.app.dependency_overrides[app.get_db] = lambda: db
+    try:
+        yield client
+    finally:
+        app.app.dependency_overrides.pop(app.get_db, None)
+
+def _add_history(db, asset_id: int, count: int):
+    for i in range(count):
+        db.add(models.MaintenanceRecord(asset_id=asset_id, maintenance_type="preventive"))
+        db.add(models.AssetDocument(asset_id=asset_id, name=f"Manual {i}", file_path=f"/docs/{i}.pdf"))
+        db.add(models.AssetImage(asset_id=asset_id, file_path=f"/images/{i}.jpg"))
+        db.add(models.AssetAssignment(asset_id=asset_id, status="returned"))
+    db.commit()
+
+def test_asset_detail_within_budget(session_client, db, make_assets):
+    make_assets(3)
+    _add_history(db, asset_id=2, count=5)
+    db.expunge_all()
+
+    with database.query_budget(crud.ASSET_DETAIL_QUERY_BUDGET, db):
+        response = session_client.get("/assets/2")
+
+    assert response.status_code == 200
+    assert len(response.json()["maintenance_records"]) == 5
+
+def test_asset_list_within_budget(session_client, db, make_assets):
+    make_assets(50)
+    for asset_id in range(1, 51):
+        _add_history(db, asset_id=asset_id, count=1)
+    db.expunge_all()
+
+    with database.query_budget(crud.ASSET_LIST_QUERY_BUDGET, db):
+        response = session_client.get("/assets/", params={"limit": 50})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 50
+
+def test_budget_overrun_raises(db, make_assets):
+    make_assets(3)
+    with pytest.raises(database.QueryBudgetExceeded):
+        with database.query_budget(1, db):
+            crud.get_asset(db, asset_id=1)
+            crud.get_asset(db, asset_id=2)
+
+def test_budget_ignores_other_sessions(db, make_assets):
+    make_assets(3)
+    other = database.SessionLocal()
+    try:
+        with database.query_budget(1, db) as statements:
+            crud.get_asset(db, asset_id=1)
+            for asset_id in (1, 2, 3):
+                crud.get_asset(other, asset_id=asset_id)
+    finally:
+        other.close()
+    assert len(statements) == 1
@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import event, inspect, text
+
+import crud
+import database
+import models
+
+# get_assets filter combination -> partial indexes SQLite may pick for it
+EXPECTED_INDEXES = [
+    ({}, {"ix_assets_active_id"}),
+    ({"status": "available"}, {"ix_assets_active_status_id"}),
+    ({"category": "heavy"}, {"ix_assets_active_category"}),
+    ({"status": "available", "category": "heavy"}, {"ix_assets_active_status_category"}),
+    ({"project_id": 7}, {"ix_assets_active_project_status"}),
+    ({"project_id": 7, "status": "available"}, {"ix_assets_active_project_status"}),
+    # Either index narrows the scan; which one wins depends on the planner's estimates
+    ({"project_id": 7, "category": "heavy"}, {"ix_assets_active_project_status", "ix_assets_active_category"}),
+    ({"project_id": 7, "status": "available", "category": "heavy"},
+     {"ix_assets_active_project_status", "ix_assets_active_status_category"}),
+]
+
+def _query_plan(db, **filters):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(database.engine, "before_cursor_execute", capture)
+    try:
+        crud.get_assets(db, **filters)
+    finally:
+        event.remove(database.engine, "before_cursor_execute", capture)
+
+    statement, parameters = statements[-1]
+    with database.engine.connect() as connection:
+        rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return [row[-1] for row in rows]
+
+@pytest.mark.parametrize("filters, indexes", EXPECTED_INDEXES)
+def test_get_assets_uses_partial_index(db, make_assets, filters, indexes):
+    make_assets(300)
+
+    plan = _query_plan(db, **filters)
+
+    assets_steps = [step for step in plan if " assets" in step]
+    assert assets_steps, plan
+    assert any(f"USING INDEX {name}" in step for step in assets_steps for name in indexes), plan
+
+def test_upgrade_schema_adds_missing_indexes(db):
+    # A table created before the partial indexes were declared
+    with database.engine.begin() as connection:
+        for name in ("ix_assets_active_id", "ix_assets_active_status_id", "ix_assets_active_category"):
+            connection.execute(text(f"DROP INDEX {name}"))
+
+    models.upgrade_schema(database.engine)
+    models.upgrade_schema(database.engine)
+
+    existing = {index["name"] for index in inspect(database.engine).get_indexes("assets")}
+    declared = {index.name for index in models.Asset.__table__.indexes}
+    trigram = {index.name for index in models.ASSET_TRIGRAM_INDEXES}
+    assert declared - trigram <= existing
+    assert not trigram & existing
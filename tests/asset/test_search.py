@@ -0,0 +1,66 @@
+from contextlib import contextmanager
+
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+
+import crud
+import database
+import models
+
+def test_sqlite_search_falls_back_to_substring_match(db, make_assets):
+    make_assets(3)
+    db.add(models.Asset(name="Tower crane", type="crane", category="heavy", manufacturer="Liebherr", model="280 EC-H"))
+    db.add(models.Asset(name="Mini digger", type="excavator", category="heavy", serial_number="LBH-0042"))
+    db.add(models.Asset(name="Retired crane", type="crane", category="heavy", is_active=False))
+    db.commit()
+    
+    assert [asset.name for asset in crud.get_assets(db, search="CRANE")] == ["Tower crane"]
+    assert [asset.name for asset in crud.get_assets(db, search="liebherr")] == ["Tower crane"]
+    assert [asset.name for asset in crud.get_assets(db, search="ec-h")] == ["Tower crane"]
+    assert [asset.name for asset in crud.get_assets(db, search="lbh-00")] == ["Mini digger"]
+    assert crud.get_assets(db, search="bulldozer") == []
+
+def test_search_through_the_api(client, db, make_assets):
+    make_assets(5)
+    response = client.get("/assets/", params={"search": "Asset 000000"})
+    
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+
+def test_upgrade_schema_twice_on_sqlite(db):
+    models.upgrade_schema(database.engine)
+    models.upgrade_schema(database.engine)
+    
+    columns = {column["name"] for column in inspect(database.engine).get_columns("assets")}
+    assert "search_vector" not in columns
+
+class _RecordingPostgresBind:
+    """Stands in for a PostgreSQL engine and records the DDL upgrade_schema issues"""
+    
+    def __init__(self):
+        self.dialect = postgresql.dialect()
+        self.statements = []
+    
+    @contextmanager
+    def begin(self):
+        yield self
+    
+    def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=self.dialect)))
+
+def test_postgresql_upgrade_statements_are_idempotent():
+    bind = _RecordingPostgresBind()
+    models.upgrade_schema(bind)
+    models.upgrade_schema(bind)
+    
+    assert len(bind.statements) % 2 == 0
+    first, second = bind.statements[:len(bind.statements) // 2], bind.statements[len(bind.statements) // 2:]
+    assert first == second
+    for statement in first:
+        assert "IF NOT EXISTS" in statement, statement
+    
+    joined = "\n".join(first)
+    assert "ADD COLUMN IF NOT EXISTS search_vector" in joined
+    assert "ix_assets_search_vector" in joined
+    for index in models.ASSET_TRIGRAM_INDEXES:
+        assert f"CREATE INDEX IF NOT EXISTS {index.name} ON assets USING gin" in joined
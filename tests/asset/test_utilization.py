@@ -0,0 +1,229 @@
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+import models
+import schemas
+import utilization
+
+HOUR = timedelta(hours=1)
+
+def _hourly_samples(start: datetime, hours: int):
+    """45 minutes running then 15 idle in every hour"""
+    samples = []
+    for i in range(hours):
+        hour = start + i * HOUR
+        samples.append(schemas.AssetTelemetrySample(started_at=hour, duration_seconds=2700, state="running"))
+        samples.append(schemas.AssetTelemetrySample(
+            started_at=hour + timedelta(minutes=45), duration_seconds=900, state="idle"
+        ))
+    return samples
+
+def _rollup(db, model, key):
+    db.expire_all()
+    return {
+        getattr(row, key): (row.used_seconds, row.idle_seconds, row.downtime_seconds)
+        for row in db.scalars(select(model).where(model.asset_id == 1))
+    }
+
+def test_record_usage_splits_across_hours_and_days(db, make_assets):
+    make_assets(1)
+    # 23:30 to 01:30 running, crossing midnight
+    sample = schemas.AssetTelemetrySample(started_at=datetime(2024, 3, 1, 23, 30), duration_seconds=7200, state="running")
+
+    assert utilization.record_usage(db, 1, [sample]) == 1
+
+    assert _rollup(db, models.AssetUsageHourly, "hour") == {
+        datetime(2024, 3, 1, 23): (1800.0, 0.0, 0.0),
+        datetime(2024, 3, 2, 0): (3600.0, 0.0, 0.0),
+        datetime(2024, 3, 2, 1): (1800.0, 0.0, 0.0),
+    }
+    assert _rollup(db, models.AssetUsageDaily, "day") == {
+        date(2024, 3, 1): (1800.0, 0.0, 0.0),
+        date(2024, 3, 2): (5400.0, 0.0, 0.0),
+    }
+
+def test_record_usage_adds_onto_existing_rollups(client, db, make_assets):
+    make_assets(1)
+    first = {"samples": [{"started_at": "2024-03-01T10:00:00", "duration_seconds": 600, "state": "running"}]}
+    second = {"samples": [
+        {"started_at": "2024-03-01T10:20:00", "duration_seconds": 300, "state": "running"},
+        {"started_at": "2024-03-01T10:30:00+02:00", "duration_seconds": 120, "state": "down"},
+    ]}
+
+    for batch in (first, second):
+        response = client.post("/assets/1/telemetry", json=batch)
+        assert response.status_code == 201
+
+    hourly = _rollup(db, models.AssetUsageHourly, "hour")
+    assert hourly[datetime(2024, 3, 1, 10)] == (900.0, 0.0, 0.0)
+    # Offsets are normalized to UTC before bucketing
+    assert hourly[datetime(2024, 3, 1, 8)] == (0.0, 0.0, 120.0)
+    assert _rollup(db, models.AssetUsageDaily, "day") == {date(2024, 3, 1): (900.0, 0.0, 120.0)}
+
+def test_partial_days_at_both_ends(db, make_assets):
+    make_assets(1)
+    utilization.record_usage(db, 1, _hourly_samples(datetime(2024, 3, 1), hours=4 * 24))
+
+    result = utilization.get_asset_utilization(db, 1, datetime(2024, 3, 1, 18), datetime(2024, 3, 4, 6))
+
+    # 6 + 24 + 24 + 6 hours
+    assert list(result.daily_utilization) == ["2024-03-01", "2024-03-02", "2024-03-03", "2024-03-04"]
+    assert set(result.daily_utilization.values()) == {75.0}
+    assert result.total_hours_used == 60 * 0.75
+    assert result.idle_hours == 60 * 0.25
+    assert result.monthly_utilization == {"2024-03": 75.0}
+
+def test_range_is_widened_to_whole_hours(db, make_assets):
+    make_assets(1)
+    utilization.record_usage(db, 1, _hourly_samples(datetime(2024, 3, 1), hours=4 * 24))
+
+    result = utilization.get_asset_utilization(db, 1, datetime(2024, 3, 1, 18, 30), datetime(2024, 3, 4, 6, 10))
+
+    # 18:00 on the first day through 07:00 on the last
+    assert result.total_hours_used == 61 * 0.75
+
+def test_range_inside_one_day_and_across_months(db, make_assets):
+    make_assets(1)
+    utilization.record_usage(db, 1, _hourly_samples(datetime(2024, 2, 29, 20), hours=10))
+    utilization.record_usage(db, 1, [
+        schemas.AssetTelemetrySample(started_at=datetime(2024, 3, 1, 1), duration_seconds=3600, state="down")
+    ])
+
+    within_day = utilization.get_asset_utilization(db, 1, datetime(2024, 2, 29, 21), datetime(2024, 2, 29, 23))
+    assert within_day.daily_utilization == {"2024-02-29": 75.0}
+    assert within_day.total_hours_used == 1.5
+
+    across = utilization.get_asset_utilization(db, 1, datetime(2024, 2, 29), datetime(2024, 3, 2))
+    assert list(across.daily_utilization) == ["2024-02-29", "2024-03-01"]
+    assert across.monthly_utilization == {"2024-02": 75.0, "2024-03": round(0.75 * 6 / 7 * 100, 2)}
+    assert across.downtime_hours == 1.0
+
+def test_no_telemetry_reports_zero(db, make_assets):
+    make_assets(1)
+
+    result = utilization.get_asset_utilization(db, 1, datetime(2024, 3, 1), datetime(2024, 4, 1))
+
+    assert result.utilization_rate == 0.0
+    assert result.daily_utilization == {} and result.monthly_utilization == {}
+
+# Fleet utilization
+def _add_daily(db, rows):
+    """rows of (asset_id, day, used hours, idle hours, downtime hours)"""
+    db.execute(models.AssetUsageDaily.__table__.insert(), [
+        dict(asset_id=asset_id, day=day, used_seconds=used * 3600, idle_seconds=idle * 3600, downtime_seconds=down * 3600)
+        for asset_id, day, used, idle, down in rows
+    ])
+    db.commit()
+
+def _groups(result):
+    return {(group.group, group.bucket): group for group in result.groups}
+
+def test_fleet_groups_by_category_per_day(db, make_assets):
+    # Assets 1-3 are heavy, light and tools; 4 is heavy again
+    make_assets(4)
+    _add_daily(db, [
+        (1, date(2024, 3, 1), 6, 2, 0),
+        (4, date(2024, 3, 1), 2, 6, 0),
+        (2, date(2024, 3, 1), 4, 0, 4),
+        (1, date(2024, 3, 2), 8, 0, 0),
+        # Outside the range
+        (3, date(2024, 3, 3), 8, 0, 0),
+    ])
+
+    result = utilization.get_fleet_utilization(db, date(2024, 3, 1), date(2024, 3, 2))
+
+    groups = _groups(result)
+    assert list(groups) == [("heavy", "2024-03-01"), ("light", "2024-03-01"), ("heavy", "2024-03-02")]
+    heavy = groups[("heavy", "2024-03-01")]
+    assert (heavy.asset_count, heavy.hours_used, heavy.idle_hours, heavy.utilization_rate) == (2, 8, 8, 50.0)
+    assert groups[("light", "2024-03-01")].downtime_hours == 4
+    assert result.total_hours_used == 20
+    assert result.utilization_rate == round(20 / 32 * 100, 2)
+
+def test_fleet_groups_by_type_and_project_with_filters(db, make_assets):
+    make_assets(4)
+    db.execute(models.Asset.__table__.update().where(models.Asset.id.in_([1, 2])).values(current_project_id=7))
+    db.execute(models.Asset.__table__.update().where(models.Asset.id == 3).values(is_active=False))
+    db.commit()
+    _add_daily(db, [(asset_id, date(2024, 3, 1), 4, 4, 0) for asset_id in (1, 2, 3, 4)])
+
+    by_type = _groups(utilization.get_fleet_utilization(db, date(2024, 3, 1), date(2024, 3, 1), group_by="type"))
+    # Asset 3 is inactive; 1 is a crane, 2 and 4 are excavators
+    assert {key: group.asset_count for key, group in by_type.items()} == {
+        ("crane", "2024-03-01"): 1, ("excavator", "2024-03-01"): 2
+    }
+
+    by_project = _groups(utilization.get_fleet_utilization(db, date(2024, 3, 1), date(2024, 3, 1), group_by="project"))
+    assert {key: group.asset_count for key, group in by_project.items()} == {
+        ("7", "2024-03-01"): 2, (None, "2024-03-01"): 1
+    }
+
+    filtered = utilization.get_fleet_utilization(
+        db, date(2024, 3, 1), date(2024, 3, 1), group_by="type", project_id=7, category="heavy"
+    )
+    assert [(group.group, group.asset_count) for group in filtered.groups] == [("crane", 1)]
+
+def test_fleet_week_buckets_start_on_monday(db, make_assets):
+    make_assets(1)
+    # Sunday 3 March, Monday 4 March, Sunday 10 March, Monday 11 March
+    _add_daily(db, [(1, date(2024, 3, day), 1, 0, 0) for day in (3, 4, 10, 11)])
+
+    result = utilization.get_fleet_utilization(db, date(2024, 3, 1), date(2024, 3, 31), bucket="week")
+
+    assert [(group.bucket, group.hours_used) for group in result.groups] == [
+        ("2024-02-26", 1), ("2024-03-04", 2), ("2024-03-11", 1)
+    ]
+
+def test_fleet_month_buckets(db, make_assets):
+    make_assets(2)
+    _add_daily(db, [
+        (1, date(2024, 2, 28), 1, 0, 0),
+        (2, date(2024, 2, 29), 2, 0, 0),
+        (1, date(2024, 3, 1), 4, 0, 0),
+    ])
+
+    result = utilization.get_fleet_utilization(db, date(2024, 2, 1), date(2024, 3, 31), group_by="type", bucket="month")
+
+    assert [(group.group, group.bucket, group.hours_used) for group in result.groups] == [
+        ("crane", "2024-02-01", 1), ("excavator", "2024-02-01", 2), ("crane", "2024-03-01", 4)
+    ]
+
+def test_fleet_route_validates_grouping(client, make_assets):
+    make_assets(1)
+
+    assert client.get("/assets/utilization/fleet", params={"group_by": "owner"}).status_code == 422
+    assert client.get("/assets/utilization/fleet", params={"bucket": "year"}).status_code == 422
+    response = client.get(
+        "/assets/utilization/fleet", params={"start_date": "2024-03-01", "end_date": "2024-03-31", "bucket": "month"}
+    )
+    assert response.status_code == 200
+    assert response.json()["groups"] == []
+
+@pytest.mark.benchmark
+def test_fleet_utilization_10k_assets_90_days(db, make_assets):
+    assets, days = 10000, 90
+    make_assets(assets)
+    start = date(2024, 1, 1)
+    for first in range(1, assets + 1, 1000):
+        _add_daily(db, [
+            (asset_id, start + timedelta(days=offset), 6, 2, 0)
+            for asset_id in range(first, min(first + 1000, assets + 1))
+            for offset in range(days)
+        ])
+    end = start + timedelta(days=days - 1)
+
+    timings = {}
+    for bucket, buckets in (("day", days), ("week", 13), ("month", 3)):
+        began = time.perf_counter()
+        result = utilization.get_fleet_utilization(db, start, end, bucket=bucket)
+        timings[bucket] = time.perf_counter() - began
+
+        assert len(result.groups) == 3 * buckets
+        assert result.total_hours_used == assets * days * 6
+        assert result.utilization_rate == 75.0
+    print(f"\n{assets} assets x {days} days: " + ", ".join(
+        f"{bucket} {seconds * 1000:.0f}ms" for bucket, seconds in timings.items()
+    ))
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The service modules use flat imports
+SERVICE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "backend", "iot")
+sys.path.insert(0, os.path.abspath(SERVICE_DIR))
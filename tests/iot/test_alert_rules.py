@@ -0,0 +1,79 @@
+import random
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from alert_rules import CRITICAL, NORMAL, WARNING, RuleSet, RuleState, message_time, parse_timestamp
+
+DEFAULTS = {
+    "temperature": {"warning": 75, "critical": 90, "hysteresis": 2, "duration": 300},
+    "fuel_level": {"warning": 15, "critical": 5, "direction": "below", "duration": 0},
+    "motion": {"unexpected": True, "duration": 0},
+}
+
+def test_message_time_uses_the_message_timestamp():
+    timestamp, epoch = message_time({"timestamp": "2026-03-01T12:00:00Z"})
+    assert timestamp == "2026-03-01T12:00:00Z"
+    assert epoch == datetime(2026, 3, 1, 12, tzinfo=timezone.utc).timestamp()
+
+@pytest.mark.parametrize("telemetry", [
+    {},
+    {"timestamp": ""},
+    {"timestamp": "yesterday"},
+    {"timestamp": "2026-13-45T99:00:00"},
+    {"timestamp": 1767225600},
+])
+def test_message_time_falls_back_to_receive_time(telemetry):
+    before = time.time()
+    timestamp, epoch = message_time(telemetry)
+    after = time.time()
+    
+    assert before - 1 <= epoch <= after + 1
+    assert parse_timestamp(timestamp) == pytest.approx(epoch, abs=1e-3)
+
+def test_threshold_debounce_and_hysteresis():
+    rule = RuleSet(DEFAULTS).rules_for("d1")["temperature"]
+    state = RuleState()
+    
+    assert rule.evaluate(80, 0.0, state) is None
+    assert rule.evaluate(80, 299.0, state) is None
+    assert rule.evaluate(80, 300.0, state) == WARNING
+    # Inside the hysteresis band the warning holds
+    assert rule.evaluate(74, 310.0, state) is None
+    assert rule.evaluate(72, 320.0, state) == NORMAL
+
+def test_device_override_beats_asset_type_and_defaults():
+    rules = RuleSet(
+        DEFAULTS,
+        asset_types={"crane": {"fuel_level": {"warning": 30}}},
+        devices={"d2": {"fuel_level": {"critical": 20}}},
+    )
+    state = RuleState()
+    assert rules.rules_for("d1", "crane")["fuel_level"].evaluate(25, 0.0, state) == WARNING
+    state = RuleState()
+    assert rules.rules_for("d2", "crane")["fuel_level"].evaluate(18, 0.0, state) == CRITICAL
+
+@pytest.mark.benchmark
+def test_evaluations_per_second():
+    rules = RuleSet(DEFAULTS).rules_for("d1")
+    rng = random.Random(14)
+    readings = [
+        (sensor_type, rules[sensor_type], value)
+        for sensor_type, value in (
+            ("temperature", rng.uniform(60, 100)) if i % 3 == 0 else
+            ("fuel_level", rng.uniform(0, 40)) if i % 3 == 1 else
+            ("motion", rng.random() < 0.01)
+            for i in range(300_000)
+        )
+    ]
+    states = {sensor_type: RuleState() for sensor_type in rules}
+    
+    start = time.perf_counter()
+    for i, (sensor_type, rule, value) in enumerate(readings):
+        rule.evaluate(value, float(i), states[sensor_type])
+    elapsed = time.perf_counter() - start
+    
+    rate = len(readings) / elapsed
+    print(f"\n{rate:,.0f} rule evaluations/s")
+    assert rate > 200_000
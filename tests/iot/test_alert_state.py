@@ -0,0 +1,160 @@
+import asyncio
+import gc
+import sys
+import time
+import tracemalloc
+
+import pytest
+
+from alert_rules import CRITICAL, NORMAL, WARNING
+from alert_state import (
+    AlertRecord,
+    AlertStateSnapshotter,
+    FileSnapshotBackend,
+    InMemoryAlertStateStore,
+    ShardedAlertStateStore,
+    make_key,
+    shard_for,
+)
+
+def _record(level: int = NORMAL, **fields) -> AlertRecord:
+    fields.setdefault("device_name", "Crane 1")
+    return AlertRecord(level=level, warning_since=100.0 if level == NORMAL else None, **fields)
+
+def test_sharded_store_routes_by_device():
+    store = ShardedAlertStateStore(num_shards=4, max_records=400)
+    keys = [make_key(f"device-{i}", sensor) for i in range(40) for sensor in ("temperature", "pressure")]
+    
+    for key in keys:
+        assert store.put(key, _record())
+    
+    assert len(store) == 80
+    assert [shard.max_records for shard in store.shards] == [100] * 4
+    for key in keys:
+        shard = store.shards[shard_for(key[0], 4)]
+        assert shard.get(key) is store.get(key)
+    # Both sensors of a device live in the same shard
+    assert {len(shard) % 2 for shard in store.shards} == {0}
+    
+    store.delete(keys[0])
+    assert store.get(keys[0]) is None and len(store) == 79
+
+def test_eviction_takes_the_oldest_pending_record():
+    store = InMemoryAlertStateStore(max_records=3)
+    store.put(make_key("d1", "temperature"), _record())
+    store.put(make_key("d2", "temperature"), _record(WARNING))
+    store.put(make_key("d3", "temperature"), _record())
+    
+    assert store.put(make_key("d4", "temperature"), _record())
+    
+    assert store.get(make_key("d1", "temperature")) is None
+    assert store.get(make_key("d2", "temperature")) is not None
+    assert (len(store), store.evictions) == (3, 1)
+    
+    # Updating a record that is already stored never evicts
+    assert store.put(make_key("d3", "temperature"), _record(CRITICAL))
+    assert store.evictions == 1
+
+def test_active_alerts_are_never_evicted():
+    store = InMemoryAlertStateStore(max_records=2)
+    store.put(make_key("d1", "temperature"), _record())
+    store.put(make_key("d2", "temperature"), _record(CRITICAL))
+    # d1 is confirmed, so it leaves the pending queue
+    store.put(make_key("d1", "temperature"), _record(WARNING))
+    
+    assert not store.put(make_key("d3", "temperature"), _record())
+    
+    assert (len(store), store.evictions, store.rejections) == (2, 0, 1)
+    assert store.get(make_key("d3", "temperature")) is None
+
+def test_row_round_trip_allows_missing_device_name():
+    key = make_key("d1", "temperature")
+    record = AlertRecord(device_name=None, value=91.5, timestamp="2026-03-01T12:00:00Z",
+                         level=CRITICAL, warning_since=10.0, critical_since=20.0)
+    
+    restored_key, restored = AlertRecord.from_row(record.to_row(key))
+    
+    assert restored_key == key
+    assert restored.device_name is None
+    assert restored.to_row(restored_key) == record.to_row(key)
+    named_key, named = AlertRecord.from_row(_record(device_name="Crane 1").to_row(key))
+    assert named.device_name is sys.intern("Crane 1")
+
+def test_file_snapshot_round_trip(tmp_path):
+    backend = FileSnapshotBackend(str(tmp_path / "alert-state.jsonl"))
+    store = ShardedAlertStateStore(num_shards=3, max_records=300)
+    for i in range(50):
+        store.put(make_key(f"device-{i}", "temperature"), _record(i % 3, value=70 + i, device_name=f"Device {i}"))
+    
+    async def save_then_restore():
+        snapshotter = AlertStateSnapshotter(store, backend, interval=3600)
+        await snapshotter.start()
+        await snapshotter.stop()
+        
+        restored = ShardedAlertStateStore(num_shards=3, max_records=300)
+        await AlertStateSnapshotter(restored, backend, interval=3600).start()
+        return restored
+    
+    restored = asyncio.run(save_then_restore())
+    
+    assert len(restored) == 50
+    for key, record in store.items():
+        assert restored.get(key).to_row(key) == record.to_row(key)
+    assert not (tmp_path / "alert-state.jsonl.tmp").exists()
+
+def test_snapshot_rows_yields_to_the_event_loop():
+    store = ShardedAlertStateStore(num_shards=2, max_records=1000)
+    for i in range(100):
+        store.put(make_key(f"device-{i}", "temperature"), _record())
+    
+    async def run():
+        writes = 0
+        
+        async def ingest():
+            # Keeps changing the store while the snapshot is being built
+            nonlocal writes
+            while True:
+                store.put(make_key(f"late-{writes}", "temperature"), _record())
+                writes += 1
+                await asyncio.sleep(0)
+        
+        task = asyncio.create_task(ingest())
+        await asyncio.sleep(0)
+        before = writes
+        rows = await store.snapshot_rows(chunk_size=10)
+        during = writes - before
+        task.cancel()
+        return rows, during
+    
+    rows, during = asyncio.run(run())
+    
+    assert during >= 10
+    assert len(rows) >= 100
+
+@pytest.mark.benchmark
+def test_memory_for_one_million_devices():
+    devices = 1_000_000
+    gc.collect()
+    tracemalloc.start()
+    try:
+        # Capacity is split evenly across shards, so leave headroom for uneven hashing
+        store = ShardedAlertStateStore(num_shards=8, max_records=int(devices * 1.1))
+        for i in range(devices):
+            # Mostly pending records, with some confirmed alerts
+            level = WARNING if i % 10 == 0 else NORMAL
+            store.put(make_key(f"device-{i:07d}", "temperature"),
+                      _record(level, device_name=f"Device {i % 1000}", value=80.0))
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    start = time.perf_counter()
+    rows = asyncio.run(store.snapshot_rows())
+    snapshot_seconds = time.perf_counter() - start
+    
+    per_record = current / devices
+    print(f"\n{devices:,} devices: {current / 2**20:.0f} MiB, {per_record:.0f} bytes/record; "
+          f"snapshot rows in {snapshot_seconds * 1000:.0f}ms")
+    assert len(store) == len(rows) == devices
+    assert sum(shard.evictions + shard.rejections for shard in store.shards) == 0
+    assert per_record < 600
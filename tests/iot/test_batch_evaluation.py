@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from alert_rules import RuleSet
+from batch_evaluation import evaluate_columns, evaluate_stream
+
+RULES = RuleSet(
+    defaults={
+        "temperature": {"warning": 75, "critical": 90, "hysteresis": 3, "duration": 30},
+        "pressure": {"warning": 180, "critical": 220, "duration": 0},
+        "fuel_level": {"warning": 15, "critical": 5, "direction": "below", "hysteresis": 1, "duration": 10},
+        "motion": {"unexpected": True, "duration": 20},
+        "geofence": {"exit": True, "duration": 0},
+    },
+    asset_types={"crane": {"temperature": {"warning": 70, "duration": 0}}},
+    devices={"d3": {"pressure": {"critical": 200, "hysteresis": 5}}},
+)
+
+SENSOR_RANGES = {
+    "temperature": (60.0, 100.0),
+    "pressure": (150.0, 240.0),
+    "fuel_level": (0.0, 25.0),
+    "humidity": (0.0, 100.0),  # no rule: ignored by both paths
+}
+
+def _random_readings(rng: random.Random, count: int):
+    device_ids, sensor_types, values, timestamps = [], [], [], []
+    for _ in range(count):
+        sensor_type = rng.choice(list(SENSOR_RANGES) + ["motion", "geofence"])
+        if sensor_type in SENSOR_RANGES:
+            low, high = SENSOR_RANGES[sensor_type]
+            value = round(rng.uniform(low, high), 1)
+        else:
+            value = 1.0 if rng.random() < 0.4 else 0.0
+        device_ids.append(f"d{rng.randrange(6)}")
+        sensor_types.append(sensor_type)
+        values.append(value)
+        # Coarse timestamps so runs, debounce boundaries and ties all occur
+        timestamps.append(float(rng.randrange(0, 600, 5)))
+    return device_ids, sensor_types, values, timestamps
+
+@pytest.mark.parametrize("seed", range(25))
+def test_columns_match_stream(seed):
+    rng = random.Random(seed)
+    readings = _random_readings(rng, rng.randrange(500, 3000))
+    asset_types = {"d1": "crane", "d3": "crane", "d4": "truck"}
+    
+    expected = evaluate_stream(*readings, RULES, asset_types)
+    actual = evaluate_columns(*readings, RULES, asset_types)
+    
+    assert actual == expected
+    assert expected
+
+def test_empty_and_unruled_input():
+    assert evaluate_columns([], [], [], [], RULES) == []
+    assert evaluate_columns(["d1"], ["humidity"], [50.0], [0.0], RULES) == []
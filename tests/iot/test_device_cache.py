@@ -0,0 +1,100 @@
+import asyncio
+from types import SimpleNamespace
+
+from device_cache import DeviceCache, InMemorySharedStore
+
+class FailingSharedStore:
+    """Shared tier that is down"""
+    
+    async def get(self, key):
+        raise ConnectionError("shared tier unavailable")
+    
+    async def set(self, key, value, ttl):
+        raise ConnectionError("shared tier unavailable")
+    
+    async def delete(self, key):
+        raise ConnectionError("shared tier unavailable")
+
+def _loader(calls):
+    def load(device_id):
+        calls.append(device_id)
+        if device_id.startswith("missing"):
+            return None
+        return SimpleNamespace(id=device_id, name=f"Device {device_id}", asset_type="crane")
+    return load
+
+def test_shared_tier_failure_falls_through_to_loader():
+    calls = []
+    cache = DeviceCache(_loader(calls), max_size=10, ttl=60, negative_ttl=60, shared=FailingSharedStore())
+    
+    async def run():
+        device = await cache.get("d1")
+        again = await cache.get("d1")
+        await cache.invalidate("d1")
+        return device, again
+    
+    device, again = asyncio.run(run())
+    
+    assert device.name == "Device d1"
+    assert again is device
+    assert calls == ["d1"]
+    # get, set and delete each failed once
+    assert cache.stats()["shared_errors"] == 3
+
+def test_corrupt_shared_entry_falls_through_to_loader():
+    calls = []
+    shared = InMemorySharedStore()
+    cache = DeviceCache(_loader(calls), max_size=10, ttl=60, negative_ttl=60, shared=shared)
+    
+    async def run():
+        await shared.set(cache.key_prefix + "d1", b"{not json", 60)
+        return await cache.get("d1")
+    
+    assert asyncio.run(run()).name == "Device d1"
+    assert calls == ["d1"]
+    assert cache.stats()["shared_errors"] == 1
+
+def test_shared_tier_serves_other_replicas():
+    calls = []
+    shared = InMemorySharedStore()
+    first = DeviceCache(_loader(calls), max_size=10, ttl=60, negative_ttl=60, shared=shared)
+    second = DeviceCache(_loader(calls), max_size=10, ttl=60, negative_ttl=60, shared=shared)
+    
+    async def run():
+        await first.get("d1")
+        await first.get("missing-1")
+        return await second.get("d1"), await second.get("missing-1")
+    
+    device, missing = asyncio.run(run())
+    
+    assert device.name == "Device d1"
+    assert missing is None
+    assert calls == ["d1", "missing-1"]
+    assert second.stats()["shared_hits"] == 2
+
+def test_from_environment_without_redis_package_stays_local(monkeypatch):
+    import device_cache
+    
+    monkeypatch.setattr(device_cache, "redis", None)
+    monkeypatch.setenv("DEVICE_CACHE_REDIS_URL", "redis://localhost:6379/1")
+    
+    assert DeviceCache.from_environment(_loader([])).shared is None
+
+def test_loader_runs_off_the_event_loop():
+    import threading
+    
+    loader_threads = []
+    
+    def load(device_id):
+        loader_threads.append(threading.get_ident())
+        return SimpleNamespace(id=device_id, name="Device", asset_type=None)
+    
+    cache = DeviceCache(load, max_size=10, ttl=60, negative_ttl=60)
+    
+    async def run():
+        await cache.get("d1")
+        return threading.get_ident()
+    
+    loop_thread = asyncio.run(run())
+    
+    assert loader_threads and loop_thread not in loader_threads
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import queue
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("paho.mqtt")
+
+import mqtt_client
+from mqtt_client import MqttClient
+
+class BrokerStandIn:
+    """Replaces paho's Client: a network thread that acks publishes and delivers injected messages"""
+    
+    def __init__(self, client_id=None):
+        self.client_id = client_id
+        self.on_connect = self.on_disconnect = self.on_message = self.on_subscribe = self.on_publish = None
+        self.subscriptions = []
+        self.published = []
+        self._events = queue.Queue()
+        self._thread = None
+        self._next_mid = 0
+        self._lock = threading.Lock()
+    
+    def max_inflight_messages_set(self, inflight):
+        self.max_inflight = inflight
+    
+    def username_pw_set(self, username, password):
+        pass
+    
+    def connect(self, host, port, keepalive=60):
+        self._events.put(("connect",))
+    
+    def loop_start(self):
+        self._thread = threading.Thread(target=self._network_loop, daemon=True)
+        self._thread.start()
+    
+    def loop_stop(self):
+        if self._thread is not None:
+            self._events.put(None)
+            self._thread.join()
+            self._thread = None
+    
+    def disconnect(self):
+        pass
+    
+    def subscribe(self, topic, qos=0):
+        self.subscriptions.append((topic, qos))
+        return 0, 1
+    
+    def publish(self, topic, payload, qos=0, retain=False):
+        with self._lock:
+            self._next_mid += 1
+            mid = self._next_mid
+        self.published.append((topic, payload, qos))
+        self._events.put(("ack", mid))
+        return SimpleNamespace(rc=0, mid=mid)
+    
+    def deliver(self, topic, payload):
+        """Inject an inbound message; it reaches on_message on the network thread"""
+        self._events.put(("message", SimpleNamespace(topic=topic, payload=payload)))
+    
+    def _network_loop(self):
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            if event[0] == "connect":
+                self.on_connect(self, None, {}, 0)
+            elif event[0] == "ack":
+                self.on_publish(self, None, event[1])
+            else:
+                self.on_message(self, None, event[1])
+
+@pytest.fixture(autouse=True)
+def broker(monkeypatch):
+    monkeypatch.setattr(mqtt_client.mqtt, "Client", BrokerStandIn)
+
+async def _wait_for(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+def _payload(i):
+    return json.dumps({"seq": i}).encode()
+
+def test_publish_many_resolves_every_message():
+    async def run():
+        client = MqttClient("broker", 1883, "test", max_inflight=8, workers=1)
+        await client.connect()
+        results = await client.publish_many((f"devices/d{i}/telemetry", {"seq": i}) for i in range(100))
+        await client.disconnect()
+        return client, results
+    
+    client, results = asyncio.run(run())
+    
+    assert results == list(range(1, 101))
+    assert client.stats()["published"] == 100
+    assert client.stats()["publishes_inflight"] == 0
+    assert json.loads(client.client.published[7][1]) == {"seq": 7}
+
+def _flood(policy, count=20, queue_size=5):
+    """Deliver count messages while the only worker is stuck, then let it drain"""
+    async def run():
+        client = MqttClient("broker", 1883, "test", max_queue_size=queue_size, workers=1, overflow_policy=policy)
+        release = asyncio.Event()
+        handled = []
+        
+        async def handler(topic, data):
+            await release.wait()
+            handled.append(data["seq"])
+        
+        client.register_callback("devices/+/telemetry", handler)
+        await client.connect()
+        
+        for i in range(count):
+            client.client.deliver("devices/d1/telemetry", _payload(i))
+        if policy == "block":
+            # The network thread is held with the queue full; the rest are still waiting on it
+            await _wait_for(lambda: client.stats()["queue_depth"] == queue_size)
+            assert client.stats()["received"] < count
+        else:
+            await _wait_for(lambda: client.stats()["received"] == count)
+        
+        release.set()
+        await _wait_for(lambda: len(handled) + client.stats()["dropped"] == count)
+        await client.disconnect()
+        return client.stats(), handled
+    
+    return asyncio.run(run())
+
+def test_drop_newest_keeps_the_first_messages():
+    stats, handled = _flood("drop_newest")
+    
+    assert stats["dropped"] > 0
+    assert stats["received"] == 20
+    assert handled == list(range(len(handled)))
+
+def test_drop_oldest_keeps_the_latest_messages():
+    stats, handled = _flood("drop_oldest")
+    
+    assert stats["dropped"] > 0
+    assert handled == sorted(handled)
+    # The message the worker was holding, then the newest queue_size messages
+    assert handled[-5:] == list(range(15, 20))
+
+def test_block_pushes_back_without_dropping():
+    stats, handled = _flood("block")
+    
+    assert stats["dropped"] == 0
+    assert handled == list(range(20))
+    assert stats["handled"] == 20
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from notification_dispatcher import NotificationDispatcher
+
+class StubNotificationServer:
+    """Local HTTP endpoint that answers each path with a scripted list of status codes"""
+    
+    def __init__(self, responses):
+        self.responses = {path: list(codes) for path, codes in responses.items()}
+        self.received = []
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                stub.received.append((self.path, json.loads(body)))
+                codes = stub.responses.get(self.path) or [200]
+                status = codes.pop(0) if len(codes) > 1 else codes[0]
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+    
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server.server_port}{path}"
+    
+    def __enter__(self):
+        self.thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+def _alert(alert_id, device_id="d1", severity="critical"):
+    return {"alert_id": alert_id, "device_id": device_id, "sensor_type": "temperature", "severity": severity}
+
+def test_delivers_retries_and_gives_up_against_stub_server():
+    responses = {"/push": [200], "/email": [503, 503, 200], "/sms": [400]}
+    with StubNotificationServer(responses) as server:
+        dispatcher = NotificationDispatcher(
+            {channel: server.url(f"/{channel}") for channel in ("push", "email", "sms")},
+            workers=2, max_retries=3, backoff_base=0.01, coalesce_window=60
+        )
+        
+        async def run():
+            accepted = [dispatcher.submit(_alert("a1")), dispatcher.submit(_alert("a2"))]
+            await dispatcher.stop()
+            return accepted
+        
+        accepted = asyncio.run(run())
+    
+    # The repeat of the same device/sensor/severity is coalesced
+    assert accepted == [True, False]
+    stats = dispatcher.stats()
+    assert stats["coalesced"] == 1
+    # push and email succeed (email after two 503s); sms gets a permanent 400
+    assert stats["sent"] == 2
+    assert stats["retries"] == 2
+    assert stats["failed"] == 1
+    assert sorted(path for path, _ in server.received) == ["/email", "/email", "/email", "/push", "/sms"]
+
+def test_coalesce_keys_expire_oldest_first():
+    dispatcher = NotificationDispatcher({}, max_queue_size=100, workers=1, coalesce_window=10)
+    for i in range(50):
+        dispatcher._last_sent[(f"d{i}", "temperature", "warning")] = float(i)
+    dispatcher._prune_coalesce_keys(now=30.0)
+    
+    assert [key[0] for key in dispatcher._last_sent] == [f"d{i}" for i in range(21, 50)]
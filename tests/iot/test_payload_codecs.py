@@ -0,0 +1,54 @@
+import json
+import time
+
+import pytest
+
+from payload_codecs import CodecRegistry, available_codecs
+
+TELEMETRY = {
+    "device_id": "d-000123",
+    "timestamp": "2026-03-01T12:00:00Z",
+    "readings": {"temperature": 71.5, "pressure": 182.25, "vibration": 4.125, "fuel_level": 63.0, "battery": 88},
+    "location": {"lat": 51.5074, "lon": -0.1278},
+    "status": "operating",
+}
+
+def _codec(name):
+    codec = available_codecs().get(name)
+    if codec is None:
+        pytest.skip(f"{name} codec library is not installed")
+    return codec
+
+@pytest.mark.parametrize("name", ["json", "msgpack", "cbor"])
+def test_round_trip(name):
+    codec = _codec(name)
+    assert codec.decode(codec.encode(TELEMETRY)) == TELEMETRY
+
+def test_registry_picks_content_type_then_topic_then_default():
+    registry = CodecRegistry()
+    registry.route("devices/+/raw", "raw")
+    
+    assert registry.for_message("devices/d1/raw", "application/json; charset=utf-8").name == "json"
+    assert registry.for_message("devices/d1/raw").name == "raw"
+    assert registry.for_message("devices/d1/telemetry").name == "json"
+    # Non-JSON text on a JSON topic still decodes to text
+    assert registry.decode("devices/d1/telemetry", b"not json") == "not json"
+
+def _decodes_per_second(decode, payload, count=20_000):
+    start = time.perf_counter()
+    for _ in range(count):
+        decode(payload)
+    return count / (time.perf_counter() - start)
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("name", ["json", "msgpack", "cbor"])
+def test_decode_throughput(name):
+    codec = _codec(name)
+    payload = codec.encode(TELEMETRY)
+    
+    rate = _decodes_per_second(codec.decode, payload)
+    # What the client did before codecs: str copy, then stdlib json
+    baseline = _decodes_per_second(lambda data: json.loads(data.decode()), json.dumps(TELEMETRY).encode())
+    
+    print(f"\n{name}: {rate:,.0f} decodes/s ({len(payload)} bytes), str + json.loads: {baseline:,.0f} decodes/s")
+    assert rate > baseline * 0.8
@@ -0,0 +1,136 @@
+import asyncio
+import random
+import time
+
+import pytest
+
+from alert_state import ShardedAlertStateStore, shard_for
+from telemetry_batcher import TelemetryBatcher
+
+class RecordingProcessor:
+    """Stands in for AlertProcessor: keeps every batch it is handed"""
+    
+    def __init__(self, num_shards: int = 4, fail_first: bool = False):
+        self.alert_state = ShardedAlertStateStore(num_shards=num_shards, max_records=1000)
+        self.batches = []
+        self.fail_first = fail_first
+    
+    async def process_telemetry_batch(self, batch):
+        self.batches.append(list(batch))
+        if self.fail_first and len(self.batches) == 1:
+            raise RuntimeError("database unavailable")
+        await asyncio.sleep(0)
+        return []
+
+def synthetic_telemetry(devices: int, messages: int, seed: int = 11):
+    """(device_id, telemetry) pairs with a per-device sequence number, devices interleaved at random"""
+    rng = random.Random(seed)
+    sequence = [0] * devices
+    for _ in range(messages):
+        device = rng.randrange(devices)
+        sequence[device] += 1
+        yield f"device-{device:05d}", {
+            "seq": sequence[device],
+            "timestamp": "2026-03-01T12:00:00Z",
+            "readings": {"temperature": rng.uniform(60, 100), "fuel_level": rng.uniform(0, 40)},
+        }
+
+async def _wait_for(condition, timeout: float = 2.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+def test_flushes_when_batch_is_full():
+    processor = RecordingProcessor(num_shards=1)
+    
+    async def run():
+        # The linger is far longer than the test may take, so only size can flush
+        batcher = TelemetryBatcher(processor, batch_size=10, max_linger=30, max_queue_size=100)
+        for device_id, telemetry in synthetic_telemetry(devices=3, messages=20):
+            await batcher.submit(device_id, telemetry)
+        batcher.start()
+        await _wait_for(lambda: batcher.batches_processed == 2)
+        for worker in batcher._workers:
+            worker.cancel()
+    
+    asyncio.run(run())
+    
+    assert [len(batch) for batch in processor.batches] == [10, 10]
+
+def test_flushes_partial_batch_after_linger():
+    processor = RecordingProcessor(num_shards=1)
+    
+    async def run():
+        batcher = TelemetryBatcher(processor, batch_size=100, max_linger=0.05, max_queue_size=100)
+        batcher.start()
+        start = time.perf_counter()
+        for device_id, telemetry in synthetic_telemetry(devices=3, messages=3):
+            await batcher.submit(device_id, telemetry)
+        await _wait_for(lambda: batcher.batches_processed == 1)
+        elapsed = time.perf_counter() - start
+        await batcher.stop()
+        return elapsed
+    
+    elapsed = asyncio.run(run())
+    
+    assert [len(batch) for batch in processor.batches] == [3]
+    assert 0.04 <= elapsed < 1.0
+
+def test_each_device_stays_on_one_shard_in_order():
+    processor = RecordingProcessor(num_shards=4)
+    
+    async def run():
+        batcher = TelemetryBatcher(processor, batch_size=16, max_linger=0.01, max_queue_size=64)
+        batcher.start()
+        for device_id, telemetry in synthetic_telemetry(devices=50, messages=2000):
+            await batcher.submit(device_id, telemetry)
+        await batcher.stop()
+    
+    asyncio.run(run())
+    
+    seen = {}
+    for batch in processor.batches:
+        assert len({shard_for(device_id, 4) for device_id, _ in batch}) == 1
+        for device_id, telemetry in batch:
+            seen.setdefault(device_id, []).append(telemetry["seq"])
+    assert sum(len(sequence) for sequence in seen.values()) == 2000
+    assert all(sequence == list(range(1, len(sequence) + 1)) for sequence in seen.values())
+
+def test_stop_drains_queued_messages():
+    processor = RecordingProcessor(num_shards=4, fail_first=True)
+    
+    async def run():
+        batcher = TelemetryBatcher(processor, batch_size=64, max_linger=0.01, max_queue_size=4000)
+        for device_id, telemetry in synthetic_telemetry(devices=20, messages=1000):
+            await batcher.submit(device_id, telemetry)
+        batcher.start()
+        await batcher.stop()
+        return batcher
+    
+    batcher = asyncio.run(run())
+    
+    # A failing batch is logged and counted, and does not stall the drain
+    assert batcher.messages_processed == 1000
+    assert batcher.queue_depth() == 0
+    assert batcher._workers == []
+    assert sum(len(batch) for batch in processor.batches) == 1000
+
+@pytest.mark.benchmark
+def test_batched_throughput():
+    messages = list(synthetic_telemetry(devices=5000, messages=200_000))
+    
+    async def run(batch_size: int) -> float:
+        batcher = TelemetryBatcher(RecordingProcessor(num_shards=4), batch_size=batch_size, max_linger=0.05)
+        batcher.start()
+        start = time.perf_counter()
+        for device_id, telemetry in messages:
+            await batcher.submit(device_id, telemetry)
+        await batcher.stop()
+        assert batcher.messages_processed == len(messages)
+        return len(messages) / (time.perf_counter() - start)
+    
+    unbatched = asyncio.run(run(1))
+    batched = asyncio.run(run(500))
+    print(f"\n{len(messages):,} messages: batch_size=1 {unbatched:,.0f} msg/s, batch_size=500 {batched:,.0f} msg/s")
+    assert batched > unbatched
@@ -0,0 +1,96 @@
+import random
+import time
+from collections import Counter
+
+import pytest
+
+from topic_router import TopicRouter
+
+mqtt = pytest.importorskip("paho.mqtt.client")
+
+LEVELS = ["sites", "s1", "s2", "devices", "d1", "d2", "telemetry", "status", "$SYS", ""]
+
+def _random_topic(rng):
+    return "/".join(rng.choice(LEVELS) for _ in range(rng.randint(1, 5)))
+
+def _random_filter(rng):
+    levels = [rng.choice(LEVELS + ["+", "+"]) for _ in range(rng.randint(1, 5))]
+    if rng.random() < 0.3:
+        levels.append("#")
+    return "/".join(levels)
+
+def _reference_match(filters, topic):
+    """Every (filter, handler) whose filter matches, by paho's own matcher"""
+    return Counter(handler for pattern, handler in filters if mqtt.topic_matches_sub(pattern, topic))
+
+@pytest.mark.parametrize("seed", range(10))
+def test_router_matches_reference(seed):
+    rng = random.Random(seed)
+    router = TopicRouter()
+    filters = []
+    for i in range(300):
+        pattern = _random_filter(rng)
+        handler = f"h{i % 200}"
+        router.add(pattern, handler)
+        filters.append((pattern, handler))
+    
+    # Remove some handlers again, one at a time and whole filters
+    for pattern, handler in rng.sample(filters, 60):
+        if (pattern, handler) in filters:
+            router.remove(pattern, handler)
+            filters = [f for f in filters if f != (pattern, handler)]
+    pattern = filters[0][0]
+    router.remove(pattern)
+    filters = [f for f in filters if f[0] != pattern]
+    
+    assert len(router) == len(filters)
+    assert Counter(router.patterns()) == Counter(set(pattern for pattern, _ in filters))
+    for _ in range(500):
+        topic = _random_topic(rng)
+        assert Counter(router.match(topic)) == _reference_match(filters, topic), topic
+
+def test_handlers_keep_registration_order():
+    router = TopicRouter()
+    router.add("a/b", "first")
+    router.add("a/b", "second")
+    router.add("a/#", "hash")
+    
+    assert [handler for handler in router.match("a/b") if handler != "hash"] == ["first", "second"]
+    assert router.match("a") == ["hash"]
+
+def test_invalid_filters_are_rejected():
+    router = TopicRouter()
+    for pattern in ("a/#/b", "a/b#", "a/+b"):
+        with pytest.raises(ValueError):
+            router.add(pattern, "handler")
+
+@pytest.mark.benchmark
+def test_match_with_10k_patterns():
+    rng = random.Random(18)
+    router = TopicRouter()
+    filters = []
+    for i in range(10_000):
+        site, device = f"s{i % 100}", f"d{i}"
+        pattern = rng.choice([
+            f"sites/{site}/devices/{device}/telemetry",
+            f"sites/{site}/devices/{device}/+",
+            f"sites/{site}/devices/+/status",
+            f"sites/+/devices/{device}/#",
+        ])
+        router.add(pattern, i)
+        filters.append((pattern, i))
+    topics = [f"sites/s{rng.randrange(100)}/devices/d{rng.randrange(10_000)}/telemetry" for _ in range(2_000)]
+    
+    start = time.perf_counter()
+    for topic in topics:
+        router.match(topic)
+    trie_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for topic in topics[:20]:
+        [handler for pattern, handler in filters if mqtt.topic_matches_sub(pattern, topic)]
+    linear_seconds = (time.perf_counter() - start) * len(topics) / 20
+    
+    print(f"\n10k patterns: trie {trie_seconds / len(topics) * 1e6:.1f}us/match, "
+          f"linear scan {linear_seconds / len(topics) * 1e6:.1f}us/match")
+    assert trie_seconds * 50 < linear_seconds
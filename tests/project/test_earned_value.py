@@ -0,0 +1,63 @@
+import random
+import time
+
+import pytest
+
+import earned_value
+from earned_value import INDEX_NAMES, indices_python, portfolio_indices
+
+def _rollup_columns(count, rng):
+    """Portfolio rollup columns as get_portfolio_performance reads them, with edge cases mixed in"""
+    columns = {name: [] for name in ("budget", "actual_cost", "elapsed_days", "task_days", "earned_days", "planned_days")}
+    for i in range(count):
+        task_days = 0.0 if i % 17 == 0 else rng.uniform(10, 5000)
+        columns["budget"].append(0.0 if i % 23 == 0 else rng.uniform(1e4, 5e7))
+        columns["actual_cost"].append(0.0 if i % 11 == 0 else rng.uniform(0, 6e7))
+        columns["elapsed_days"].append(rng.uniform(-30, 900))
+        columns["task_days"].append(task_days)
+        columns["earned_days"].append(rng.uniform(0, task_days))
+        columns["planned_days"].append(0.0 if i % 13 == 0 else rng.uniform(0, task_days))
+    return columns
+
+def test_numpy_matches_python():
+    pytest.importorskip("numpy")
+    columns = _rollup_columns(2_000, random.Random(24))
+    
+    expected = indices_python(columns)
+    actual = earned_value.indices_numpy(columns)
+    
+    for name in INDEX_NAMES:
+        assert [value is None for value in actual[name]] == [value is None for value in expected[name]], name
+        assert [v for v in actual[name] if v is not None] == pytest.approx(
+            [v for v in expected[name] if v is not None], rel=1e-9, abs=1e-4
+        ), name
+
+def test_edge_cases():
+    columns = {
+        "budget": [1000.0, 1000.0],
+        "actual_cost": [0.0, 500.0],
+        "elapsed_days": [0.0, 10.0],
+        "task_days": [0.0, 100.0],
+        "earned_days": [0.0, 50.0],
+        "planned_days": [0.0, 25.0],
+    }
+    indices = portfolio_indices(columns)
+    
+    # No tasks, no spend, no elapsed time: nothing to divide by
+    assert [indices[name][0] for name in ("spi", "cpi", "burn_rate", "estimate_at_completion")] == [None] * 4
+    assert indices["earned_value"][1] == 500.0
+    assert indices["spi"][1] == 2.0
+    assert indices["cpi"][1] == 1.0
+    assert indices["burn_rate"][1] == 50.0
+
+@pytest.mark.benchmark
+def test_2000_project_portfolio_indices():
+    columns = _rollup_columns(2_000, random.Random(2000))
+    
+    start = time.perf_counter()
+    indices = portfolio_indices(columns)
+    elapsed = time.perf_counter() - start
+    
+    print(f"\n2,000 projects: indices in {elapsed * 1000:.1f}ms ({'numpy' if earned_value.np is not None else 'python'})")
+    assert all(len(values) == 2_000 for values in indices.values())
+    assert elapsed < 0.1
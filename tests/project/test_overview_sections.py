@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from overview_sections import SECTION_NAMES, load_overview, parse_fields, parse_include
+from project_cache import ReadThroughCache
+from timeline import Timeline, TimelineStore
+
+TASKS = [
+    {"id": 1, "name": "Excavate", "status": "planned", "start_date": "2026-01-01", "end_date": "2026-01-03",
+     "dependency_ids": []},
+    {"id": 2, "name": "Pour", "status": "planned", "start_date": "2026-01-02", "end_date": "2026-01-04",
+     "dependency_ids": [1]},
+]
+
+class SectionLoader:
+    """Plays project_overview.load_sections for one project, recording what it is asked for"""
+
+    def __init__(self, project_id: int, exists: bool = True, during_load=None):
+        self.project_id = project_id
+        self.exists = exists
+        self.during_load = during_load
+        self.requests = []
+
+    async def __call__(self, sections):
+        self.requests.append(sorted(sections))
+        if self.during_load is not None:
+            self.during_load()
+        if not self.exists:
+            return None
+        values = {
+            "project": {"id": self.project_id, "name": "Tower"},
+            "tasks": TASKS,
+            "team": [],
+            "assets": [],
+            "timeline": Timeline(self.project_id, TASKS),
+            "budget": {"total": 1000},
+        }
+        return {section: values[section] for section in sections}
+
+@pytest.fixture
+def caches():
+    return TimelineStore(max_size=10, ttl=60), ReadThroughCache("test_budget", max_size=10, ttl=60)
+
+def _overview(project_id, sections, loader, caches):
+    timelines, budgets = caches
+    return asyncio.run(load_overview(project_id, sections, loader, timelines=timelines, budgets=budgets))
+
+def test_include_defaults_to_every_section():
+    assert parse_include(None) == list(SECTION_NAMES)
+    assert parse_include("") == list(SECTION_NAMES)
+    assert parse_include(" tasks, ,budget ") == ["tasks", "budget"]
+
+def test_unknown_sections_are_rejected():
+    with pytest.raises(ValueError, match="Unknown sections: photos, invoices"):
+        parse_include("tasks,photos,invoices")
+
+def test_fields_are_grouped_by_section():
+    assert parse_fields(None) == {}
+    assert parse_fields("tasks.id, tasks.name,project.status,") == {
+        "tasks": {"id", "name"},
+        "project": {"status"},
+    }
+
+@pytest.mark.parametrize("fields", ["photos.id", "tasks", "tasks."])
+def test_invalid_field_selectors_are_rejected(fields):
+    with pytest.raises(ValueError, match="Invalid field selector"):
+        parse_fields(fields)
+
+def test_missing_project_returns_none_even_when_cached(caches):
+    timelines, budgets = caches
+    budgets.put((7,), {"total": 1000}, budgets.generation(7))
+    loader = SectionLoader(7, exists=False)
+
+    assert _overview(7, ["budget"], loader, caches) is None
+    # The existence check still runs when every section is cached
+    assert loader.requests == [[]]
+
+def test_warm_caches_are_reused(caches):
+    timelines, budgets = caches
+    cold = SectionLoader(7)
+
+    first = _overview(7, ["project", "timeline", "budget"], cold, caches)
+
+    assert cold.requests == [["budget", "project", "timeline"]]
+    assert timelines.get(7) == first["timeline"]
+    assert budgets.peek((7,)) == {"total": 1000}
+
+    warm = SectionLoader(7)
+    second = _overview(7, ["project", "timeline", "budget"], warm, caches)
+
+    assert warm.requests == [["project"]]
+    assert second["timeline"] == first["timeline"]
+    assert second["budget"] == {"total": 1000}
+
+def test_budget_cached_by_the_budget_route_is_reused(caches):
+    timelines, budgets = caches
+
+    async def load_budget():
+        return {"total": 500}
+
+    asyncio.run(budgets.get((7,), load_budget))
+    loader = SectionLoader(7)
+
+    overview = _overview(7, ["budget"], loader, caches)
+
+    assert overview == {"budget": {"total": 500}}
+    assert loader.requests == [[]]
+
+def test_write_during_load_keeps_results_out_of_the_caches(caches):
+    timelines, budgets = caches
+
+    def write():
+        timelines.invalidate(7)
+        budgets.invalidate_project(7)
+
+    overview = _overview(7, ["timeline", "budget"], SectionLoader(7, during_load=write), caches)
+
+    assert overview["budget"] == {"total": 1000}
+    assert [task["id"] for task in overview["timeline"]["tasks"]] == [1, 2]
+    assert timelines.get(7) is None
+    assert budgets.peek((7,)) is None
@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+
+from project_cache import ReadThroughCache
+
+def _loader(calls, value):
+    async def load():
+        calls.append(value)
+        await asyncio.sleep(0)
+        return value
+    return load
+
+def test_hit_rate_counts_hits_and_misses():
+    cache = ReadThroughCache("test", max_size=10, ttl=60)
+    calls = []
+
+    async def run():
+        await cache.get((1, "budget"), _loader(calls, "a"))
+        await cache.get((1, "budget"), _loader(calls, "b"))
+        await cache.get((1, "budget"), _loader(calls, "c"))
+        await cache.get((2, "budget"), _loader(calls, "d"))
+
+    asyncio.run(run())
+
+    assert calls == ["a", "d"]
+    stats = cache.stats()
+    assert (stats["hits_total"], stats["misses_total"], stats["size"]) == (2, 2, 2)
+    assert stats["hit_rate"] == 0.5
+    assert ReadThroughCache("empty").stats()["hit_rate"] == 0.0
+
+def test_concurrent_misses_share_one_load():
+    cache = ReadThroughCache("test", max_size=10, ttl=60)
+    calls = []
+    release = None
+
+    async def slow_load():
+        calls.append(1)
+        await release.wait()
+        return {"total": 100}
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        waiters = [asyncio.create_task(cache.get((1, "budget"), slow_load)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*waiters)
+
+    results = asyncio.run(run())
+
+    assert calls == [1]
+    assert all(result is results[0] for result in results)
+    assert (cache.misses, cache.hits) == (1, 4)
+
+def test_shared_load_failure_reaches_every_waiter_and_is_not_cached():
+    cache = ReadThroughCache("test", max_size=10, ttl=60)
+    calls = []
+
+    async def failing_load():
+        calls.append(1)
+        await asyncio.sleep(0)
+        raise LookupError("project 1 not found")
+
+    async def run():
+        waiters = [asyncio.create_task(cache.get((1, "budget"), failing_load)) for _ in range(3)]
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        value = await cache.get((1, "budget"), _loader(calls, "loaded"))
+        return results, value
+
+    results, value = asyncio.run(run())
+
+    assert all(isinstance(result, LookupError) for result in results)
+    assert value == "loaded"
+    assert calls == [1, "loaded"]
+
+def test_load_racing_an_invalidation_is_returned_but_not_stored():
+    cache = ReadThroughCache("test", max_size=10, ttl=60)
+    calls = []
+
+    async def load_then_write():
+        load = asyncio.create_task(cache.get((1, "budget"), _loader(calls, "stale")))
+        await asyncio.sleep(0)
+        # A write lands while the load is still reading the old rows
+        cache.invalidate_project(1)
+        stale = await load
+        fresh = await cache.get((1, "budget"), _loader(calls, "fresh"))
+        return stale, fresh
+
+    stale, fresh = asyncio.run(load_then_write())
+
+    assert (stale, fresh) == ("stale", "fresh")
+    assert cache.peek((1, "budget")) == "fresh"
+
+def test_put_with_an_old_generation_is_dropped():
+    cache = ReadThroughCache("test", max_size=10, ttl=60)
+    generation = cache.generation(1)
+
+    cache.invalidate_project(1)
+    cache.put((1, "overview"), "stale", generation)
+    assert cache.peek((1, "overview")) is None
+
+    cache.put((1, "overview"), "fresh", cache.generation(1))
+    assert cache.peek((1, "overview")) == "fresh"
+
+def test_invalidation_drops_the_project_and_portfolio_keys():
+    cache = ReadThroughCache("test", max_size=10, ttl=60)
+    for key in ((1, "budget"), (2, "budget"), (None, "portfolio")):
+        cache.put(key, key, cache.generation(key[0]))
+
+    cache.invalidate_project(1)
+
+    assert cache.peek((1, "budget")) is None
+    assert cache.peek((None, "portfolio")) is None
+    assert cache.peek((2, "budget")) == (2, "budget")
+    # Another project's generation is untouched, so its loads still store
+    assert cache.generation(2)[0] == 0
+
+def test_lru_and_ttl_bound_the_cache(monkeypatch):
+    cache = ReadThroughCache("test", max_size=2, ttl=60)
+    now = [1000.0]
+    monkeypatch.setattr("project_cache.time.monotonic", lambda: now[0])
+    for project_id in (1, 2):
+        cache.put((project_id, "budget"), project_id, cache.generation(project_id))
+    cache.peek((1, "budget"))
+
+    cache.put((3, "budget"), 3, cache.generation(3))
+
+    assert cache.peek((2, "budget")) is None
+    assert cache.peek((1, "budget")) == 1
+    now[0] += 61
+    assert cache.peek((1, "budget")) is None
+    assert cache.stats()["size"] == 2
+
+def test_render_uses_prometheus_text_format():
+    cache = ReadThroughCache("project_budget", max_size=10, ttl=60)
+    cache.put((1, "budget"), 1, cache.generation(1))
+    cache.peek((1, "budget"))
+
+    text = cache.render()
+
+    assert "# TYPE project_budget_cache_hits_total counter\nproject_budget_cache_hits_total 1\n" in text
+    assert "# TYPE project_budget_cache_hit_rate gauge\nproject_budget_cache_hit_rate 0.5\n" in text
+
+@pytest.mark.parametrize("env, expected", [
+    ({}, (10000, 60.0)),
+    ({"PROJECT_CACHE_MAX_SIZE": "50", "PROJECT_CACHE_TTL": "5"}, (50, 5.0)),
+])
+def test_from_environment(monkeypatch, env, expected):
+    monkeypatch.delenv("PROJECT_CACHE_MAX_SIZE", raising=False)
+    monkeypatch.delenv("PROJECT_CACHE_TTL", raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+
+    cache = ReadThroughCache.from_environment("test")
+
+    assert (cache.max_size, cache.ttl) == expected
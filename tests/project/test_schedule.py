@@ -0,0 +1,87 @@
+import random
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from schedule import TaskGraph, compute_schedule, level_resources, what_if
+from timeline import CyclicDependencyError
+
+START = date(2026, 1, 1)
+
+def _task(task_id, offset, days, dependency_ids=(), assignee_id=None):
+    return {
+        "id": task_id,
+        "start_date": START + timedelta(days=offset),
+        "end_date": START + timedelta(days=offset + days),
+        "dependency_ids": list(dependency_ids),
+        "assignee_id": assignee_id,
+    }
+
+# 1 -> 3 -> 4 is critical (5 + 2 + 3 days); 2 has 2 days of float
+TASKS = [
+    _task(1, 0, 5, assignee_id=10),
+    _task(2, 0, 3, assignee_id=10),
+    _task(3, 0, 2, [1, 2]),
+    _task(4, 0, 3, [3]),
+]
+
+def test_forward_and_backward_pass():
+    schedule = compute_schedule(TaskGraph(TASKS))
+    
+    assert schedule.makespan == 10
+    assert schedule.critical() == [1, 3, 4]
+    assert schedule.early_start == [0, 0, 5, 7]
+    assert schedule.late_start == [0, 2, 5, 7]
+    assert schedule.total_float == [0, 2, 0, 0]
+
+def test_leveling_serializes_one_assignee():
+    schedule = compute_schedule(TaskGraph(TASKS))
+    start, finish = level_resources(schedule, [10])
+    
+    # Task 1 has no float so goes first; task 2 waits for the same person
+    assert (start[0], finish[0]) == (0, 5)
+    assert (start[1], finish[1]) == (5, 8)
+    assert schedule.to_dict(start=start, finish=finish)["end_date"] == START + timedelta(days=13)
+
+def test_what_if_reports_slip():
+    schedule = compute_schedule(TaskGraph(TASKS))
+    
+    result = what_if(schedule, durations={2: 6})
+    assert result["slip_days"] == 1
+    assert result["critical_path"] == [2, 3, 4]
+    
+    result = what_if(schedule, delays={2: 1})
+    assert result["slip_days"] == 0
+    assert [task["id"] for task in result["moved_tasks"]] == [2]
+
+@pytest.mark.parametrize("changes", [{"durations": {1: -1}}, {"delays": {2: -3}}])
+def test_what_if_rejects_negative_days(changes):
+    schedule = compute_schedule(TaskGraph(TASKS))
+    with pytest.raises(ValueError):
+        what_if(schedule, **changes)
+
+def test_cycle_is_rejected():
+    with pytest.raises(CyclicDependencyError):
+        TaskGraph([_task(1, 0, 1, [2]), _task(2, 0, 1, [1])])
+
+def _programme(count, rng):
+    """Layered DAG: each task depends on up to three tasks from the previous 500"""
+    tasks = []
+    for i in range(count):
+        dependency_ids = rng.sample(range(max(0, i - 500), i), min(i, rng.randint(0, 3))) if i else []
+        tasks.append(_task(i, rng.randint(0, 30), rng.randint(0, 10), dependency_ids, assignee_id=i % 200))
+    return tasks
+
+@pytest.mark.benchmark
+def test_50k_task_programme_schedules_in_under_a_second():
+    tasks = _programme(50_000, random.Random(22))
+    
+    start = time.perf_counter()
+    schedule = compute_schedule(TaskGraph(tasks))
+    elapsed = time.perf_counter() - start
+    
+    print(f"\n50k tasks: graph + CPM in {elapsed * 1000:.0f}ms, makespan {schedule.makespan:.0f} days")
+    assert elapsed < 1.0
+    assert min(schedule.total_float) >= -1e-9
+    assert schedule.critical()
@@ -0,0 +1,75 @@
+from datetime import date
+
+import pytest
+
+import timeline
+from timeline import CyclicDependencyError, Timeline, TimelineStore
+
+def _task(task_id, start, end, dependency_ids=()):
+    return {
+        "id": task_id,
+        "name": f"Task {task_id}",
+        "status": "planned",
+        "start_date": start,
+        "end_date": end,
+        "dependency_ids": list(dependency_ids),
+    }
+
+TASKS = [
+    _task(1, "2026-01-01", "2026-01-06"),
+    _task(2, "2026-01-01", "2026-01-03"),
+    _task(3, "2026-01-02", "2026-01-04", [1, 2]),
+    _task(4, "2026-01-01", "2026-01-01", [3]),
+]
+
+def test_timeline_places_tasks_after_dependencies():
+    data = Timeline(7, TASKS).to_dict()
+    
+    tasks = {task["id"]: task for task in data["tasks"]}
+    assert tasks[3]["start_date"] == date(2026, 1, 6)
+    assert tasks[3]["end_date"] == date(2026, 1, 8)
+    assert data["critical_path"] == [1, 3]
+    assert data["milestones"] == [{"id": 4, "name": "Task 4", "date": date(2026, 1, 8)}]
+
+def test_cycle_is_rejected():
+    with pytest.raises(CyclicDependencyError):
+        Timeline(7, [_task(1, None, None, [2]), _task(2, None, None, [1])])
+
+def test_store_drops_least_recently_used():
+    store = TimelineStore(max_size=2, ttl=60)
+    for project_id in (1, 2):
+        store.put(Timeline(project_id, TASKS), store.generation(project_id))
+    store.get(1)
+    store.put(Timeline(3, TASKS), store.generation(3))
+    
+    assert len(store) == 2
+    assert store.get(2) is None
+    assert store.get(1) is not None and store.get(3) is not None
+
+def test_store_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(timeline.time, "monotonic", lambda: now[0])
+    store = TimelineStore(max_size=10, ttl=60)
+    store.put(Timeline(1, TASKS), store.generation(1))
+    
+    now[0] += 59
+    assert store.get(1) is not None
+    now[0] += 2
+    assert store.get(1) is None
+    assert len(store) == 0
+
+def test_task_added_updates_in_place_and_stale_rebuilds_are_not_stored():
+    store = TimelineStore(max_size=10, ttl=60)
+    store.put(Timeline(1, TASKS), store.generation(1))
+    
+    generation = store.generation(1)
+    store.task_added(1, _task(5, "2026-01-02", "2026-01-12", [2]))
+    assert [task["id"] for task in store.get(1)["tasks"]][-1] == 5
+    assert store.get(1)["critical_path"] == [2, 5]
+    
+    # A rebuild that started before the write must not replace the updated timeline
+    store.put(Timeline(1, TASKS), generation)
+    assert len(store.get(1)["tasks"]) == 5
+    
+    store.invalidate(1)
+    assert store.get(1) is None